@@ -0,0 +1,154 @@
+# FILE: benchmarks/bench_keyword_scorer.py
+"""
+Micro-benchmark: legacy per-keyword `text.count` scoring loop vs. the Aho-Corasick KeywordScorer
+vs. the vectorized batch scorer, on the checked-in raw_data_*.json corpora.
+
+Run from the repository root:
+    python -m benchmarks.bench_keyword_scorer [--repeat 20] [--extra-keywords 0]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.utils.batch_scorer import score_batch
+from src.utils.keyword_scorer import KeywordScorer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roughly what the Stage 1 keyword expansion returns for the topics in the bundled corpora.
+TOPIC_KEYWORDS = {
+    "langchain": [
+        "langchain", "llm", "agents", "rag", "retrieval", "vector store", "embeddings", "openai", "prompt",
+        "chain", "documentation", "python", "langgraph", "llamaindex", "abstraction", "tools", "memory",
+        "production", "framework", "api", "chatbot", "pipeline",
+    ],
+    "rust_programming_language": [
+        "rust", "programming", "language", "memory safety", "borrow checker", "cargo", "lifetimes", "async",
+        "tokio", "performance", "c++", "compiler", "unsafe", "traits", "generics", "ownership", "crates",
+        "webassembly", "systems programming", "concurrency", "zero-cost abstractions", "learning curve",
+    ],
+}
+
+
+def load_corpus(path: str) -> list[dict]:
+    """Flattens a consolidated raw data file into submissions of {title, selftext, comments}."""
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+    submissions = []
+    for item in items:
+        if item.get("type") == "comment_nuggets":
+            submissions.append({"title": "", "selftext": "", "comments": [c["body"] for c in item.get("comments", [])]})
+        else:
+            submissions.append({
+                "title": item.get("title", ""),
+                "selftext": item.get("selftext", ""),
+                "comments": [c["body"] for c in item.get("top_comments", [])],
+            })
+    return submissions
+
+
+def topic_from_path(path: str) -> str:
+    match = re.match(r"raw_data_(.+)_\d+\.json$", os.path.basename(path))
+    return match.group(1) if match else ""
+
+
+def frequent_words(submissions: list[dict], n: int) -> list[str]:
+    words = Counter()
+    for sub in submissions:
+        for text in [sub["title"], sub["selftext"], *sub["comments"]]:
+            words.update(w for w in re.findall(r"[a-z]{4,}", text.lower()))
+    return [w for w, _ in words.most_common(n)]
+
+
+def legacy_scores(submissions: list[dict], keywords: set[str]) -> list[tuple[int, int]]:
+    """The scoring loop as it was in search_and_filter_posts (comments scanned twice)."""
+    results = []
+    for sub in submissions:
+        title_text = sub["title"].lower()
+        body_text = sub["selftext"].lower()
+        post_only_score = sum(title_text.count(kw) * 5 + body_text.count(kw) * 2 for kw in keywords)
+        total = post_only_score
+        comment_score_sum = 0
+        for body in sub["comments"]:
+            comment_text = body.lower()
+            comment_score_sum += sum(comment_text.count(kw) * 3 for kw in keywords)
+            total += sum(comment_text.count(kw) for kw in keywords)
+        results.append((post_only_score, total * 2 + comment_score_sum))
+    return results
+
+
+def scorer_scores(submissions: list[dict], scorer: KeywordScorer) -> list[tuple[int, int]]:
+    results = []
+    for sub in submissions:
+        post_only_score = scorer.score_post(sub["title"], sub["selftext"])
+        total = post_only_score
+        comment_score_sum = 0
+        for body in sub["comments"]:
+            comment_score, hits = scorer.score_comment(body)
+            comment_score_sum += comment_score
+            total += hits
+        results.append((post_only_score, total * 2 + comment_score_sum))
+    return results
+
+
+def batch_scores(submissions: list[dict], scorer: KeywordScorer) -> list[tuple[int, int]]:
+    scores = score_batch(
+        scorer,
+        [sub["title"] for sub in submissions],
+        [sub["selftext"] for sub in submissions],
+        [sub["comments"] for sub in submissions]
+    )
+    # Same aggregate as the loops above: relevance x2 plus the weighted comment scores.
+    comment_sums = np.bincount(scores.comment_owner, weights=scores.comment_scores, minlength=len(submissions)).astype(np.int64)
+    return list(zip(scores.post_scores.tolist(), (scores.submission_relevance * 2 + comment_sums).tolist()))
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--extra-keywords", type=int, default=0,
+                        help="Add the N most frequent corpus words to the keyword set to test scaling.")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(REPO_ROOT, "raw_data_*.json")))
+    if not paths:
+        print("❌ No raw_data_*.json corpora found in the repository root.")
+        return
+
+    print(f"{'corpus':<55} {'kw':>4} {'texts':>6} {'legacy ms':>10} {'scorer ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for path in paths:
+        submissions = load_corpus(path)
+        keywords = set(TOPIC_KEYWORDS.get(topic_from_path(path), []))
+        keywords.update(frequent_words(submissions, args.extra_keywords) if args.extra_keywords else [])
+        n_texts = sum(2 + len(sub["comments"]) for sub in submissions)
+
+        scorer = KeywordScorer(keywords)
+        expected = legacy_scores(submissions, keywords)
+        if expected != scorer_scores(submissions, scorer) or expected != batch_scores(submissions, scorer):
+            raise AssertionError(f"Scorer results differ from the legacy loop on {path}")
+
+        legacy = best_of(args.repeat, legacy_scores, submissions, keywords)
+        fast = best_of(args.repeat, scorer_scores, submissions, scorer)
+        batch = best_of(args.repeat, batch_scores, submissions, scorer)
+        print(f"{os.path.basename(path):<55} {len(keywords):>4} {n_texts:>6} {legacy * 1000:>10.2f} {fast * 1000:>10.2f} "
+              f"{batch * 1000:>10.2f} {legacy / min(fast, batch):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# FILE: benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of the Reddit research pipeline, fully offline.
+
+Reddit is served by ReplayReddit from a synthetic fixture built out of the checked-in raw_data_*.json
+corpora (scaled 1x/10x/100x by default); OpenAI, Gemini and Supabase are local stand-ins. For each
+stage - subreddit discovery, search (incl. comment fetching), scoring, consolidation, report generation,
+answer - it records wall time, CPU time, peak traced memory, Reddit requests and LLM prompt sizes,
+and writes everything to a JSON file so runs can be compared across commits.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline [--scales 1,10,100] [--reddit-latency 0] [--output path.json]
+Set LLM_CACHE_ENABLED=true to measure runs served from a warm LLM response cache.
+"""
+
+import os
+
+# The pipeline reads these at import time: no real keys are needed, and the client-side
+# Reddit rate limiter must not throttle the replayed requests (ReplayReddit applies its own).
+for _name in ("OPENAI_API_KEY", "FIRE_CRAWL_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(_name, "benchmark")
+os.environ.setdefault("REDDIT_REQUESTS_PER_MINUTE", "100000000")
+# Measure the uncached pipeline; set LLM_CACHE_ENABLED=true to benchmark warm LLM-cache runs instead.
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "llm_cache.sqlite3"))
+
+import argparse
+import contextlib
+import glob
+import json
+import platform
+import re
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import src.core.agent as agent
+import src.core.report_generator as report_generator
+import src.database as database
+import src.services.llm_provider as llm_provider
+import src.services.openai_client as openai_client
+import src.services.reddit_client as reddit_client
+from src.services.comment_fetcher import CommentBudget, fetch_comment_forests
+from src.services.reddit_replay import ReplayReddit
+
+from benchmarks.bench_keyword_scorer import TOPIC_KEYWORDS
+from benchmarks.standins import CallLog, FakeSupabase, build_reddit_fixture, log_delta, make_chat_openai, make_genai
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTION = "What are the most common complaints, and what do people recommend instead?"
+N_SUBREDDITS = 5
+
+
+def topic_from_path(path: str) -> str:
+    match = re.match(r"raw_data_(.+)_\d+\.json$", os.path.basename(path))
+    return match.group(1) if match else "topic"
+
+
+def latest_corpus_per_topic(pattern: str) -> list[str]:
+    latest = {}
+    for path in sorted(glob.glob(pattern)):
+        latest[topic_from_path(path)] = path
+    return list(latest.values())
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+class StageTimer:
+    """Measures one pipeline stage: wall/CPU time, peak traced memory, Reddit requests and LLM usage."""
+
+    def __init__(self, reddit: ReplayReddit, log: CallLog):
+        self.reddit = reddit
+        self.log = log
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        requests_before = dict(self.reddit.stats)
+        calls_before = self.log.snapshot()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        yield
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        memory_now, memory_peak = tracemalloc.get_traced_memory()
+        self.stages[name] = {
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "peak_memory_mb": round((memory_peak - memory_before) / 2**20, 3),
+            "retained_memory_mb": round((memory_now - memory_before) / 2**20, 3),
+            "reddit_requests": {kind: count - requests_before.get(kind, 0)
+                                for kind, count in self.reddit.stats.items() if count - requests_before.get(kind, 0)},
+            "llm": log_delta(calls_before, self.log.snapshot()),
+        }
+
+
+def install_standins(topic: str, keywords: list[str], subreddits: list[str], log: CallLog, llm_latency: float) -> None:
+    """Points the pipeline's OpenAI, Gemini and Supabase clients at the local stand-ins."""
+
+    def openai_responder(prompt: str) -> str:
+        if "subreddits" in prompt:
+            return ", ".join(subreddits)
+        if "keywords" in prompt:
+            return ", ".join(keywords)
+        return "OK"
+
+    llm_provider.ChatOpenAI = make_chat_openai(log, openai_responder, latency=llm_latency)
+    llm_provider.genai = make_genai(log, latency=llm_latency)
+    llm_provider.reset_llm_clients()
+    database.supabase = FakeSupabase(log)
+
+
+def run_pipeline(path: str, scale: int, reddit_latency: float, llm_latency: float, bounded_comments: bool) -> dict:
+    topic_slug = topic_from_path(path)
+    topic = topic_slug.replace("_", " ")
+    subreddits = [f"bench_{topic_slug}_{i}" for i in range(N_SUBREDDITS)]
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+    fixture, search_limit = build_reddit_fixture(items, topic, subreddits, scale=scale)
+    n_comments = sum(len(c["initial"]) + sum(len(b) for b in c["batches"]) for c in fixture.comments.values())
+
+    log = CallLog()
+    install_standins(topic, TOPIC_KEYWORDS.get(topic_slug, topic.split()), subreddits, log, llm_latency)
+    reddit = ReplayReddit(fixture=fixture, latency=reddit_latency, jitter=reddit_latency / 4, requests_per_minute=None)
+    per_submission = CommentBudget.per_submission_default() if bounded_comments else CommentBudget()
+    global_budget = CommentBudget.global_default() if bounded_comments else CommentBudget()
+    timer = StageTimer(reddit, log)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        with timer.stage("discovery"):
+            found_subreddits = openai_client.find_relevant_subreddits(topic, limit=N_SUBREDDITS)
+        with timer.stage("search"):
+            keywords = reddit_client.expand_topic_keywords(topic)
+            content_filter = reddit_client.new_content_filter()
+            posts = reddit_client.collect_candidate_posts(reddit, found_subreddits, topic, search_limit, use_cache=False)
+            posts = reddit_client.drop_low_value_posts(posts, content_filter)
+            forests = fetch_comment_forests(reddit, posts, per_submission_budget=per_submission, global_budget=global_budget,
+                                            rate_limiter=reddit_client.reddit_rate_limiter, use_cache=False)
+        with timer.stage("scoring"):
+            top_submissions, top_posts, top_comments = reddit_client.score_and_select(
+                posts, keywords, comment_forests=forests, content_filter=content_filter
+            )
+        with timer.stage("consolidation"):
+            consolidated_data = reddit_client.scrape_validated_posts(top_submissions, top_posts, top_comments)
+        with timer.stage("report"):
+            report = report_generator.generate_report_from_posts(topic, consolidated_data)
+            report_id = database.save_research_report(user_id="benchmark-user", topic=topic, content=report)
+        with timer.stage("answer"):
+            answer = agent.answer_question_from_report(report, QUESTION)
+            database.save_chat_message(user_id="benchmark-user", role="assistant", content=answer, report_id=report_id)
+
+    total = {
+        "wall_s": round(sum(stage["wall_s"] for stage in timer.stages.values()), 4),
+        "cpu_s": round(sum(stage["cpu_s"] for stage in timer.stages.values()), 4),
+        "reddit_requests": reddit.stats.get("requests", 0),
+        "llm_prompt_chars": sum(call["prompt_chars"] for stage in timer.stages.values() for call in stage["llm"].values()),
+    }
+    return {
+        "corpus": os.path.basename(path),
+        "topic": topic,
+        "scale": scale,
+        "posts": len(fixture.submissions),
+        "comments": n_comments,
+        "consolidated_items": len(consolidated_data),
+        "stages": timer.stages,
+        "total": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(REPO_ROOT, "raw_data_*.json"), help="Glob of consolidated corpora (latest file per topic is used).")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated corpus multipliers.")
+    parser.add_argument("--reddit-latency", type=float, default=0.0, help="Simulated seconds per Reddit request.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call.")
+    parser.add_argument("--bounded-comments", action="store_true", help="Use the production comment budgets instead of expanding every tree.")
+    parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/pipeline_<commit>_<time>.json).")
+    args = parser.parse_args()
+
+    paths = latest_corpus_per_topic(args.corpus)
+    if not paths:
+        print("❌ No raw_data_*.json corpora found.")
+        return
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    commit = git_commit()
+
+    tracemalloc.start()
+    runs = []
+    for path in paths:
+        for scale in scales:
+            print(f"⏱️ {os.path.basename(path)} x{scale} ...")
+            run = run_pipeline(path, scale, args.reddit_latency, args.llm_latency, args.bounded_comments)
+            runs.append(run)
+            stages = "  ".join(f"{name} {stage['wall_s']:.3f}s" for name, stage in run["stages"].items())
+            print(f"   {run['posts']} posts, {run['comments']} comments | {stages} | "
+                  f"{run['total']['reddit_requests']} requests, {run['total']['llm_prompt_chars']:,} prompt chars")
+    tracemalloc.stop()
+
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "scales": scales,
+            "reddit_latency_s": args.reddit_latency,
+            "llm_latency_s": args.llm_latency,
+            "bounded_comments": args.bounded_comments,
+            "question": QUESTION,
+        },
+        "runs": runs,
+    }
+    output = args.output or os.path.join(REPO_ROOT, "benchmarks", "results", f"pipeline_{commit}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
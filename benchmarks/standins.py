@@ -0,0 +1,284 @@
+# FILE: benchmarks/standins.py
+"""
+Local stand-ins for the external services the research pipeline talks to (OpenAI via LangChain,
+Gemini, Supabase), plus a synthetic Reddit fixture built from the checked-in raw_data_*.json corpora.
+Every stand-in logs its calls and prompt sizes so benchmarks can report them per stage.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from src.services.reddit_replay import ReplayFixture
+
+
+class CallLog:
+    """Thread-safe tally of stand-in calls: count and prompt/response characters per service."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+
+    def record(self, service: str, prompt_chars: int, response_chars: int) -> None:
+        with self._lock:
+            entry = self.calls.setdefault(service, {"calls": 0, "prompt_chars": 0, "response_chars": 0, "max_prompt_chars": 0})
+            entry["calls"] += 1
+            entry["prompt_chars"] += prompt_chars
+            entry["response_chars"] += response_chars
+            entry["max_prompt_chars"] = max(entry["max_prompt_chars"], prompt_chars)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {service: dict(entry) for service, entry in self.calls.items()}
+
+
+def log_delta(before: dict, after: dict) -> dict:
+    """Per-service difference between two `CallLog.snapshot()`s (max_prompt_chars taken from `after`)."""
+    delta = {}
+    for service, entry in after.items():
+        base = before.get(service, {})
+        calls = entry["calls"] - base.get("calls", 0)
+        if calls:
+            delta[service] = {
+                "calls": calls,
+                "prompt_chars": entry["prompt_chars"] - base.get("prompt_chars", 0),
+                "response_chars": entry["response_chars"] - base.get("response_chars", 0),
+                "approx_prompt_tokens": (entry["prompt_chars"] - base.get("prompt_chars", 0)) // 4,
+            }
+    return delta
+
+
+# ==============================================================================
+# --- OPENAI (LangChain ChatOpenAI) ---
+# ==============================================================================
+
+def make_chat_openai(log: CallLog, responder: Callable[[str], str], latency: float = 0.0):
+    """Returns a ChatOpenAI replacement class whose `invoke` answers with `responder(prompt)`."""
+
+    class FakeChatOpenAI:
+        def __init__(self, *args, **kwargs):
+            self.model_name = kwargs.get("model", "")
+
+        def invoke(self, prompt, *args, **kwargs):
+            text = prompt if isinstance(prompt, str) else str(prompt)
+            if latency:
+                time.sleep(latency)
+            content = responder(text)
+            log.record("openai", len(text), len(content))
+            return SimpleNamespace(content=content)
+
+        def stream(self, prompt, *args, **kwargs):
+            content = self.invoke(prompt).content
+            for start in range(0, len(content), 40):
+                yield SimpleNamespace(content=content[start:start + 40])
+
+    return FakeChatOpenAI
+
+
+# ==============================================================================
+# --- GEMINI (google.generativeai) ---
+# ==============================================================================
+
+def _fake_report(prompt: str) -> str:
+    """A markdown report whose size grows with the input, roughly like the real one."""
+    words = re.findall(r"[A-Za-z]{5,}", prompt)[:2000]
+    body = " ".join(words[i] for i in range(0, len(words), 7))
+    sections = ["Executive Summary", "Key Themes & Sub-Topics", "Prevailing Sentiments",
+                "Common Questions & Unanswered Problems", "Notable Stories & Anecdotes", "Actionable Insights & Data Points"]
+    return "\n\n".join(f"## {title}\n\n{body[i * 300:(i + 1) * 300 + 600]}" for i, title in enumerate(sections))
+
+
+def make_genai(log: CallLog, latency: float = 0.0):
+    """Returns a module-like object replacing `google.generativeai` (configure, GenerativeModel)."""
+
+    def respond(prompt: str) -> SimpleNamespace:
+        if latency:
+            time.sleep(latency)
+        if "Ready for Part 2." in prompt:
+            text = "Ready for Part 2."
+        elif '"is_relevant"' in prompt:
+            text = '{"is_relevant": false, "reason": "Benchmark stand-in."}'
+        elif '"themes"' in prompt:
+            words = re.findall(r"[A-Za-z]{6,}", prompt)
+            text = json.dumps({field: [" ".join(words[i:i + 12]) for i in range(0, min(len(words), 240), 60)]
+                               for field in ("themes", "sentiments", "questions", "anecdotes", "data_points")})
+        else:
+            text = _fake_report(prompt)
+        log.record("gemini", len(prompt), len(text))
+        return SimpleNamespace(text=text, parts=[SimpleNamespace(text=text)])
+
+    class FakeChat:
+        def send_message(self, prompt, stream: bool = False, **kwargs):
+            response = respond(str(prompt))
+            return [response] if stream else response
+
+    class FakeGenerativeModel:
+        def __init__(self, model_name: str = "", *args, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, stream: bool = False, **kwargs):
+            response = respond(str(prompt))
+            return [response] if stream else response
+
+        def start_chat(self, *args, **kwargs):
+            return FakeChat()
+
+    return SimpleNamespace(configure=lambda **kwargs: None, GenerativeModel=FakeGenerativeModel)
+
+
+# ==============================================================================
+# --- SUPABASE ---
+# ==============================================================================
+
+class FakeSupabase:
+    """In-memory replacement for the Supabase client: table(...).select/insert/eq/order/limit/single/execute."""
+
+    def __init__(self, log: CallLog, latency: float = 0.0):
+        self.log = log
+        self.latency = latency
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> "_FakeQuery":
+        return _FakeQuery(self, name)
+
+
+class _FakeQuery:
+    def __init__(self, db: FakeSupabase, table: str):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.order_by = None
+        self.max_rows = None
+        self.single_row = False
+        self.insert_rows = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def insert(self, data):
+        self.insert_rows = data if isinstance(data, list) else [data]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc: bool = False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, n: int):
+        self.max_rows = n
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def execute(self):
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        with self.db._lock:
+            rows = self.db.tables.setdefault(self.table, [])
+            if self.insert_rows is not None:
+                inserted = []
+                for row in self.insert_rows:
+                    row = {"id": str(uuid.uuid4()), "created_at": time.time(), **row}
+                    rows.append(row)
+                    inserted.append(row)
+                self.db.log.record("supabase", sum(len(str(row)) for row in inserted), 0)
+                return SimpleNamespace(data=inserted, error=None)
+            result = [row for row in rows if all(row.get(column) == value for column, value in self.filters)]
+        if self.order_by:
+            result.sort(key=lambda row: row.get(self.order_by[0]), reverse=self.order_by[1])
+        if self.max_rows is not None:
+            result = result[:self.max_rows]
+        self.db.log.record("supabase", 0, sum(len(str(row)) for row in result))
+        if self.single_row:
+            return SimpleNamespace(data=result[0] if result else None, error=None)
+        return SimpleNamespace(data=result, error=None)
+
+
+# ==============================================================================
+# --- SYNTHETIC REDDIT FIXTURE ---
+# ==============================================================================
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def build_reddit_fixture(
+    items: list[dict],
+    topic: str,
+    subreddits: list[str],
+    scale: int = 1,
+    first_page_share: float = 0.6,
+    more_batch_size: int = 5,
+    seed: int = 0
+) -> tuple[ReplayFixture, int]:
+    """
+    Turns a consolidated raw_data corpus into a replayable Reddit fixture, `scale` times larger.
+    The first copy keeps the original posts and comments; further copies are synthesised from
+    random sentences of the corpus, so sizes and vocabulary stay realistic without the copies
+    being near-duplicates of each other. Posts are spread over `subreddits` and searchable by `topic`;
+    each comment tree returns `first_page_share` of its comments on the first page and the rest in
+    "load more comments" batches of `more_batch_size`.
+    Returns (fixture, search limit per subreddit that returns every post).
+    """
+    rng = random.Random(seed)
+    base_posts = [item for item in items if item.get("type") in ("full_submission", "individual_post")]
+    nugget_comments = [c for item in items if item.get("type") == "comment_nuggets" for c in item.get("comments", [])]
+    base_comments = [list(item.get("top_comments", [])) for item in base_posts]
+    for i, comment in enumerate(nugget_comments):
+        base_comments[i % len(base_comments)].append(comment)
+
+    texts = [item.get("selftext", "") for item in base_posts] + [c.get("body", "") for comments in base_comments for c in comments]
+    sentences = [s for text in texts for s in _SENTENCE_SPLIT.split(text) if len(s.split()) >= 3] or ["No text available here."]
+    titles = [item.get("title", "") for item in base_posts]
+
+    def synth(n_sentences: int) -> str:
+        return " ".join(rng.choice(sentences) for _ in range(n_sentences))
+
+    fixture = ReplayFixture()
+    per_sub = {sub: [] for sub in subreddits}
+    now = time.time()
+    post_number = 0
+    for copy in range(scale):
+        for base_index, base in enumerate(base_posts):
+            post_id = f"b{base_index}c{copy}"
+            sub = subreddits[post_number % len(subreddits)]
+            if copy == 0:
+                title, selftext = base.get("title", ""), base.get("selftext", "")
+                bodies = [(c.get("body", ""), c.get("score", 0)) for c in base_comments[base_index]]
+            else:
+                title = f"{rng.choice(titles)} ({rng.choice(sentences)[:40]})"
+                selftext = synth(rng.randint(0, 6))
+                bodies = [(synth(rng.randint(1, 3)), rng.randint(-5, 200)) for _ in base_comments[base_index]]
+            comments = [{
+                "id": f"{post_id}k{j}", "link_id": f"t3_{post_id}", "parent_id": f"t3_{post_id}",
+                "body": body, "author": f"user{rng.randint(1, 5000)}", "score": score, "depth": 0,
+                "created_utc": now - rng.randint(0, 300 * 86400),
+            } for j, (body, score) in enumerate(bodies)]
+            first_page = max(1, int(len(comments) * first_page_share)) if comments else 0
+            batches = [comments[k:k + more_batch_size] for k in range(first_page, len(comments), more_batch_size)]
+            submission = {
+                "id": post_id, "subreddit": sub, "title": title, "selftext": selftext,
+                "url": f"https://www.reddit.com/r/{sub}/comments/{post_id}/post/", "permalink": f"/r/{sub}/comments/{post_id}/post/",
+                "author": f"user{rng.randint(1, 5000)}", "score": (base.get("score") or 0) if copy == 0 else rng.randint(0, 2000),
+                "num_comments": len(comments), "created_utc": now - rng.randint(0, 300 * 86400),
+            }
+            per_sub[sub].append(submission)
+            fixture.add_submission(submission)
+            fixture.add_comments(post_id, comments[:first_page], batches)
+            post_number += 1
+
+    search_limit = max(len(posts) for posts in per_sub.values())
+    for sub, posts in per_sub.items():
+        # Recorded without a limit: the listing is complete, so it also serves larger (multireddit) limits.
+        fixture.add_search(sub, topic, "relevance", "year", None, posts)
+    return fixture, search_limit
@@ -13,6 +13,9 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 FIRE_CRAWL_API_KEY = os.getenv("FIRE_CRAWL_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# --- LLM Models ---
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+
 # --- Twitter Credentials ---
 TWITTER_CONSUMER_KEY = os.getenv("TWITTER_CONSUMER_KEY")
 TWITTER_CONSUMER_SECRET = os.getenv("TWITTER_CONSUMER_SECRET")
@@ -26,6 +29,120 @@ REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'Social Media Agent by Faiq')
 REDDIT_USERNAME = os.getenv('REDDIT_USERNAME')
 REDDIT_PASSWORD = os.getenv('REDDIT_PASSWORD')
 REDDIT_SUBREDDIT = os.getenv("REDDIT_SUBREDDIT", "test")
+# Posting account: REDDIT_USER_NAME (the name posting has always read) or, failing that, REDDIT_USERNAME.
+REDDIT_POST_USERNAME = os.getenv('REDDIT_USER_NAME') or REDDIT_USERNAME
+REDDIT_POST_USER_AGENT = os.getenv('REDDIT_POST_USER_AGENT', 'FaiqQazi Reddit Bot')
+# "live" talks to Reddit, "record" also captures responses into the fixture file, "replay" serves the fixture offline.
+REDDIT_BACKEND = os.getenv("REDDIT_BACKEND", "live").lower()
+REDDIT_FIXTURE_PATH = os.getenv("REDDIT_FIXTURE_PATH", os.path.join("fixtures", "reddit_fixture.json"))
+REDDIT_REPLAY_LATENCY = float(os.getenv("REDDIT_REPLAY_LATENCY", "0.3"))
+REDDIT_REPLAY_JITTER = float(os.getenv("REDDIT_REPLAY_JITTER", "0.1"))
+REDDIT_REPLAY_REQUESTS_PER_MINUTE = int(os.getenv("REDDIT_REPLAY_REQUESTS_PER_MINUTE", "100"))
+REDDIT_REPLAY_ON_RATE_LIMIT = os.getenv("REDDIT_REPLAY_ON_RATE_LIMIT", "sleep").lower()
+
+# --- Reddit Research Tuning ---
+# Reddit allows ~100 requests per minute per OAuth client; stay a little below it.
+REDDIT_REQUESTS_PER_MINUTE = int(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "90"))
+REDDIT_SEARCH_WORKERS = int(os.getenv("REDDIT_SEARCH_WORKERS", "4"))
+REDDIT_COMMENT_WORKERS = int(os.getenv("REDDIT_COMMENT_WORKERS", "8"))
+# Most PRAW clients (each with its own OAuth token) a credential set's pool builds; further leases wait.
+REDDIT_CLIENT_POOL_SIZE = int(os.getenv("REDDIT_CLIENT_POOL_SIZE", str(max(REDDIT_SEARCH_WORKERS, REDDIT_COMMENT_WORKERS))))
+# Small subreddits are searched together through multireddit paths (r/a+b+c) to save requests.
+REDDIT_MULTIREDDIT_SEARCH = os.getenv("REDDIT_MULTIREDDIT_SEARCH", "true").lower() == "true"
+REDDIT_MULTIREDDIT_MAX_SUBS = int(os.getenv("REDDIT_MULTIREDDIT_MAX_SUBS", "5"))
+# Upper bound on results requested by one combined search (Reddit returns 100 per request).
+REDDIT_MULTIREDDIT_MAX_LIMIT = int(os.getenv("REDDIT_MULTIREDDIT_MAX_LIMIT", "100"))
+# Budgets for expanding "load more comments" stubs, per submission and for the whole run.
+REDDIT_COMMENT_REQUESTS_PER_SUBMISSION = int(os.getenv("REDDIT_COMMENT_REQUESTS_PER_SUBMISSION", "6"))
+REDDIT_COMMENT_MAX_DEPTH = int(os.getenv("REDDIT_COMMENT_MAX_DEPTH", "8"))
+REDDIT_COMMENT_SECONDS_PER_SUBMISSION = float(os.getenv("REDDIT_COMMENT_SECONDS_PER_SUBMISSION", "20"))
+REDDIT_COMMENT_REQUESTS_TOTAL = int(os.getenv("REDDIT_COMMENT_REQUESTS_TOTAL", "200"))
+REDDIT_COMMENT_SECONDS_TOTAL = float(os.getenv("REDDIT_COMMENT_SECONDS_TOTAL", "60"))
+# How posts and comments are ranked: "bm25" (inverted index) or "keyword" (raw substring counts).
+REDDIT_RANKING = os.getenv("REDDIT_RANKING", "bm25").lower()
+# Weight of log(1 + Reddit score) added to BM25 relevance.
+REDDIT_BM25_SCORE_PRIOR = float(os.getenv("REDDIT_BM25_SCORE_PRIOR", "0.5"))
+# Near-duplicate posts/comments (SimHash bits apart) are merged before report synthesis.
+REDDIT_DEDUP_MAX_DISTANCE = int(os.getenv("REDDIT_DEDUP_MAX_DISTANCE", "6"))
+# Low-value content (deleted/removed, bots, one-word replies, link-only) is dropped before scoring and prompting.
+REDDIT_FILTER_ENABLED = os.getenv("REDDIT_FILTER_ENABLED", "true").lower() == "true"
+REDDIT_FILTER_BOT_AUTHORS = os.getenv(
+    "REDDIT_FILTER_BOT_AUTHORS",
+    "AutoModerator,RemindMeBot,sneakpeekbot,WikiSummarizerBot,RepostSleuthBot,SaveVideo,VredditDownloader,TweetLinkerBot"
+).split(",")
+REDDIT_FILTER_MIN_COMMENT_WORDS = int(os.getenv("REDDIT_FILTER_MIN_COMMENT_WORDS", "2"))
+REDDIT_FILTER_LINK_ONLY = os.getenv("REDDIT_FILTER_LINK_ONLY", "true").lower() == "true"
+
+# --- Local Reddit Content Cache ---
+REDDIT_CACHE_PATH = os.getenv("REDDIT_CACHE_PATH", os.path.join(".cache", "reddit_cache.sqlite3"))
+REDDIT_CACHE_MAX_MB = int(os.getenv("REDDIT_CACHE_MAX_MB", "256"))
+REDDIT_SEARCH_CACHE_TTL = int(os.getenv("REDDIT_SEARCH_CACHE_TTL", str(6 * 3600)))
+# How many results a subreddit's last search returned; used to size combined searches.
+REDDIT_SEARCH_YIELD_TTL = int(os.getenv("REDDIT_SEARCH_YIELD_TTL", str(7 * 24 * 3600)))
+# Comment trees of recent posts still change quickly; older threads can be cached for much longer.
+REDDIT_COMMENTS_CACHE_TTL_RECENT = int(os.getenv("REDDIT_COMMENTS_CACHE_TTL_RECENT", str(1 * 3600)))
+REDDIT_COMMENTS_CACHE_TTL_SETTLED = int(os.getenv("REDDIT_COMMENTS_CACHE_TTL_SETTLED", str(3 * 24 * 3600)))
+
+# --- Local LLM Response Cache ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "128"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# Calls sampled above this temperature are meant to vary between runs, so they skip the cache by default.
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.5"))
+
+# --- Report Generation ---
+# Token budget for the Reddit data sent in each of the (at most two) report turns; gemini-1.5-flash accepts ~1M in total.
+REPORT_TURN_TOKEN_BUDGET = int(os.getenv("REPORT_TURN_TOKEN_BUDGET", "200000"))
+# "auto": the chat report (one or two turns) whenever the data fits in two turns, map-reduce only when packing
+# would drop or trim data; "chat": always the chat report; "map_reduce": always summarise token-bounded
+# shards in parallel, then merge the notes into the report.
+REPORT_MODE = os.getenv("REPORT_MODE", "auto").lower()
+REPORT_SHARD_TOKEN_BUDGET = int(os.getenv("REPORT_SHARD_TOKEN_BUDGET", "60000"))
+REPORT_MAP_WORKERS = int(os.getenv("REPORT_MAP_WORKERS", "4"))
+REPORT_MAX_SHARDS = int(os.getenv("REPORT_MAX_SHARDS", "24"))
+
+# --- Questions Answered From Stored Reports ---
+# Send only the report passages relevant to the question (plus the outline) instead of the whole report.
+REPORT_QA_RETRIEVAL = os.getenv("REPORT_QA_RETRIEVAL", "true").lower() == "true"
+REPORT_QA_MAX_TOKENS = int(os.getenv("REPORT_QA_MAX_TOKENS", "1500"))
+# Share of the question's informative terms the passages must contain; below it the full report is used.
+REPORT_QA_MIN_COVERAGE = float(os.getenv("REPORT_QA_MIN_COVERAGE", "0.6"))
+# Also send raw posts/comments from the topic's stored corpus that match the question (grows the prompt; off by default).
+REPORT_QA_CORPUS_EXCERPTS = os.getenv("REPORT_QA_CORPUS_EXCERPTS", "false").lower() == "true"
+
+# --- Reusing Stored Reports ---
+# Which stored reports a new research request may be answered from: "user" (their own) or "global" (everyone's).
+REPORT_CACHE_SCOPE = os.getenv("REPORT_CACHE_SCOPE", "user").lower()
+REPORT_CACHE_MAX_REPORTS = int(os.getenv("REPORT_CACHE_MAX_REPORTS", "50"))
+REPORT_CACHE_REFRESH_SECONDS = int(os.getenv("REPORT_CACHE_REFRESH_SECONDS", "300"))
+# Local similarity (0-1) at or above which the best stored report is reused without asking the LLM.
+REPORT_CACHE_MATCH_THRESHOLD = float(os.getenv("REPORT_CACHE_MATCH_THRESHOLD", "0.7"))
+# Between this and the match threshold, the LLM decides; below it, new research starts right away.
+REPORT_CACHE_BORDERLINE_THRESHOLD = float(os.getenv("REPORT_CACHE_BORDERLINE_THRESHOLD", "0.3"))
+
+# --- Request Routing ---
+# Route unambiguous prompts (bare URLs, "post this: ...", title edits) with local rules instead of the LLM.
+ROUTER_FAST_PATH = os.getenv("ROUTER_FAST_PATH", "true").lower() == "true"
+# Share of rule-routed prompts also sent to the LLM router in the background, to measure agreement
+# (one extra LLM call per sampled prompt; 0 turns it off).
+ROUTER_SHADOW_SAMPLE_RATE = float(os.getenv("ROUTER_SHADOW_SAMPLE_RATE", "0.05"))
+# JSON-lines log of routing decisions (empty disables it); summarize with `python -m src.core.fast_router`.
+ROUTER_DECISION_LOG = os.getenv("ROUTER_DECISION_LOG", os.path.join(".cache", "router_decisions.jsonl"))
+# The log identifies prompts by hash and length only; set to true to also store the first 80 characters.
+ROUTER_LOG_PROMPT_TEXT = os.getenv("ROUTER_LOG_PROMPT_TEXT", "false").lower() == "true"
+# Router prompt history: recent messages kept verbatim, longer ones replaced by a compact reference,
+# and a rolling summary of older ones: a digest of all of them plus previews of at most this many.
+ROUTER_HISTORY_RECENT_MESSAGES = int(os.getenv("ROUTER_HISTORY_RECENT_MESSAGES", "6"))
+ROUTER_HISTORY_MAX_MESSAGE_CHARS = int(os.getenv("ROUTER_HISTORY_MAX_MESSAGE_CHARS", "600"))
+ROUTER_HISTORY_SUMMARY_LINES = int(os.getenv("ROUTER_HISTORY_SUMMARY_LINES", "12"))
+
+# --- Stored Research Corpora (for incremental refresh) ---
+RESEARCH_CORPUS_DIR = os.getenv("RESEARCH_CORPUS_DIR", "research_corpus")
+# Stored corpora are pruned on every run: posts older than this many days are dropped (0 disables),
+# then the lowest-value posts (score + comments) beyond this many (0 disables).
+RESEARCH_CORPUS_MAX_AGE_DAYS = float(os.getenv("RESEARCH_CORPUS_MAX_AGE_DAYS", "180"))
+RESEARCH_CORPUS_MAX_POSTS = int(os.getenv("RESEARCH_CORPUS_MAX_POSTS", "1000"))
 
 # --- Supabase Credentials ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -1,7 +1,7 @@
 
 import os
 import requests
-from typing import TypedDict, Optional, List, Dict
+from typing import TypedDict, Optional, List, Dict, Iterable, Iterator
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 import re
@@ -13,44 +13,256 @@ import random
 from PIL import Image
 from io import BytesIO
 import time
+import threading
 import streamlit as st
 
 from src.services.firecrawl_client import scrape_and_format_content, extract_images_from_firecrawl
 from src.services.gemini_client import get_best_image_from_candidates
+from src.services.llm_provider import get_chat_model, get_gemini_model, stream_text
 from src.services.openai_client import generate_post_function, find_relevant_subreddits
 from src.services.reddit_client import (
+    get_reddit_client,
     post_to_reddit,
-    search_and_filter_posts,
+    build_topic_corpus,
+    refresh_topic_corpus,
+    select_from_corpus,
     validate_subreddit,
     scrape_validated_posts
 )
+from src.services.report_cache import get_report_catalog, remember_report
+from src.services.report_index import get_report_index, is_failed_report
+from src.services.research_index import find_cached_corpus_index, get_corpus_index
 from src.services.twitter_client import post_to_twitter_oauth1
 
 # Core (Main Business Logic)
-from src.core.report_generator import generate_report_from_posts
+from src.core.report_generator import generate_report_from_posts, stream_report_from_posts
+from src.core.fast_router import fast_route, log_decision
 
 from src.database import (
     create_user,
     verify_user,
-    get_latest_report,
     save_chat_message,
     get_chat_history,
     save_research_report
 )
 
-from src.utils.file_handler import( save_report_to_file, save_raw_data_to_file)
+from src.utils.chat_history import ChatHistoryContext
+from src.utils.file_handler import( save_report_to_file, save_raw_data_to_file, save_research_corpus, load_research_corpus)
 
 from src.config import (
     OPENAI_API_KEY, FIRE_CRAWL_API_KEY, GEMINI_API_KEY,
     TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET,
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
-    SUPABASE_URL, SUPABASE_KEY
+    SUPABASE_URL, SUPABASE_KEY,
+    REPORT_QA_RETRIEVAL, REPORT_QA_CORPUS_EXCERPTS, REPORT_CACHE_MATCH_THRESHOLD, REPORT_CACHE_BORDERLINE_THRESHOLD,
+    ROUTER_FAST_PATH, ROUTER_SHADOW_SAMPLE_RATE
 )
 
 
 
 
-def execute_reddit_research_workflow(user_id: str, topic: str, question: str) -> str:
+def gather_reddit_research(reddit, topic: str) -> Optional[tuple]:
+    """
+    Returns (top_submissions, top_posts, top_comments) for a topic.
+    If a research corpus is stored for the topic, only what changed since the last run is fetched
+    (new posts past each subreddit's watermark, new comments on growing threads) and the whole
+    corpus is re-scored locally. Otherwise a full corpus is built and stored for next time.
+    Returns None if no relevant subreddits could be found.
+    """
+    corpus = load_research_corpus(topic)
+    if corpus is not None:
+        st.write(f"Refreshing stored research on `{', '.join(corpus['subreddits'])}`...")
+        with st.spinner("Fetching only new posts and comments since the last run..."):
+            stats = refresh_topic_corpus(reddit, corpus)
+        st.write(f"Found {stats['new_posts']} new posts and {stats['new_comments']} new comments "
+                 f"({stats['refreshed_threads']} threads updated).")
+        if stats.get("pruned_posts"):
+            st.write(f"Dropped {stats['pruned_posts']} old or low-value posts from the stored research.")
+    else:
+        # Find relevant subreddits
+        with st.spinner("Finding relevant subreddits..."):
+            subreddits = find_relevant_subreddits(topic, limit=5)
+        if not subreddits:
+            return None
+        st.write(f"Found potential subreddits: `{', '.join(subreddits)}`")
+        with st.spinner("Searching for top posts and comments..."):
+            corpus = build_topic_corpus(reddit, subreddits, topic)
+    save_research_corpus(corpus)
+
+    # Score and select the best posts
+    return select_from_corpus(corpus)
+
+
+def build_answer_prompt(report: str, question: str, excerpts: str = "", report_is_excerpt: bool = False) -> str:
+    """
+    The multi-purpose Q&A prompt: answers `question` using only the research report (and optional raw excerpts).
+    With `report_is_excerpt`, `report` holds the report's outline and the passages retrieved for the question.
+    """
+    if report_is_excerpt:
+        scan_step = "Read through the report passages below (the report sections most relevant to the question, under the report's full outline) and identify the 2-4 most relevant paragraphs, themes, or stories that directly address the user's question."
+    else:
+        scan_step = "Read through the entire research report and identify the 2-4 most relevant paragraphs, themes, or stories that directly address the user's question."
+    excerpts_block = f"""
+    **<Supporting_Reddit_Excerpts>** (raw posts/comments the report was built from, most relevant to the question)
+    {excerpts}
+    **</Supporting_Reddit_Excerpts>**
+    ---
+""" if excerpts else ""
+    return f"""You are a world-class research analyst and communication expert. Your task is to provide the best possible answer to a user's question, using ONLY the provided research report as your source of truth.
+
+    **Your Thought Process (Follow these steps internally):**
+    1.  **Analyze the User's Question:** First, understand the *intent* behind the question. Are they asking for:
+        - A specific fact or data point?
+        - A general summary of a topic?
+        - A story, example, or personal experience (anecdote)?
+        - The overall sentiment or opinions of the community?
+    2.  **Scan the Report for Relevance:** {scan_step}
+    3.  **Synthesize and Structure:** Based on the user's intent, synthesize the relevant information into a perfectly structured answer. Do NOT just copy-paste from the report.
+
+    **Response Formatting Rules:**
+    - If the user is asking for **facts or data**, provide a direct answer followed by bullet points with the supporting data.
+    - If the user is asking for a **summary**, provide a concise paragraph followed by a clear, bulleted list of the key takeaways.
+    - If the user is asking for a **story or anecdote**, retell the most relevant story from the report in a narrative format.
+    - If the user is asking about **sentiment**, summarize the different viewpoints (e.g., "The community was largely positive, with some expressing concern about X...").
+    - **Crucially:** If the report does not contain information to answer the question, you MUST explicitly state: "I'm sorry, but the research report does not contain specific information about that topic." Do not invent information.
+
+    ---
+    **<Research_Report>**
+    {report}
+    **</Research_Report>**
+    ---
+{excerpts_block}
+    **User's Question:** "{question}"
+
+    ---
+    **Your Final Answer:**
+    """
+
+
+def answer_question_from_report(report: str, question: str, excerpts: str = "") -> str:
+    """Asks Gemini to answer the user's question from the research report and returns the answer text."""
+    return "".join(stream_answer_from_report(report, question, excerpts))
+
+
+def stream_answer_from_report(report: str, question: str, excerpts: str = "") -> Iterator[str]:
+    """
+    Streams Gemini's answer to the user's question from the research report, chunk by chunk.
+    With REPORT_QA_RETRIEVAL, only the report passages relevant to the question are sent (see ReportIndex.context_for).
+    """
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    # Temperature 0: the same report and question give the same answer, so answers can be served from the LLM cache.
+    model = get_gemini_model(temperature=0, api_key=GEMINI_API_KEY)
+    report_is_excerpt = False
+    if REPORT_QA_RETRIEVAL:
+        report, report_is_excerpt = get_report_index(report).context_for(question)
+    answer_prompt = build_answer_prompt(report, question, excerpts, report_is_excerpt=report_is_excerpt)
+
+    print("-> Sending advanced Q&A prompt to Gemini...")
+    size = 0
+    for text in stream_text(model.generate_content(answer_prompt, stream=True)):
+        size += len(text)
+        yield text
+    print("-> Gemini response received.")
+    print(size, "characters in the response.")
+
+
+def render_stream(chunks: Iterable[str]) -> str:
+    """
+    Writes streamed text into the current Streamlit container as it arrives and returns the full text.
+    Marks the response as already displayed, so the chat UI does not render it a second time.
+    """
+    text = st.write_stream(chunks)
+    st.session_state["response_streamed"] = True
+    return text if isinstance(text, str) else "".join(str(part) for part in text)
+
+
+def render_report_stream(chunks: Iterable[str]) -> str:
+    """Streams the research report into a status box that collapses once the report is complete."""
+    with st.status("Synthesizing data into a research report... (This may take a moment)", expanded=True) as status:
+        report = st.write_stream(chunks)
+        status.update(label="✅ Research report generated.", state="complete", expanded=False)
+    return report if isinstance(report, str) else "".join(str(part) for part in report)
+
+
+def find_follow_up_excerpts(topic: str, question: str, max_posts: int = 3, max_comments: int = 8) -> str:
+    """
+    Looks up the posts and comments most relevant to a follow-up question in the stored corpus
+    for `topic`, using its BM25 index (no text is rescanned). The index already in memory is used when
+    there is one; the corpus file is only read when this process has not indexed the topic yet.
+    Returns them formatted for a prompt, or an empty string when there is no stored corpus or nothing matches.
+    """
+    index = find_cached_corpus_index(topic)
+    if index is None:
+        corpus = load_research_corpus(topic)
+        if corpus is None:
+            return ""
+        index = get_corpus_index(corpus)
+    posts, comments = index.search(question, top_posts_k=max_posts, top_comments_k=max_comments)
+    lines = [f"- [post, score {post.score}] {post.title}: {(post.selftext or '')[:500]}" for post in posts]
+    lines += [f"- [comment, score {comment.score}] {comment.body[:500]}" for comment in comments]
+    print(f"-> Found {len(posts)} posts and {len(comments)} comments relevant to the follow-up question.")
+    return "\n".join(lines)
+
+
+def check_report_relevance_with_llm(report: dict, question: str) -> bool:
+    """Asks Gemini whether a stored report can answer the question. Used only for borderline local matches."""
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not found in .env for relevance check.")
+    # A yes/no decision: deterministic, so repeated checks of the same report and question are cached.
+    model = get_gemini_model(temperature=0, api_key=GEMINI_API_KEY)
+
+    # Prompt to check relevance
+    relevance_prompt = f"""You are a relevance analysis expert. Determine if an existing research report is sufficient to answer a new user question.
+
+    **Existing Report Topic:** "{report['topic']}"
+    **Existing Report Summary (first 1000 chars):**
+    ---
+    {report['content'][:1000]}...
+    ---
+    **New User Question:** "{question}"
+
+    Can the new user question likely be answered using the existing report?
+    Respond with ONLY a single, raw JSON object: {{"is_relevant": true/false, "reason": "Your brief reason here."}}
+    """
+
+    relevance_response = model.generate_content(relevance_prompt)
+
+    try:
+        # Robust JSON parsing
+        json_match = re.search(r'\{.*\}', relevance_response.text, re.DOTALL)
+        if not json_match: raise ValueError("No JSON in relevance response.")
+        relevance_result = json.loads(json_match.group(0))
+        is_relevant = relevance_result.get("is_relevant", False)
+        reason = relevance_result.get("reason", "No reason provided.")
+        print(f"--- [CACHE CHECK] Gemini decision: Relevant = {is_relevant}. Reason: {reason}")
+        return bool(is_relevant)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"--- [CACHE CHECK] ⚠️ Could not parse relevance check response: {e}")
+        return False
+
+
+def find_reusable_report(user_id: str, topic: str, question: str) -> Optional[dict]:
+    """
+    Picks the stored report most similar to the new request from the user's report catalog (local scoring).
+    Clear matches are reused and clear misses rejected immediately; only scores between
+    REPORT_CACHE_BORDERLINE_THRESHOLD and REPORT_CACHE_MATCH_THRESHOLD are checked with the LLM.
+    """
+    catalog = get_report_catalog(user_id)
+    report, score = catalog.best_match(topic, question)
+    if report is None:
+        print("--- [CACHE CHECK] ℹ️ No stored report shares any terms with this request.")
+        return None
+    print(f"--- [CACHE CHECK] Best of {len(catalog)} stored report(s): '{report.topic}' (similarity {score:.2f})")
+    if score >= REPORT_CACHE_MATCH_THRESHOLD:
+        return report.as_dict()
+    if score < REPORT_CACHE_BORDERLINE_THRESHOLD:
+        return None
+    with st.spinner(f"🤖 Asking AI if the report on '{report.topic}' is relevant to your new question..."):
+        return report.as_dict() if check_report_relevance_with_llm(report.as_dict(), question) else None
+
+
+def execute_reddit_research_workflow(user_id: str, topic: str, question: str, reddit=None) -> str:
 
     """Handles the entire Reddit research process and returns the final answer."""
     print("\n" + "="*50)
@@ -59,299 +271,68 @@ def execute_reddit_research_workflow(user_id: str, topic: str, question: str) ->
     report = None
     report_id = None
     
-    with st.spinner("🧠 Checking for your most recent research report..."):
-        found, latest_report = get_latest_report(user_id)
-        found = bool(found)
-        print(type(found))
-    print(f"--- [CACHE CHECK] Found recent report: {found}, Topic: {latest_report['topic'] if found else 'N/A'}")
-
-    if found:
-        print(f"--- [CACHE CHECK] Found a recent report on topic: '{latest_report['topic']}'")
-        with st.spinner("🤖 Asking AI if the existing report is relevant to your new question..."):
-            # Configure Gemini
-            GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-            if not GEMINI_API_KEY:
-                raise ValueError("GEMINI_API_KEY not found in .env for relevance check.")
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
-
-            # Prompt to check relevance
-            relevance_prompt = f"""You are a relevance analysis expert. Determine if an existing research report is sufficient to answer a new user question.
-
-            **Existing Report Topic:** "{latest_report['topic']}"
-            **Existing Report Summary (first 1000 chars):**
-            ---
-            {latest_report['content'][:1000]}...
-            ---
-            **New User Question:** "{question}"
-
-            Can the new user question likely be answered using the existing report?
-            Respond with ONLY a single, raw JSON object: {{"is_relevant": true/false, "reason": "Your brief reason here."}}
-            """
-            
-            relevance_response = model.generate_content(relevance_prompt)
-            
-            try:
-                # Robust JSON parsing
-                json_match = re.search(r'\{.*\}', relevance_response.text, re.DOTALL)
-                if not json_match: raise ValueError("No JSON in relevance response.")
-                relevance_result = json.loads(json_match.group(0))
-                is_relevant = relevance_result.get("is_relevant", False)
-                reason = relevance_result.get("reason", "No reason provided.")
-                print(f"--- [CACHE CHECK] Gemini decision: Relevant = {is_relevant}. Reason: {reason}")
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"--- [CACHE CHECK] ⚠️ Could not parse relevance check response: {e}")
-                is_relevant = False
-
-        if is_relevant:
-            print("--- [CACHE CHECK] ✅ Using existing report. Skipping new research.")
-            st.success(f"💡 Found a relevant report on '{latest_report['topic']}'! Answering from cache.")
-            report = latest_report['content']
-            print("latest report")
-            print(latest_report)
-            report_id = latest_report['id']
-            GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
-            answer_prompt = f"""You are a world-class research analyst and communication expert. Your task is to provide the best possible answer to a user's question, using ONLY the provided research report as your source of truth.
-
-            **Your Thought Process (Follow these steps internally):**
-            1.  **Analyze the User's Question:** First, understand the *intent* behind the question. Are they asking for:
-                - A specific fact or data point?
-                - A general summary of a topic?
-                - A story, example, or personal experience (anecdote)?
-                - The overall sentiment or opinions of the community?
-            2.  **Scan the Report for Relevance:** Read through the entire research report and identify the 2-4 most relevant paragraphs, themes, or stories that directly address the user's question.
-            3.  **Synthesize and Structure:** Based on the user's intent, synthesize the relevant information into a perfectly structured answer. Do NOT just copy-paste from the report.
-
-            **Response Formatting Rules:**
-            - If the user is asking for **facts or data**, provide a direct answer followed by bullet points with the supporting data.
-            - If the user is asking for a **summary**, provide a concise paragraph followed by a clear, bulleted list of the key takeaways.
-            - If the user is asking for a **story or anecdote**, retell the most relevant story from the report in a narrative format.
-            - If the user is asking about **sentiment**, summarize the different viewpoints (e.g., "The community was largely positive, with some expressing concern about X...").
-            - **Crucially:** If the report does not contain information to answer the question, you MUST explicitly state: "I'm sorry, but the research report does not contain specific information about that topic." Do not invent information.
-
-            ---
-            **<Research_Report>**
-            {report}
-            **</Research_Report>**
-            ---
-
-            **User's Question:** "{question}"
-
-            ---
-            **Your Final Answer:**
-            """
-            
-            print("-> Sending advanced Q&A prompt to Gemini...")
-            response = model.generate_content(answer_prompt)
-            print("-> Gemini response received.")
-            print(len(response.text), "characters in the response.")
-            final_answer = response.text
-            return final_answer
-
-            
-        else:
-            print("--- [CACHE CHECK] ℹ️ Existing report is not relevant enough. Starting new research.")
-            reddit = praw.Reddit(
-            client_id=os.getenv('REDDIT_CLIENT_ID'),
-            client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-            user_agent=os.getenv('REDDIT_USER_AGENT', 'Social Media Agent by Faiq'),
-            username=os.getenv('REDDIT_USERNAME'),
-            password=os.getenv('REDDIT_PASSWORD')
-        )
-            st.success("✅ Reddit client initialized.")
-
-            # Find relevant subreddits
-            with st.spinner("Finding relevant subreddits..."):
-                subreddits = find_relevant_subreddits(topic, limit=5)
-            if not subreddits:
-                return "❌ Could not find any relevant subreddits for this topic."
-            st.write(f"Found potential subreddits: `{', '.join(subreddits)}`")
-
-            # Search and filter for the best posts
-            with st.spinner("Searching for top posts and comments..."):
-                top_submissions, top_posts, top_comments = search_and_filter_posts(reddit, subreddits, topic)
-            if not any([top_submissions, top_posts, top_comments]):
-                return "❌ No relevant posts or comments found matching the topic."
-            st.write(f"Found {len(top_submissions)} top submissions, {len(top_posts)} top posts, and {len(top_comments)} top comments.")
-
-            # Scrape the validated content
-            with st.spinner("Scraping detailed content..."):
-                consolidated_data = scrape_validated_posts(top_submissions, top_posts, top_comments)
-
-            raw_report_file = save_raw_data_to_file(consolidated_data, topic)
-            print(f"Raw report saved to: {raw_report_file}")
-            # Generate the comprehensive report
-            with st.spinner("Synthesizing data into a research report... (This may take a moment)"):
-                report = generate_report_from_posts(topic, consolidated_data)
-                report_file = save_report_to_file(report, topic)
-            # NEW: Save the generated report to the database
-            print("saving the report to the database...")
-            report_id = save_research_report(user_id=user_id, topic=topic, content=report)
-            print(f"Report saved with ID: {report_id}")
-            st.success("✅ Research report generated and saved.")
-            st.success("✅ Research report generated.")
-                    # Answer the user's question based on the report
-            with st.spinner("Formulating final answer..."):
-                GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-
-                genai.configure(api_key=GEMINI_API_KEY)
-                model = genai.GenerativeModel('gemini-1.5-flash-latest')
-
-                # --- Step 2: The Advanced, Multi-Purpose Prompt ---
-                answer_prompt = f"""You are a world-class research analyst and communication expert. Your task is to provide the best possible answer to a user's question, using ONLY the provided research report as your source of truth.
-
-                **Your Thought Process (Follow these steps internally):**
-                1.  **Analyze the User's Question:** First, understand the *intent* behind the question. Are they asking for:
-                    - A specific fact or data point?
-                    - A general summary of a topic?
-                    - A story, example, or personal experience (anecdote)?
-                    - The overall sentiment or opinions of the community?
-                2.  **Scan the Report for Relevance:** Read through the entire research report and identify the 2-4 most relevant paragraphs, themes, or stories that directly address the user's question.
-                3.  **Synthesize and Structure:** Based on the user's intent, synthesize the relevant information into a perfectly structured answer. Do NOT just copy-paste from the report.
-
-                **Response Formatting Rules:**
-                - If the user is asking for **facts or data**, provide a direct answer followed by bullet points with the supporting data.
-                - If the user is asking for a **summary**, provide a concise paragraph followed by a clear, bulleted list of the key takeaways.
-                - If the user is asking for a **story or anecdote**, retell the most relevant story from the report in a narrative format.
-                - If the user is asking about **sentiment**, summarize the different viewpoints (e.g., "The community was largely positive, with some expressing concern about X...").
-                - **Crucially:** If the report does not contain information to answer the question, you MUST explicitly state: "I'm sorry, but the research report does not contain specific information about that topic." Do not invent information.
-
-                ---
-                **<Research_Report>**
-                {report}
-                **</Research_Report>**
-                ---
-
-                **User's Question:** "{question}"
-
-                ---
-                **Your Final Answer:**
-                """
-                
-                print("-> Sending advanced Q&A prompt to Gemini...")
-                response = model.generate_content(answer_prompt)
-                print("-> Gemini response received.")
-                print(len(response.text), "characters in the response.")
-                final_answer = response.text
-                save_chat_message(user_id=user_id, role="assistant", content=final_answer, report_id=report_id)
-                # THIS EXPANDER WILL NOW ALWAYS BE DISPLAYED
-                with st.expander("Click to view the full research report used for this answer"):
-                    st.markdown(report)
-                if os.path.exists(raw_report_file) and raw_report_file :
-                    with open(raw_report_file, "r", encoding="utf-8") as f:
-                        report_content = f.read()
-
-                    with st.expander("Click to view the full raw research report used for this answer"):
-                        st.markdown(report_content)
-                else:
-                    st.warning("⚠️ Raw Report file not found or could not be read.")
-            
+    with st.spinner("🧠 Checking your stored research reports..."):
+        cached_report = find_reusable_report(user_id, topic, question)
+
+    if cached_report:
+        print("--- [CACHE CHECK] ✅ Using existing report. Skipping new research.")
+        st.success(f"💡 Found a relevant report on '{cached_report['topic']}'! Answering from cache.")
+        report = cached_report['content']
+        report_id = cached_report['id']
+        st.session_state["response_report"] = {"report_id": report_id, "report_topic": cached_report['topic']}
+        excerpts = find_follow_up_excerpts(cached_report['topic'], question) if REPORT_QA_CORPUS_EXCERPTS else ""
+        final_answer = render_stream(stream_answer_from_report(report, question, excerpts=excerpts))
+        return final_answer
 
-                
-            return final_answer
+    print("--- [CACHE CHECK] ℹ️ No stored report is relevant enough. Starting new research.")
+    reddit = reddit or get_reddit_client()
+    st.success("✅ Reddit client initialized.")
+
+    research = gather_reddit_research(reddit, topic)
+    if research is None:
+        return "❌ Could not find any relevant subreddits for this topic."
+    top_submissions, top_posts, top_comments = research
+    if not any([top_submissions, top_posts, top_comments]):
+        return "❌ No relevant posts or comments found matching the topic."
+    st.write(f"Found {len(top_submissions)} top submissions, {len(top_posts)} top posts, and {len(top_comments)} top comments.")
+
+    # Scrape the validated content
+    with st.spinner("Scraping detailed content..."):
+        consolidated_data = scrape_validated_posts(top_submissions, top_posts, top_comments)
+
+    raw_report_file = save_raw_data_to_file(consolidated_data, topic)
+    print(f"Raw report saved to: {raw_report_file}")
+    # Generate the comprehensive report
+    report = render_report_stream(stream_report_from_posts(topic, consolidated_data))
+    if is_failed_report(report):
+        # A failure notice is neither stored nor indexed, so no later request can "reuse" it.
+        print("--- [REPORT] ❌ Report generation failed; nothing is saved.")
+        st.error("❌ The research report could not be generated, so it was not saved.")
+        return report
+    report_file = save_report_to_file(report, topic)
+    # NEW: Save the generated report to the database
+    print("saving the report to the database...")
+    report_id = save_research_report(user_id=user_id, topic=topic, content=report)
+    remember_report(user_id, report_id, topic, report)
+    print(f"Report saved with ID: {report_id}")
+    st.session_state["response_report"] = {"report_id": report_id, "report_topic": topic}
+    st.success("✅ Research report generated and saved.")
+    # Answer the user's question based on the report
+    final_answer = render_stream(stream_answer_from_report(report, question))
+    save_chat_message(user_id=user_id, role="assistant", content=final_answer, report_id=report_id)
+    # THIS EXPANDER WILL NOW ALWAYS BE DISPLAYED
+    with st.expander("Click to view the full research report used for this answer"):
+        st.markdown(report)
+    if os.path.exists(raw_report_file) and raw_report_file :
+        with open(raw_report_file, "r", encoding="utf-8") as f:
+            report_content = f.read()
+
+        with st.expander("Click to view the full raw research report used for this answer"):
+            st.markdown(report_content)
     else:
-        print("--- [CACHE CHECK] ℹ️ there is no existing report making the first one.")
-        reddit = praw.Reddit(
-        client_id=os.getenv('REDDIT_CLIENT_ID'),
-        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-        user_agent=os.getenv('REDDIT_USER_AGENT', 'Social Media Agent by Faiq'),
-        username=os.getenv('REDDIT_USERNAME'),
-        password=os.getenv('REDDIT_PASSWORD')
-    )
-        st.success("✅ Reddit client initialized.")
-                # Find relevant subreddits
-        with st.spinner("Finding relevant subreddits..."):
-            subreddits = find_relevant_subreddits(topic, limit=5)
-        if not subreddits:
-            return "❌ Could not find any relevant subreddits for this topic."
-        st.write(f"Found potential subreddits: `{', '.join(subreddits)}`")
-
-        # Search and filter for the best posts
-        with st.spinner("Searching for top posts and comments..."):
-            top_submissions, top_posts, top_comments = search_and_filter_posts(reddit, subreddits, topic)
-        if not any([top_submissions, top_posts, top_comments]):
-            return "❌ No relevant posts or comments found matching the topic."
-        st.write(f"Found {len(top_submissions)} top submissions, {len(top_posts)} top posts, and {len(top_comments)} top comments.")
-
-        # Scrape the validated content
-        with st.spinner("Scraping detailed content..."):
-            consolidated_data = scrape_validated_posts(top_submissions, top_posts, top_comments)
-            raw_report_file = save_raw_data_to_file(consolidated_data, topic)
-        # Generate the comprehensive report
-        with st.spinner("Synthesizing data into a research report... (This may take a moment)"):
-            report = generate_report_from_posts(topic, consolidated_data)
-            report_file = save_report_to_file(report, topic)
-        # NEW: Save the generated report to the database
-        print("saving the report to the database...")
-        report_id = save_research_report(user_id=user_id, topic=topic, content=report)
-        print(f"Report saved with ID: {report_id}")
-        st.success("✅ Research report generated and saved.")
-        st.success("✅ Research report generated.")
-                # Answer the user's question based on the report
-        with st.spinner("Formulating final answer..."):
-            GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
-
-            # --- Step 2: The Advanced, Multi-Purpose Prompt ---
-            answer_prompt = f"""You are a world-class research analyst and communication expert. Your task is to provide the best possible answer to a user's question, using ONLY the provided research report as your source of truth.
-
-            **Your Thought Process (Follow these steps internally):**
-            1.  **Analyze the User's Question:** First, understand the *intent* behind the question. Are they asking for:
-                - A specific fact or data point?
-                - A general summary of a topic?
-                - A story, example, or personal experience (anecdote)?
-                - The overall sentiment or opinions of the community?
-            2.  **Scan the Report for Relevance:** Read through the entire research report and identify the 2-4 most relevant paragraphs, themes, or stories that directly address the user's question.
-            3.  **Synthesize and Structure:** Based on the user's intent, synthesize the relevant information into a perfectly structured answer. Do NOT just copy-paste from the report.
-
-            **Response Formatting Rules:**
-            - If the user is asking for **facts or data**, provide a direct answer followed by bullet points with the supporting data.
-            - If the user is asking for a **summary**, provide a concise paragraph followed by a clear, bulleted list of the key takeaways.
-            - If the user is asking for a **story or anecdote**, retell the most relevant story from the report in a narrative format.
-            - If the user is asking about **sentiment**, summarize the different viewpoints (e.g., "The community was largely positive, with some expressing concern about X...").
-            - **Crucially:** If the report does not contain information to answer the question, you MUST explicitly state: "I'm sorry, but the research report does not contain specific information about that topic." Do not invent information.
-
-            ---
-            **<Research_Report>**
-            {report}
-            **</Research_Report>**
-            ---
-
-            **User's Question:** "{question}"
-
-            ---
-            **Your Final Answer:**
-            """
-            
-            print("-> Sending advanced Q&A prompt to Gemini...")
-            response = model.generate_content(answer_prompt)
-            print("-> Gemini response received.")
-            print(len(response.text), "characters in the response.")
-            final_answer = response.text
-            save_chat_message(user_id=user_id, role="assistant", content=final_answer, report_id=report_id)
-            st.info("Displaying the full report below (click to expand).")
-            # THIS EXPANDER WILL NOW ALWAYS BE DISPLAYED
-            with st.expander("Click to view the full research report used for this answer"):
-                st.markdown(report)
-            if os.path.exists(raw_report_file) and raw_report_file :
-                with open(raw_report_file, "r", encoding="utf-8") as f:
-                    report_content = f.read()
-
-                with st.expander("Click to view the full raw research report used for this answer"):
-                    st.markdown(report_content)
-            else:
-                st.warning("⚠️Raw Report file not found or could not be read.")
-                    
-
-        return final_answer
-        
+        st.warning("⚠️ Raw Report file not found or could not be read.")
 
+    return final_answer
 
 
 def execute_url_posting_workflow(user_id: str,url: str) -> str:
@@ -411,15 +392,48 @@ def execute_url_posting_workflow(user_id: str,url: str) -> str:
 # --- ROUTER FUNCTION (The Brains of the Operation) ---
 # ==============================================================================
 
-def route_user_request(user_prompt: str, chat_history: List[Dict[str, str]]) -> dict:
+def route_user_request(user_prompt: str, chat_history: List[Dict[str, str]],
+                       history_context: Optional[ChatHistoryContext] = None) -> dict:
+    """
+    Decides which tool handles the user's prompt. Unambiguous prompts are routed by the local rules in
+    fast_router (no LLM call); everything else goes to the LLM router. Every decision is logged.
+    Pass the session's `history_context` so the router's history summary is updated incrementally.
+    """
+    start = time.perf_counter()
+    fast = fast_route(user_prompt, chat_history) if ROUTER_FAST_PATH else None
+    if fast is not None:
+        rule, decision = fast
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"--- [ROUTER] ⚡ Fast path '{rule}' ({elapsed_ms:.2f} ms): tool = '{decision['tool']}', args = {decision['args']}")
+        log_decision("rule", decision, elapsed_ms, user_prompt, rule=rule)
+        if ROUTER_SHADOW_SAMPLE_RATE and random.random() < ROUTER_SHADOW_SAMPLE_RATE:
+            threading.Thread(target=shadow_check_route, args=(user_prompt, list(chat_history), rule, decision), daemon=True).start()
+        return decision
+
+    decision = route_with_llm(user_prompt, chat_history, history_context)
+    log_decision("llm", decision, (time.perf_counter() - start) * 1000, user_prompt)
+    return decision
+
+
+def shadow_check_route(user_prompt: str, chat_history: List[Dict[str, str]], rule: str, decision: dict) -> None:
+    """Asks the LLM router about a prompt a rule already routed and logs whether they agree."""
+    start = time.perf_counter()
+    llm_decision = route_with_llm(user_prompt, chat_history)
+    log_decision("shadow", decision, (time.perf_counter() - start) * 1000, user_prompt,
+                 rule=rule, llm_tool=llm_decision.get("tool"))
+
+
+def route_with_llm(user_prompt: str, chat_history: List[Dict[str, str]],
+                   history_context: Optional[ChatHistoryContext] = None) -> dict:
     """
     Analyzes the user's prompt and chat history to decide which tool to use.
+    The history is bounded by ChatHistoryContext (recent messages plus a rolling summary of older ones).
     """
     print(f"\n--- [ROUTER] Analyzing user prompt with chat history...")
 
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
+    llm = get_chat_model("gpt-4o", temperature=0)
 
-    formatted_history = "\n".join([f"{msg['role']}: {msg['content']}" for msg in chat_history])
+    formatted_history = (history_context or ChatHistoryContext()).render(chat_history)
 
     router_prompt = f"""You are an intelligent routing agent. Your job is to analyze the latest user prompt in the context of the entire chat history and determine which of the four available tools is appropriate to call.
 
@@ -570,7 +584,7 @@ def execute_revision_workflow(user_id: str, revision_request: str) -> str:
 
     # LLM-based revision
     with st.spinner("Revising the post..."):
-        llm = ChatOpenAI(model="gpt-4o", temperature=0.7, openai_api_key=OPENAI_API_KEY)
+        llm = get_chat_model("gpt-4o", temperature=0.7)
         revision_prompt = f"""You are a copy editor. Revise the following social media post based on the user's instructions.
 
 <Original_Post_Text>
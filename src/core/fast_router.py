@@ -0,0 +1,152 @@
+# FILE: src/core/fast_router.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from src.config import ROUTER_DECISION_LOG, ROUTER_LOG_PROMPT_TEXT
+
+# --- Precompiled rules ---
+# Each rule only fires on prompts whose intent is unambiguous; anything else goes to the LLM router.
+
+_URL = re.compile(r"https?://[^\s<>\"')\]]+", re.IGNORECASE)
+# Words that may surround a URL without changing what the user wants ("write a post about this link: <url>").
+_URL_FILLER = re.compile(
+    r"^(?:please\s+|pls\s+|can\s+you\s+|could\s+you\s+)*"
+    r"(?:(?:create|write|make|generate|draft|do)\s+(?:me\s+)?(?:a\s+|an\s+)?(?:social\s+media\s+|linkedin\s+|twitter\s+|x\s+)?(?:post|tweet)"
+    r"|post|share|tweet|summari[sz]e\s+and\s+post)?"
+    r"\s*(?:about|on|for|from|of)?\s*(?:this|it|the|that)?\s*(?:link|article|url|page|blog(?:\s+post)?|website)?\s*"
+    r"(?:please|pls)?\s*[:\-–—.!]*\s*$",
+    re.IGNORECASE,
+)
+# "post this: <text>", "tweet the following - <text>", "publish this:\n<text>"
+_DIRECT_POST = re.compile(
+    r"^\s*(?:please\s+)?(?:post|publish|tweet|share)\s+(?:this|the\s+following|exactly\s+this|this\s+text|this\s+as\s+is)"
+    r"\s*(?:[:\-–—]|\n)\s*(?P<text>\S.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+# "make the title shorter", "change the title to '...'", "shorten the headline", "rewrite the title"
+_TITLE_EDIT = re.compile(
+    r"^\s*(?:please\s+|can\s+you\s+|could\s+you\s+)*"
+    r"(?:(?:make|change|shorten|rewrite|rephrase|edit|update|fix|improve|rename)\s+(?:the\s+|its\s+|this\s+)?(?:post\s+)?(?:title|headline)\b"
+    r"|(?:the\s+)?(?:title|headline)\s+(?:is\s+|should\s+be\s+)?(?:too\s+long|too\s+short|shorter|longer))",
+    re.IGNORECASE,
+)
+# "make it shorter", "make the post more casual", "make it less formal"
+_STYLE_EDIT = re.compile(
+    r"^\s*(?:please\s+|can\s+you\s+|could\s+you\s+)*(?:make|keep)\s+(?:it|this|the\s+post|the\s+text)\s+"
+    r"(?:a\s+bit\s+|much\s+|slightly\s+)?(?:shorter|longer|punchier|simpler|more\s+\w+|less\s+\w+)\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+# Direct-post text shorter than this is more likely a command than a post ("post this: now").
+MIN_DIRECT_POST_CHARS = 20
+MAX_EDIT_PROMPT_WORDS = 40
+
+
+def _has_draft(chat_history: List[Dict[str, str]]) -> bool:
+    """True if an assistant message holds a generated post (what execute_revision_workflow revises)."""
+    return any(msg.get("role") == "assistant" and "**Post Text:**" in (msg.get("content") or "") for msg in chat_history)
+
+
+def fast_route(user_prompt: str, chat_history: List[Dict[str, str]]) -> Optional[tuple[str, dict]]:
+    """
+    Routes unambiguous prompts without the LLM: a URL with nothing but posting filler around it,
+    "post this: <text>", and short title/style edits when there is a draft to revise.
+    Returns (rule name, decision) in route_user_request's schema, or None when the LLM should decide.
+    """
+    prompt = (user_prompt or "").strip()
+    if not prompt:
+        return None
+
+    urls = _URL.findall(prompt)
+    if len(urls) == 1:
+        rest = prompt.replace(urls[0], " ")
+        if "?" not in rest and _URL_FILLER.match(rest.strip()):
+            return "url", {"tool": "url_poster", "args": {"url": urls[0].rstrip(".,;:!")}}
+
+    direct = _DIRECT_POST.match(prompt)
+    if direct and len(direct.group("text").strip()) >= MIN_DIRECT_POST_CHARS:
+        return "direct_post", {"tool": "direct_post", "args": {"text_to_post": direct.group("text").strip()}}
+
+    if len(prompt.split()) <= MAX_EDIT_PROMPT_WORDS and not urls and _has_draft(chat_history):
+        if _TITLE_EDIT.match(prompt):
+            return "title_edit", {"tool": "revise_post", "args": {"revision_request": prompt}}
+        if _STYLE_EDIT.match(prompt):
+            return "style_edit", {"tool": "revise_post", "args": {"revision_request": prompt}}
+    return None
+
+
+# --- Decision log ---
+# One JSON line per routing decision, so rule hit rates and rule/LLM agreement can be measured offline.
+
+_log_lock = threading.Lock()
+
+
+def log_decision(source: str, decision: dict, elapsed_ms: float, user_prompt: str,
+                 rule: Optional[str] = None, llm_tool: Optional[str] = None) -> None:
+    """
+    Appends a decision to ROUTER_DECISION_LOG (disabled when empty). `source` is "rule" or "llm";
+    `llm_tool` is the LLM's choice for a prompt a rule also routed (shadow checks).
+    The prompt is stored as a hash and a length; its text only with ROUTER_LOG_PROMPT_TEXT.
+    """
+    if not ROUTER_DECISION_LOG:
+        return
+    entry = {
+        "ts": round(time.time(), 3),
+        "source": source,
+        "rule": rule,
+        "tool": decision.get("tool"),
+        "llm_tool": llm_tool,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "prompt_chars": len(user_prompt or ""),
+        "prompt_sha256": hashlib.sha256((user_prompt or "").encode("utf-8")).hexdigest()[:16],
+    }
+    if ROUTER_LOG_PROMPT_TEXT:
+        entry["prompt_preview"] = (user_prompt or "")[:80]
+    try:
+        with _log_lock:
+            directory = os.path.dirname(ROUTER_DECISION_LOG)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(ROUTER_DECISION_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not write router decision log: {e}")
+
+
+def summarize_decision_log(path: str = ROUTER_DECISION_LOG) -> dict:
+    """Rule hit rate, per-rule counts, agreement with the LLM on shadow-checked prompts, and latency by source."""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    routed = [e for e in entries if e["source"] in ("rule", "llm")]
+    rule_hits = [e for e in routed if e["source"] == "rule"]
+    shadowed = [e for e in entries if e["source"] == "shadow"]
+    agreed = sum(1 for e in shadowed if e["tool"] == e["llm_tool"])
+
+    def mean_ms(source: str) -> Optional[float]:
+        times = [e["elapsed_ms"] for e in routed if e["source"] == source]
+        return round(sum(times) / len(times), 3) if times else None
+
+    return {
+        "decisions": len(routed),
+        "rule_hit_rate": round(len(rule_hits) / len(routed), 3) if routed else None,
+        "rule_hits": dict(Counter(e["rule"] for e in rule_hits)),
+        "shadow_checked": len(shadowed),
+        "rule_llm_agreement": round(agreed / len(shadowed), 3) if shadowed else None,
+        "disagreements": [{"rule": e["rule"], "tool": e["tool"], "llm_tool": e["llm_tool"],
+                           "prompt": e.get("prompt_preview") or e.get("prompt_sha256")}
+                          for e in shadowed if e["tool"] != e["llm_tool"]],
+        "mean_ms": {"rule": mean_ms("rule"), "llm": mean_ms("llm")},
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(summarize_decision_log(), indent=2, ensure_ascii=False))
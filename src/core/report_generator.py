@@ -1,11 +1,13 @@
 import os
 import re
 import json
+import math
 import time
 import random
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import TypedDict, Optional, List, Dict, Any, Tuple
+from typing import TypedDict, Optional, List, Dict, Any, Tuple, Iterable, Iterator
 
 # --- Third-Party Libraries ---
 import bcrypt
@@ -24,14 +26,61 @@ from src.config import (
     OPENAI_API_KEY, FIRE_CRAWL_API_KEY, GEMINI_API_KEY,
     TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET,
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
-    SUPABASE_URL, SUPABASE_KEY
+    SUPABASE_URL, SUPABASE_KEY,
+    REDDIT_FILTER_ENABLED, REPORT_TURN_TOKEN_BUDGET,
+    REPORT_MODE, REPORT_SHARD_TOKEN_BUDGET, REPORT_MAP_WORKERS, REPORT_MAX_SHARDS
 )
+from src.services.llm_provider import get_gemini_model, stream_text
+from src.services.report_index import REPORT_FAILED_HEADING, NO_CONTENT_NOTICE
+from src.utils.content_filter import ContentFilter, filter_consolidated_data
+from src.utils.context_packer import pack_context
+
+
+# Shared by every prompt that asks for the final report.
+REPORT_SECTIONS_PROMPT = """        Structure the report with the following detailed sections:
+        1.  **Executive Summary:** A high-level overview of the entire discussion.
+        2.  **Key Themes & Sub-Topics:** A deep dive into the 3-5 main themes that emerged. For each theme, explain it in detail.
+        3.  **Prevailing Sentiments:** Analyze the overall mood. Is it positive, negative, mixed, concerned, excited? Use direct (but anonymous) sentiment examples.
+        4.  **Common Questions & Unanswered Problems:** What are people consistently asking? What problems are they trying to solve?
+        5.  **Notable Stories & Anecdotes:** Extract and retell 2-3 specific, compelling user stories or personal experiences that were shared. These are crucial for adding a human element. Quote short, impactful parts if necessary.
+        6.  **Actionable Insights & Data Points:** List any specific advice, statistics, or hard facts that were mentioned.
+
+        Your final output should be ONLY the complete markdown report. Be as detailed and comprehensive as possible.
+"""
 
 
 def generate_report_from_posts(topic: str, consolidated_data: list[dict]) -> str:
+    """Generates the full report in one go; see `stream_report_from_posts`."""
+    return "".join(stream_report_from_posts(topic, consolidated_data))
+
+
+def _stream_final_report(chunks: Iterable) -> Iterator[str]:
+    """Yields the text of a streamed final-report response as it arrives; API errors become a failure notice."""
+    size = 0
+    try:
+        for text in stream_text(chunks):
+            size += len(text)
+            yield text
+        print(f"✅ Final deep report generated. Size: {size} characters.")
+    except Exception as e:
+        print(f"❌ An error occurred during Gemini report generation: {e}")
+        yield f"{REPORT_FAILED_HEADING}\n\nAn error occurred while communicating with the Gemini API: {e}"
+
+
+def _lazy(start_stream) -> Iterator:
+    """Defers starting a streamed call until iteration, so errors raised when it starts are handled like mid-stream ones."""
+    yield from start_stream()
+
+
+def stream_report_from_posts(topic: str, consolidated_data: list[dict]) -> Iterator[str]:
     """
-    Generates a deep, narrative-rich report from consolidated Reddit data using a
-    two-turn conversational approach with the Gemini API.
+    Generates a deep, narrative-rich report from consolidated Reddit data with the Gemini API,
+    yielding the final report as it is written so the UI can render it incrementally.
+    The data is packed whole-item by priority into at most two turns of REPORT_TURN_TOKEN_BUDGET tokens
+    and the report is requested in a chat (one turn, or two when the data needs them). With REPORT_MODE
+    "auto", data that would not fit whole in two turns is built map-reduce style instead, so nothing is
+    dropped; "chat" always uses the chat (dropping what does not fit), "map_reduce" always summarises
+    shards in parallel.
     """
     print("\n📝 Generating DEEP report from consolidated Reddit data using Gemini...")
 
@@ -39,47 +88,52 @@ def generate_report_from_posts(topic: str, consolidated_data: list[dict]) -> str
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     if not GEMINI_API_KEY:
         print("⚠️ GEMINI_API_KEY not found. Cannot generate Gemini report.")
-        return "# Report Generation Failed\n\nGemini API Key is not configured."
+        yield f"{REPORT_FAILED_HEADING}\n\nGemini API Key is not configured."
+        return
 
-    genai.configure(api_key=GEMINI_API_KEY)
     # Using gemini-1.5-flash for speed and its large context window.
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
-    
+    model = get_gemini_model(api_key=GEMINI_API_KEY)
+
+    # --- Step 2: Pack the data into token-bounded turns ---
+    if REDDIT_FILTER_ENABLED:
+        content_filter = ContentFilter.from_config()
+        consolidated_data = filter_consolidated_data(consolidated_data, content_filter)
+        print(f"-> Low-value content dropped before building the context: {content_filter.summary()}")
+    print("-> Packing consolidated data into the LLM prompts...")
+    packed = pack_context(consolidated_data, REPORT_TURN_TOKEN_BUDGET, max_turns=2)
+
+    if not packed.turns:
+        print("⚠️ No valid data was formatted. Aborting report generation.")
+        yield f"# Report on {topic}\n\n{NO_CONTENT_NOTICE}"
+        return
+
+    fits_chat = not packed.dropped and not packed.trimmed_comments
+    if REPORT_MODE == "map_reduce" or (REPORT_MODE == "auto" and not fits_chat):
+        yield from stream_report_map_reduce(topic, consolidated_data, model)
+        return
+
     # Start a chat session to maintain context between the two turns
     chat = model.start_chat()
 
-    # --- Step 2: Format the data into a single text block ---
-    # (This part is similar to before, but with better print statements)
-    llm_context_text = ""
-    print("-> Formatting consolidated data for the LLM prompts...")
-
-    for i, item in enumerate(consolidated_data):
-        item_type = item.get('type', 'unknown')
-        if item_type == 'full_submission':
-            llm_context_text += f"\n\n--- Discussion Thread Start ---\nTitle: {item.get('title', 'N/A')}\nPost Body: {item.get('selftext', 'No body text.')}\n"
-            if item.get('top_comments'):
-                llm_context_text += "Key Comments:\n"
-                for c in item['top_comments']:
-                    llm_context_text += f"- (Score: {c.get('score', 0)}) {c.get('body', '')}\n"
-            llm_context_text += "--- Discussion Thread End ---\n"
-        elif item_type == 'individual_post':
-            llm_context_text += f"\n\n--- Relevant Post ---\nTitle: {item.get('title', 'N/A')}\nPost Body: {item.get('selftext', '')}\n--- End Relevant Post ---\n"
-        elif item_type == 'comment_nuggets':
-            llm_context_text += f"\n\n--- Highly Relevant Individual Comments ---\n"
-            if item.get('comments'):
-                for c in item['comments']:
-                    llm_context_text += f"- (Score: {c.get('score', 0)}) \"{c.get('body', '')}\"\n"
-            llm_context_text += "--- End Individual Comments ---\n"
-    
-    if not llm_context_text.strip():
-        print("⚠️ No valid data was formatted. Aborting report generation.")
-        return f"# Report on {topic}\n\nNo relevant content could be processed."
+    # --- Step 3: Everything fits in one turn: ask for the report directly ---
+    print(f"-> Context packed: {packed.summary()}.")
+    if len(packed.turns) == 1:
+        prompt = f"""You are a world-class research analyst building a deep and comprehensive knowledge base about the topic: '{topic}'.
+        Below is raw data scraped from Reddit. This data includes full discussion threads, individual relevant posts, and curated 'golden nugget' comments.
+
+        <raw_reddit_data>
+        {packed.turns[0]}
+        </raw_reddit_data>
 
-    # --- Step 3: Split the data for the two-turn conversation ---
-    print(f"-> Total context size: {len(llm_context_text)} characters. Splitting into two turns.")
-    midpoint = len(llm_context_text) // 2
-    part1_text = llm_context_text[:midpoint]
-    part2_text = llm_context_text[midpoint:]
+        Using this information, generate a single, final, comprehensive report. The report should be very detailed and well-structured to serve as a knowledge base for answering questions.
+
+{REPORT_SECTIONS_PROMPT}
+        """
+        print("\n-> Sending the data and requesting the final report...")
+        yield from _stream_final_report(_lazy(lambda: chat.send_message(prompt, stream=True)))
+        return
+
+    part1_text, part2_text = packed.turns
 
     # --- Step 4: First Turn - Ingest and Initial Analysis ---
     prompt1 = f"""You are a world-class research analyst building a deep and comprehensive knowledge base about the topic: '{topic}'.
@@ -108,24 +162,113 @@ def generate_report_from_posts(topic: str, consolidated_data: list[dict]) -> str
 
         Now, using the information from BOTH Part 1 and Part 2, generate a single, final, comprehensive report. The report should be very detailed and well-structured to serve as a knowledge base for answering questions.
 
-        Structure the report with the following detailed sections:
-        1.  **Executive Summary:** A high-level overview of the entire discussion.
-        2.  **Key Themes & Sub-Topics:** A deep dive into the 3-5 main themes that emerged. For each theme, explain it in detail.
-        3.  **Prevailing Sentiments:** Analyze the overall mood. Is it positive, negative, mixed, concerned, excited? Use direct (but anonymous) sentiment examples.
-        4.  **Common Questions & Unanswered Problems:** What are people consistently asking? What problems are they trying to solve?
-        5.  **Notable Stories & Anecdotes:** Extract and retell 2-3 specific, compelling user stories or personal experiences that were shared. These are crucial for adding a human element. Quote short, impactful parts if necessary.
-        6.  **Actionable Insights & Data Points:** List any specific advice, statistics, or hard facts that were mentioned.
-
-        Your final output should be ONLY the complete markdown report. Be as detailed and comprehensive as possible.
+{REPORT_SECTIONS_PROMPT}
         """
         
-        print("\n-> Sending Part 2 and requesting the final report...")
-        final_response = chat.send_message(prompt2)
-        final_report = final_response.text
-        
-        print(f"✅ Final deep report generated. Size: {len(final_report)} characters.")
-        return final_report
-
     except Exception as e:
         print(f"❌ An error occurred during Gemini report generation: {e}")
-        return f"# Report Generation Failed\n\nAn error occurred while communicating with the Gemini API: {e}"
+        yield f"{REPORT_FAILED_HEADING}\n\nAn error occurred while communicating with the Gemini API: {e}"
+        return
+
+    print("\n-> Sending Part 2 and requesting the final report...")
+    yield from _stream_final_report(_lazy(lambda: chat.send_message(prompt2, stream=True)))
+
+
+# ==============================================================================
+# --- MAP-REDUCE REPORTS ---
+# ==============================================================================
+
+NOTE_FIELDS = ("themes", "sentiments", "questions", "anecdotes", "data_points")
+
+
+def summarize_shard(topic: str, shard_text: str, shard_number: int, n_shards: int, model) -> Optional[dict]:
+    """Map step: condenses one shard of Reddit data into structured notes, or None if the call failed."""
+    prompt = f"""You are a research analyst taking notes on Reddit discussions about the topic: '{topic}'.
+    This is part {shard_number} of {n_shards} of the raw data; other analysts are reading the other parts.
+
+    <raw_reddit_data>
+    {shard_text}
+    </raw_reddit_data>
+
+    Extract detailed notes from THIS part only. Respond with ONLY a JSON object with these keys, each a list of strings:
+    - "themes": the main themes and sub-topics, each explained in one or two sentences
+    - "sentiments": the prevailing moods, each with a short anonymous example
+    - "questions": questions people keep asking and problems they are trying to solve
+    - "anecdotes": specific user stories or personal experiences, retold with short quotes
+    - "data_points": concrete advice, statistics, tools, versions or hard facts that were mentioned
+    """
+    try:
+        response = model.generate_content(prompt)
+        json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+        if not json_match:
+            # Unstructured notes are still useful to the reduce step.
+            return {"notes": response.text.strip()}
+        notes = json.loads(json_match.group(0))
+        return {field: notes.get(field, []) for field in NOTE_FIELDS}
+    except Exception as e:
+        print(f"⚠️ Shard {shard_number}/{n_shards} could not be summarised: {e}")
+        return None
+
+
+def generate_report_map_reduce(topic: str, consolidated_data: list[dict], model=None) -> str:
+    """Builds the full map-reduce report in one go; see `stream_report_map_reduce`."""
+    return "".join(stream_report_map_reduce(topic, consolidated_data, model))
+
+
+def stream_report_map_reduce(topic: str, consolidated_data: list[dict], model=None) -> Iterator[str]:
+    """
+    Builds the report map-reduce style: the data is split into shards of REPORT_SHARD_TOKEN_BUDGET
+    tokens, every shard is summarised into structured notes concurrently (REPORT_MAP_WORKERS at a time),
+    and one final call merges all notes into the six-section report. Latency is about one shard plus the
+    merge, and the corpus is no longer limited to what fits in one conversation.
+    """
+    model = model or get_gemini_model()
+    packed = pack_context(consolidated_data, REPORT_SHARD_TOKEN_BUDGET, max_turns=None)
+    if len(packed.turns) > REPORT_MAX_SHARDS:
+        # Too many shards at the default size: grow the shards (up to a full chat turn) rather than drop data.
+        shard_budget = min(REPORT_TURN_TOKEN_BUDGET, math.ceil(sum(packed.turn_tokens) / REPORT_MAX_SHARDS * 1.15))
+        print(f"-> {len(packed.turns)} shards exceed REPORT_MAX_SHARDS; re-packing with {shard_budget:,}-token shards.")
+        packed = pack_context(consolidated_data, shard_budget, max_turns=None)
+    shards = packed.turns[:REPORT_MAX_SHARDS]
+    if not shards:
+        yield f"# Report on {topic}\n\n{NO_CONTENT_NOTICE}"
+        return
+    left_out_tokens = sum(packed.turn_tokens[len(shards):])
+    if left_out_tokens:
+        print(f"⚠️ Only the first {len(shards)} of {len(packed.turns)} shards are summarised (REPORT_MAX_SHARDS).")
+    print(f"-> Map-reduce report: {packed.summary()}.")
+
+    print(f"\n-> Map: summarising {len(shards)} shards with up to {REPORT_MAP_WORKERS} parallel Gemini calls...")
+    summarize = lambda numbered: summarize_shard(topic, numbered[1], numbered[0], len(shards), model)
+    with ThreadPoolExecutor(max_workers=max(1, min(REPORT_MAP_WORKERS, len(shards)))) as executor:
+        # executor.map keeps shard order, so the notes read in priority order.
+        shard_notes = list(executor.map(summarize, enumerate(shards, start=1)))
+    shard_notes = [notes for notes in shard_notes if notes]
+    print(f"✅ {len(shard_notes)} of {len(shards)} shards summarised.")
+    if not shard_notes:
+        yield f"{REPORT_FAILED_HEADING}\n\nNone of the data shards could be summarised by the Gemini API."
+        return
+
+    notes_text = "\n\n".join(
+        f"<notes_part_{i}>\n{json.dumps(notes, ensure_ascii=False, indent=1)}\n</notes_part_{i}>"
+        for i, notes in enumerate(shard_notes, start=1)
+    )
+    reduce_prompt = f"""You are a world-class research analyst building a deep and comprehensive knowledge base about the topic: '{topic}'.
+        Several analysts each read one part of the raw data scraped from Reddit (full discussion threads, individual relevant posts,
+        and curated 'golden nugget' comments) and wrote structured notes. Here are all of their notes:
+
+        {notes_text}
+
+        Merge these notes into a single, final, comprehensive report. Combine themes that overlap across parts, weigh how often
+        a point comes up, and keep the concrete stories, quotes and data points. The report should be very detailed and
+        well-structured to serve as a knowledge base for answering questions.
+
+{REPORT_SECTIONS_PROMPT}
+        """
+    print("\n-> Reduce: merging the notes into the final report...")
+    yield from _stream_final_report(_lazy(lambda: model.generate_content(reduce_prompt, stream=True)))
+    if left_out_tokens:
+        total_tokens = sum(packed.turn_tokens)
+        yield (f"\n\n---\n*Data coverage: {len(packed.turns) - len(shards)} of {len(packed.turns)} data shards "
+               f"(~{left_out_tokens:,} of {total_tokens:,} tokens, the lowest-priority content) were left out of this "
+               f"report because of the REPORT_MAX_SHARDS limit of {REPORT_MAX_SHARDS}.*\n")
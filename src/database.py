@@ -86,6 +86,29 @@ def get_latest_report(user_id: str) -> tuple[bool, Optional[Dict[str, Any]]]:
         print(f"⚠️ DB: Unexpected error fetching latest report: {e}")
         return False, None
 
+
+def get_recent_reports(user_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Retrieves the most recent research reports, newest first: a user's own, or every user's when user_id is None.
+    Returns an empty list if the database is disabled or the query fails.
+    """
+    if not supabase:
+        return []
+
+    print(f"-> DB: Fetching up to {limit} recent reports{f' for user {user_id[-6:]}' if user_id else ' (all users)'}...")
+
+    try:
+        query = supabase.table('social_media_research_reports').select('id, user_id, topic, content, created_at')
+        if user_id:
+            query = query.eq('user_id', user_id)
+        response = query.order('created_at', desc=True).limit(limit).execute()
+        print(f"✅ DB: Found {len(response.data or [])} stored reports.")
+        return response.data or []
+
+    except Exception as e:
+        print(f"⚠️ DB: Unexpected error fetching recent reports: {e}")
+        return []
+
     
 def verify_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     """
@@ -160,7 +183,7 @@ def get_chat_history(user_id: str) -> List[Dict[str, Any]]:
     if not supabase: return []
     
     print(f"-> Fetching chat history from DB for user {user_id[-6:]}...")
-    response = supabase.table('social_media_chat_history').select('role, content').eq('user_id', user_id).order('created_at', desc=False).execute()
+    response = supabase.table('social_media_chat_history').select('role, content, report_id').eq('user_id', user_id).order('created_at', desc=False).execute()
     
     if response.data:
         print(f"✅ Found {len(response.data)} previous messages.")
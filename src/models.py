@@ -10,3 +10,100 @@ class AgentState(TypedDict):
     url: Optional[str]
     scraped_content: Optional[str]
 
+
+
+class RedditPost:
+    """
+    Compact, detached snapshot of a Reddit submission, filled once at fetch time.
+    Unlike a lazy PRAW Submission, reading its attributes never triggers network I/O.
+    """
+    __slots__ = ("id", "subreddit", "title", "selftext", "url", "permalink", "author", "score", "num_comments", "created_utc", "comments")
+
+    def __init__(self, id: str, subreddit: str, title: str, selftext: str, url: str, permalink: str,
+                 author: Optional[str], score: int, num_comments: int, created_utc: float,
+                 comments: Optional[list] = None):
+        self.id = id
+        self.subreddit = subreddit
+        self.title = title
+        self.selftext = selftext
+        self.url = url
+        self.permalink = permalink
+        self.author = author
+        self.score = score
+        self.num_comments = num_comments
+        self.created_utc = created_utc
+        # Comment forest (RedditComment records, forest order) gathered while scoring, if any.
+        self.comments = comments if comments is not None else []
+
+    @classmethod
+    def from_praw(cls, submission) -> "RedditPost":
+        """Copies the fields we use out of an already-loaded PRAW Submission (e.g. a search listing item)."""
+        return cls(
+            id=submission.id,
+            subreddit=submission.subreddit.display_name,
+            title=submission.title or "",
+            selftext=submission.selftext or "",
+            url=submission.url,
+            permalink=submission.permalink,
+            author=submission.author.name if submission.author else None,
+            score=submission.score,
+            num_comments=submission.num_comments,
+            created_utc=submission.created_utc,
+        )
+
+    def to_dict(self, include_comments: bool = False) -> dict:
+        data = {field: getattr(self, field) for field in self.__slots__ if field != "comments"}
+        if include_comments:
+            data["comments"] = [comment.to_dict() for comment in self.comments]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RedditPost":
+        data = dict(data)
+        comments = [RedditComment.from_dict(c) for c in data.pop("comments", [])]
+        return cls(**data, comments=comments)
+
+    def __repr__(self) -> str:
+        return f"RedditPost(id={self.id!r}, subreddit={self.subreddit!r}, score={self.score})"
+
+
+class RedditComment:
+    """Compact, detached snapshot of a Reddit comment, filled once at fetch time."""
+    __slots__ = ("id", "submission_id", "parent_id", "body", "author", "score", "depth", "created_utc", "relevance")
+
+    def __init__(self, id: str, submission_id: str, parent_id: str, body: str,
+                 author: Optional[str], score: int, depth: int, created_utc: float, relevance: int = 0):
+        self.id = id
+        self.submission_id = submission_id
+        self.parent_id = parent_id
+        self.body = body
+        self.author = author
+        self.score = score
+        self.depth = depth
+        self.created_utc = created_utc
+        # Keyword relevance computed during scoring, carried forward to consolidation.
+        self.relevance = relevance
+
+    @classmethod
+    def from_praw(cls, comment) -> "RedditComment":
+        """Copies the fields we use out of a PRAW Comment taken from a fetched comment forest."""
+        return cls(
+            id=comment.id,
+            submission_id=comment.link_id.split("_", 1)[-1],
+            parent_id=comment.parent_id,
+            body=comment.body or "",
+            author=comment.author.name if comment.author else None,
+            score=comment.score,
+            depth=getattr(comment, "depth", 0),
+            created_utc=comment.created_utc,
+        )
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RedditComment":
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f"RedditComment(id={self.id!r}, submission_id={self.submission_id!r}, score={self.score})"
@@ -0,0 +1,203 @@
+# FILE: src/services/comment_fetcher.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+import praw
+
+from src.config import (
+    REDDIT_COMMENT_WORKERS,
+    REDDIT_COMMENT_REQUESTS_PER_SUBMISSION, REDDIT_COMMENT_MAX_DEPTH, REDDIT_COMMENT_SECONDS_PER_SUBMISSION,
+    REDDIT_COMMENT_REQUESTS_TOTAL, REDDIT_COMMENT_SECONDS_TOTAL
+)
+from src.models import RedditPost, RedditComment
+from src.services import reddit_cache
+from src.services.reddit_pool import leased_reddit
+from src.utils.rate_limiter import RateLimiter
+
+
+class CommentBudget:
+    """
+    Limits for comment-tree expansion. Any limit left as None is unbounded.
+    - max_requests: Reddit requests (initial load + one per "load more comments" stub)
+    - max_depth: deepest reply level kept (0 = top-level comments only)
+    - max_seconds: wall time spent expanding
+    """
+
+    def __init__(self, max_requests: Optional[int] = None, max_depth: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.max_requests = max_requests
+        self.max_depth = max_depth
+        self.max_seconds = max_seconds
+
+    @classmethod
+    def per_submission_default(cls) -> "CommentBudget":
+        return cls(REDDIT_COMMENT_REQUESTS_PER_SUBMISSION, REDDIT_COMMENT_MAX_DEPTH, REDDIT_COMMENT_SECONDS_PER_SUBMISSION)
+
+    @classmethod
+    def global_default(cls) -> "CommentBudget":
+        return cls(REDDIT_COMMENT_REQUESTS_TOTAL, None, REDDIT_COMMENT_SECONDS_TOTAL)
+
+
+class _BudgetTracker:
+    """Thread-safe request counter and deadline for one budget."""
+
+    def __init__(self, budget: CommentBudget):
+        self.budget = budget
+        self.requests = 0
+        self.deadline = time.monotonic() + budget.max_seconds if budget.max_seconds is not None else None
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        """Reserves one request if the budget allows it."""
+        with self._lock:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                return False
+            if self.budget.max_requests is not None and self.requests >= self.budget.max_requests:
+                return False
+            self.requests += 1
+            return True
+
+
+def _within_depth(item, max_depth: Optional[int]) -> bool:
+    return max_depth is None or getattr(item, "depth", 0) <= max_depth
+
+
+def rebase_depths(items: list, depth: int) -> list:
+    """
+    Makes the depths of a batch a stub loaded absolute again, in place: its shallowest items are put at
+    the stub's own `depth` and the rest shifted with them. "Continue this thread" stubs load the subtree
+    as a new listing rooted at the stub's parent, so PRAW counts their depths from that parent instead
+    of the submission; "load more" batches already sit at the stub's depth and are left unchanged.
+    """
+    depths = [getattr(item, "depth", None) for item in items]
+    known = [d for d in depths if d is not None]
+    offset = depth - min(known) if known else 0
+    if offset:
+        for item, item_depth in zip(items, depths):
+            if item_depth is not None:
+                item.depth = item_depth + offset
+    return items
+
+
+def _next_stub(pending: list):
+    """The stub to expand next: the shallowest one (closest to the post), then the one hiding the most comments."""
+    return min(pending, key=lambda more: (getattr(more, "depth", 0), -(getattr(more, "count", 0) or 0)))
+
+
+def _expand_submission_comments(reddit, post: RedditPost, budget: CommentBudget, global_tracker: _BudgetTracker, rate_limiter: Optional[RateLimiter]) -> Dict[str, Any]:
+    """
+    Loads a submission's comment forest and expands "load more comments" stubs one request
+    at a time until the tree is complete or a budget runs out. Returns whatever was fetched,
+    as detached RedditComment records.
+    Only stubs within the depth budget are ever expanded, and they are chosen here (shallowest first)
+    rather than by `replace_more`, which would pick the largest stub anywhere in the tree.
+    """
+    local_tracker = _BudgetTracker(budget)
+    result = {"comments": [], "complete": False, "requests": 0}
+
+    # The first access to `.comments` fetches the submission page with its top-level comments.
+    if not (local_tracker.try_spend() and global_tracker.try_spend()):
+        return result
+    if rate_limiter:
+        rate_limiter.acquire()
+    # One client per worker for the whole expansion: the forest and its stubs keep using it lazily.
+    with leased_reddit(reddit) as client:
+        forest = client.submission(id=post.id).comments
+        result["requests"] += 1
+
+        fetched, pending = [], []
+
+        def take(items, parent=None) -> None:
+            for item in items:
+                if isinstance(item, praw.models.MoreComments):
+                    # Stubs below the depth budget would only load comments we are going to drop anyway.
+                    if _within_depth(item, budget.max_depth):
+                        if parent is not None and getattr(item, "submission", None) is None:
+                            # Nested stubs need their submission to be expanded (replace_more sets it the same way).
+                            item.submission = parent.submission
+                        pending.append(item)
+                else:
+                    fetched.append(item)
+
+        take(forest.list())
+        while True:
+            if not pending:
+                result["complete"] = True
+                break
+            if not (local_tracker.try_spend() and global_tracker.try_spend()):
+                break
+            if rate_limiter:
+                rate_limiter.acquire()
+            more = _next_stub(pending)
+            pending.remove(more)
+            loaded = more.comments()
+            result["requests"] += 1
+            # "Continue this thread" stubs load a whole sub-forest; "load more" stubs a flat list.
+            items = loaded.list() if hasattr(loaded, "list") else list(loaded)
+            # Depth-checked against the submission, not the sub-forest's own root.
+            take(rebase_depths(items, getattr(more, "depth", 0)), parent=more)
+
+        seen = set()
+        for comment in fetched:
+            if comment.id not in seen and _within_depth(comment, budget.max_depth):
+                seen.add(comment.id)
+                result["comments"].append(RedditComment.from_praw(comment))
+    return result
+
+
+def fetch_comment_forests(
+    reddit,
+    posts: list[RedditPost],
+    per_submission_budget: Optional[CommentBudget] = None,
+    global_budget: Optional[CommentBudget] = None,
+    max_workers: int = REDDIT_COMMENT_WORKERS,
+    rate_limiter: Optional[RateLimiter] = None,
+    use_cache: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Expands the comment trees of many submissions in parallel under request, depth and time budgets.
+    Each worker leases its own client from `reddit` (see `leased_reddit`) for the submission it expands.
+    Returns {submission_id: {"comments": [...], "complete": bool, "requests": int}}.
+    Submissions whose budget ran out keep the partial forest fetched so far.
+    With `use_cache`, forests still fresh in the local Reddit cache are served without any request.
+    """
+    forests: Dict[str, Dict[str, Any]] = {}
+    if use_cache:
+        for post in posts:
+            cached = reddit_cache.load_comments(post)
+            if cached is not None:
+                forests[post.id] = cached
+        print(f"🗄️ {len(forests)}/{len(posts)} comment forests served from the local cache.")
+    to_fetch = [post for post in posts if post.id not in forests]
+    if not to_fetch:
+        return forests
+
+    per_submission_budget = per_submission_budget or CommentBudget.per_submission_default()
+    global_tracker = _BudgetTracker(global_budget or CommentBudget.global_default())
+    print(f"💬 Expanding comments for {len(to_fetch)} submissions with {max_workers} workers "
+          f"(≤{per_submission_budget.max_requests} requests, depth ≤{per_submission_budget.max_depth}, "
+          f"≤{per_submission_budget.max_seconds}s each)...")
+
+    def run(post: RedditPost) -> Dict[str, Any]:
+        try:
+            return _expand_submission_comments(reddit, post, per_submission_budget, global_tracker, rate_limiter)
+        except Exception as e:
+            print(f"   ⚠️ Failed to fetch comments for {post.id}: {e}")
+            return {"comments": [], "complete": False, "requests": 0}
+
+    if max_workers <= 1 or len(to_fetch) <= 1:
+        results = [run(post) for post in to_fetch]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch))) as executor:
+            results = list(executor.map(run, to_fetch))
+
+    for post, result in zip(to_fetch, results):
+        forests[post.id] = result
+        # Failed fetches (no requests made) are not cached so they are retried next time.
+        if use_cache and result["requests"] > 0:
+            reddit_cache.store_comments(post, result)
+    partial = sum(1 for result in results if not result["complete"])
+    print(f"✅ Comment expansion done: {global_tracker.requests} requests, {partial} partial forests.")
+    return forests
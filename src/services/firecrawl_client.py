@@ -26,6 +26,7 @@ from src.config import (
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
     SUPABASE_URL, SUPABASE_KEY
 )
+from src.services.llm_provider import get_chat_model
 
 
 
@@ -72,11 +73,7 @@ def scrape_and_format_content(url: str) -> tuple[str, str]:
     print(scraped_content[:500])  # Preview content
 
     # Format with LLM
-    llm = ChatOpenAI(
-        model="gpt-4",
-        temperature=0.3,
-        openai_api_key=OPENAI_API_KEY
-    )
+    llm = get_chat_model("gpt-4", temperature=0.3)
 
     formatting_prompt = f"""You are an expert content curator and summarizer.
 Below is content scraped from a webpage. Please analyze it and create a well-structured, 
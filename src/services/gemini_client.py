@@ -26,6 +26,7 @@ from src.config import (
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
     SUPABASE_URL, SUPABASE_KEY
 )
+from src.services.llm_provider import get_gemini_model
 
 
 
@@ -47,8 +48,8 @@ def get_best_image_from_candidates(image_urls: list[str], post_text: str) -> Opt
     for i, url in enumerate(image_urls, 1):
         print(f"{i}. {url}")
 
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
+    # Temperature 0: picking an image is a judgement, not a creative task, so the choice can be cached.
+    model = get_gemini_model(temperature=0, api_key=GEMINI_API_KEY)
 
     if len(image_urls) > 4:
         candidate_urls = random.sample(image_urls, 4)
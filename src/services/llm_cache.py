@@ -0,0 +1,78 @@
+# FILE: src/services/llm_cache.py
+
+import hashlib
+import json
+import threading
+from typing import Any, Optional
+
+from PIL import Image
+
+from src.config import LLM_CACHE_PATH, LLM_CACHE_MAX_MB, LLM_CACHE_TTL
+from src.utils.disk_cache import DiskCache
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskCache:
+    """Returns the process-wide LLM response cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(LLM_CACHE_PATH, LLM_CACHE_MAX_MB * 1024 * 1024)
+            print(f"🗄️ LLM cache opened at {LLM_CACHE_PATH}")
+        return _cache
+
+
+def _digest(data: bytes, **fields) -> dict:
+    return {**fields, "sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)}
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Makes prompts JSON-serialisable for hashing. Attached media is replaced by a digest of its content:
+    raw bytes, PIL images (pixels, mode and size) and SDK content parts (their serialised protobuf).
+    Anything else raises TypeError, so a part that cannot be hashed faithfully is never cached on its repr.
+    """
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _digest(bytes(value))
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, Image.Image):
+        return _digest(value.tobytes(), image=value.mode, size=list(value.size))
+    serialize = getattr(value, "SerializeToString", None) or getattr(getattr(value, "_pb", None), "SerializeToString", None)
+    if callable(serialize):
+        # Protobuf messages (e.g. a genai Part or Blob): the serialised message covers inline data too.
+        return _digest(serialize(deterministic=True), message=type(value).__name__)
+    if callable(getattr(value, "model_dump", None)):
+        # Pydantic models, e.g. LangChain messages.
+        return {"model": type(value).__name__, "fields": _canonical(value.model_dump())}
+    raise TypeError(f"cannot hash a prompt part of type {type(value).__name__}")
+
+
+def response_key(provider: str, model: str, params: dict, prompt: Any) -> Optional[str]:
+    """
+    Content address of one LLM call: a hash of the provider, model, sampling parameters and full prompt
+    (media included). None when the prompt holds a part that cannot be hashed, i.e. the call is not cacheable.
+    """
+    try:
+        payload = json.dumps(
+            {"provider": provider, "model": model, "params": _canonical(params), "prompt": _canonical(prompt)},
+            sort_keys=True, ensure_ascii=False
+        )
+    except TypeError as e:
+        print(f"⚠️ LLM call not cached: {e}")
+        return None
+    return f"llm:{provider}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def load_response(key: str) -> Optional[str]:
+    return get_llm_cache().get(key)
+
+
+def store_response(key: str, text: str) -> None:
+    get_llm_cache().set(key, text, ttl=LLM_CACHE_TTL)
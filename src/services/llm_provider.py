@@ -0,0 +1,245 @@
+# FILE: src/services/llm_provider.py
+
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import google.generativeai as genai
+from langchain_core.messages import AIMessage
+from langchain_openai import ChatOpenAI
+
+from src.config import (
+    OPENAI_API_KEY, GEMINI_API_KEY, GEMINI_MODEL,
+    LLM_CACHE_ENABLED, LLM_CACHE_MAX_TEMPERATURE
+)
+from src.services import llm_cache
+
+# One client per (provider, model, temperature, key), shared by every Streamlit session in this process.
+# Reusing the instance keeps its HTTP connection pool (and TLS sessions) alive between calls.
+_llm_clients: Dict[tuple, Any] = {}
+_llm_clients_lock = threading.Lock()
+_gemini_configured_key: Optional[str] = None
+
+
+def _should_cache(temperature: Optional[float], use_cache: Optional[bool]) -> bool:
+    """
+    An explicit use_cache wins; otherwise cache only calls with an explicit temperature of at most
+    LLM_CACHE_MAX_TEMPERATURE. No temperature means the provider default (about 1.0 for Gemini),
+    i.e. output that is meant to vary, so it is not cached either.
+    """
+    if not LLM_CACHE_ENABLED:
+        return False
+    if use_cache is not None:
+        return use_cache
+    return temperature is not None and temperature <= LLM_CACHE_MAX_TEMPERATURE
+
+
+def _cached_stream(chunks: Iterable, key: Optional[str], text_of) -> Iterator:
+    """Passes a streamed response through unchanged and caches its full text once the stream completes."""
+    parts = []
+    for chunk in chunks:
+        text = text_of(chunk)
+        if text:
+            parts.append(text)
+        yield chunk
+    if key:
+        llm_cache.store_response(key, "".join(parts))
+
+
+def stream_text(chunks: Iterable) -> Iterator[str]:
+    """Text of each chunk of a streamed Gemini (`.text`) or LangChain (`.content`) response, skipping empty ones."""
+    for chunk in chunks:
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+def _chunk_text(chunk) -> Optional[str]:
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    return _response_text(chunk)
+
+
+class CachedChatModel:
+    """
+    ChatOpenAI with a content-addressed response cache in front of `invoke` and `stream`.
+    Pass `use_cache=False` (or True) to override the temperature-based default for one call.
+    Anything else is passed straight through to the underlying client.
+    """
+
+    def __init__(self, client: ChatOpenAI, model: str, temperature: float):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, prompt, *args, use_cache: Optional[bool] = None, **kwargs):
+        if not _should_cache(self.temperature, use_cache) or args or kwargs:
+            return self.client.invoke(prompt, *args, **kwargs)
+        key = llm_cache.response_key("openai", self.model, {"temperature": self.temperature}, prompt)
+        if key is None:
+            return self.client.invoke(prompt)
+        cached = llm_cache.load_response(key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({self.model})")
+            return AIMessage(content=cached)
+        response = self.client.invoke(prompt)
+        if isinstance(response.content, str):
+            llm_cache.store_response(key, response.content)
+        return response
+
+    def stream(self, prompt, *args, use_cache: Optional[bool] = None, **kwargs) -> Iterator:
+        """Streams message chunks; a cache hit is replayed as a single chunk."""
+        if not _should_cache(self.temperature, use_cache) or args or kwargs:
+            return self.client.stream(prompt, *args, **kwargs)
+        key = llm_cache.response_key("openai", self.model, {"temperature": self.temperature}, prompt)
+        if key is None:
+            return self.client.stream(prompt)
+        cached = llm_cache.load_response(key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({self.model})")
+            return iter([AIMessage(content=cached)])
+        return _cached_stream(self.client.stream(prompt), key, _chunk_text)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def _response_text(response) -> Optional[str]:
+    # .text raises when Gemini returned no candidate (e.g. a blocked prompt); such responses are not cached.
+    try:
+        return response.text
+    except Exception:
+        return None
+
+
+class CachedGeminiChat:
+    """
+    A Gemini chat session whose turns are served from the response cache. Each turn is keyed on the
+    whole conversation so far; the real session is only started (with the cached turns replayed as
+    history) once a turn misses.
+    """
+
+    def __init__(self, owner: "CachedGeminiModel", history: Optional[list] = None):
+        self.owner = owner
+        self.turns = list(history or [])
+        self._session = None
+
+    def send_message(self, content, use_cache: Optional[bool] = None, stream: bool = False, **kwargs):
+        """With stream=True, returns an iterator of chunks; the turn is recorded once it has been consumed."""
+        cacheable = _should_cache(self.owner.temperature, use_cache) and not kwargs
+        key = self.owner.key_for({"history": self.turns, "message": content}) if cacheable else None
+        cached = llm_cache.load_response(key) if key else None
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({self.owner.model}, chat turn {len(self.turns) // 2 + 1})")
+            self._record_turn(content, cached)
+            response = SimpleNamespace(text=cached)
+            return iter([response]) if stream else response
+        if self._session is None:
+            self._session = self.owner.model_client.start_chat(history=self.turns)
+        if stream:
+            return self._stream_turn(content, key, self._session.send_message(content, stream=True, **kwargs))
+        response = self._session.send_message(content, **kwargs)
+        text = _response_text(response)
+        if key and text is not None:
+            llm_cache.store_response(key, text)
+        self._record_turn(content, text or "")
+        return response
+
+    def _stream_turn(self, content, key: Optional[str], chunks: Iterable) -> Iterator:
+        parts = []
+        for chunk in chunks:
+            text = _response_text(chunk)
+            if text:
+                parts.append(text)
+            yield chunk
+        text = "".join(parts)
+        if key:
+            llm_cache.store_response(key, text)
+        self._record_turn(content, text)
+
+    def _record_turn(self, content, text: str) -> None:
+        self.turns += [{"role": "user", "parts": [content]}, {"role": "model", "parts": [text]}]
+
+
+class CachedGeminiModel:
+    """GenerativeModel with a content-addressed response cache in front of `generate_content` and chat turns."""
+
+    def __init__(self, model_client, model: str, temperature: Optional[float]):
+        self.model_client = model_client
+        self.model = model
+        self.temperature = temperature
+
+    def key_for(self, prompt) -> Optional[str]:
+        return llm_cache.response_key("gemini", self.model, {"temperature": self.temperature}, prompt)
+
+    def generate_content(self, contents, use_cache: Optional[bool] = None, stream: bool = False, **kwargs):
+        """With stream=True, returns an iterator of chunks (a cache hit is replayed as a single chunk)."""
+        if not _should_cache(self.temperature, use_cache) or kwargs:
+            return self.model_client.generate_content(contents, stream=stream, **kwargs)
+        key = self.key_for(contents)
+        if key is None:
+            return self.model_client.generate_content(contents, stream=stream)
+        cached = llm_cache.load_response(key)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({self.model})")
+            response = SimpleNamespace(text=cached)
+            return iter([response]) if stream else response
+        if stream:
+            return _cached_stream(self.model_client.generate_content(contents, stream=True), key, _response_text)
+        response = self.model_client.generate_content(contents)
+        text = _response_text(response)
+        if text is not None:
+            llm_cache.store_response(key, text)
+        return response
+
+    def start_chat(self, history: Optional[list] = None, **kwargs):
+        if kwargs:
+            return self.model_client.start_chat(history=history, **kwargs)
+        return CachedGeminiChat(self, history)
+
+    def __getattr__(self, name):
+        return getattr(self.model_client, name)
+
+
+def get_chat_model(model: str = "gpt-3.5-turbo", temperature: float = 0, api_key: Optional[str] = None) -> CachedChatModel:
+    """Returns the cached LangChain ChatOpenAI client for this model and temperature, creating it on first use."""
+    api_key = api_key or OPENAI_API_KEY
+    key = ("openai", model, temperature, api_key)
+    with _llm_clients_lock:
+        client = _llm_clients.get(key)
+        if client is None:
+            print(f"🔐 Creating shared OpenAI client ({model}, temperature={temperature})...")
+            client = CachedChatModel(ChatOpenAI(model=model, temperature=temperature, openai_api_key=api_key), model, temperature)
+            _llm_clients[key] = client
+        return client
+
+
+def get_gemini_model(model: str = GEMINI_MODEL, temperature: Optional[float] = None, api_key: Optional[str] = None) -> CachedGeminiModel:
+    """
+    Returns the cached Gemini GenerativeModel for this model and temperature, creating it on first use.
+    genai.configure() is global and drops the SDK's transport, so it only runs when the API key changes
+    instead of before every call.
+    """
+    global _gemini_configured_key
+    api_key = api_key or GEMINI_API_KEY
+    key = ("gemini", model, temperature, api_key)
+    with _llm_clients_lock:
+        client = _llm_clients.get(key)
+        if client is None:
+            if _gemini_configured_key != api_key:
+                genai.configure(api_key=api_key)
+                _gemini_configured_key = api_key
+            print(f"🔐 Creating shared Gemini client ({model}, temperature={temperature})...")
+            generation_config = {"temperature": temperature} if temperature is not None else None
+            client = CachedGeminiModel(genai.GenerativeModel(model, generation_config=generation_config), model, temperature)
+            _llm_clients[key] = client
+        return client
+
+
+def reset_llm_clients() -> None:
+    """Drops every cached client, e.g. after rotating API keys or swapping the client classes in benchmarks."""
+    global _gemini_configured_key
+    with _llm_clients_lock:
+        _llm_clients.clear()
+        _gemini_configured_key = None
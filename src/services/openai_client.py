@@ -27,6 +27,7 @@ from src.config import (
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
     SUPABASE_URL, SUPABASE_KEY
 )
+from src.services.llm_provider import get_chat_model
 
 
 
@@ -37,11 +38,7 @@ def generate_post_function(content: str) -> tuple[str, str]:
     """
     print("-> Generating social media post and title")
 
-    llm = ChatOpenAI(
-        model="gpt-4",
-        temperature=0.7,
-        openai_api_key=OPENAI_API_KEY
-    )
+    llm = get_chat_model("gpt-4", temperature=0.7)
 
     base_prompt = f"""You are a social media marketer.
 Create:
@@ -90,7 +87,7 @@ Original Post:
 def find_relevant_subreddits(topic: str, limit: int = 20)->list[str]:
     """Uses an LLM to find highly relevant, niche subreddits for a given topic."""
     print(f"-> Finding relevant subreddits for topic: '{topic}'...")
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key=OPENAI_API_KEY)
+    llm = get_chat_model("gpt-3.5-turbo", temperature=0)
     
     # This improved prompt asks for niche communities, which is key.
     prompt = f"""You are a Reddit search expert. For the given topic, list the best {limit} subreddits to find high-quality, specific discussions.
@@ -0,0 +1,90 @@
+# FILE: src/services/reddit_cache.py
+
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from src.config import (
+    REDDIT_CACHE_PATH, REDDIT_CACHE_MAX_MB, REDDIT_SEARCH_CACHE_TTL, REDDIT_SEARCH_YIELD_TTL,
+    REDDIT_COMMENTS_CACHE_TTL_RECENT, REDDIT_COMMENTS_CACHE_TTL_SETTLED
+)
+from src.models import RedditPost, RedditComment
+from src.utils.disk_cache import DiskCache
+
+# Posts older than this are considered settled: their comment trees rarely change.
+SETTLED_POST_AGE_SECONDS = 7 * 24 * 3600
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_reddit_cache() -> DiskCache:
+    """Returns the process-wide Reddit content cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(REDDIT_CACHE_PATH, REDDIT_CACHE_MAX_MB * 1024 * 1024)
+            print(f"🗄️ Reddit cache opened at {REDDIT_CACHE_PATH}")
+        return _cache
+
+
+def _search_key(sub_name: str, query: str, sort: str, time_filter: str, limit: int) -> str:
+    return f"search:{sub_name.lower()}:{sort}:{time_filter}:{limit}:{query.strip().lower()}"
+
+
+def _search_yield_key(sub_name: str) -> str:
+    return f"search_yield:{sub_name.lower()}"
+
+
+def _comments_key(submission_id: str) -> str:
+    return f"comments:{submission_id}"
+
+
+def load_search(sub_name: str, query: str, sort: str, time_filter: str, limit: int) -> Optional[list[RedditPost]]:
+    cached = get_reddit_cache().get(_search_key(sub_name, query, sort, time_filter, limit))
+    if cached is None:
+        return None
+    return [RedditPost.from_dict(post) for post in cached]
+
+
+def store_search(sub_name: str, query: str, sort: str, time_filter: str, limit: int, posts: list[RedditPost]) -> None:
+    get_reddit_cache().set(
+        _search_key(sub_name, query, sort, time_filter, limit),
+        [post.to_dict() for post in posts],
+        ttl=REDDIT_SEARCH_CACHE_TTL
+    )
+
+
+def load_search_yield(sub_name: str) -> Optional[int]:
+    """Returns how many results the subreddit's last search returned (any topic), or None if unknown."""
+    cached = get_reddit_cache().get(_search_yield_key(sub_name))
+    return None if cached is None else cached["results"]
+
+
+def store_search_yield(sub_name: str, results: int, limit: int) -> None:
+    get_reddit_cache().set(_search_yield_key(sub_name), {"results": results, "limit": limit}, ttl=REDDIT_SEARCH_YIELD_TTL)
+
+
+def load_comments(post: RedditPost) -> Optional[Dict[str, Any]]:
+    """Returns a cached comment forest in the same shape as `fetch_comment_forests` results."""
+    cached = get_reddit_cache().get(_comments_key(post.id))
+    if cached is None:
+        return None
+    return {
+        "comments": [RedditComment.from_dict(comment) for comment in cached["comments"]],
+        "complete": cached["complete"],
+        "requests": 0,
+    }
+
+
+def store_comments(post: RedditPost, forest: Dict[str, Any]) -> None:
+    settled = time.time() - (post.created_utc or 0) > SETTLED_POST_AGE_SECONDS
+    ttl = REDDIT_COMMENTS_CACHE_TTL_SETTLED if settled else REDDIT_COMMENTS_CACHE_TTL_RECENT
+    if not forest["complete"]:
+        # A budget-truncated forest is worth keeping briefly, but should be retried soon.
+        ttl = min(ttl, REDDIT_COMMENTS_CACHE_TTL_RECENT)
+    get_reddit_cache().set(
+        _comments_key(post.id),
+        {"comments": [comment.to_dict() for comment in forest["comments"]], "complete": forest["complete"]},
+        ttl=ttl
+    )
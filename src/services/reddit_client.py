@@ -5,11 +5,15 @@ import json
 import time
 import random
 import uuid
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from typing import TypedDict, Optional, List, Dict, Any, Tuple
 
 # --- Third-Party Libraries ---
 import bcrypt
+import numpy as np
 import google.generativeai as genai
 import praw
 import requests
@@ -25,20 +29,135 @@ from src.config import (
     OPENAI_API_KEY, FIRE_CRAWL_API_KEY, GEMINI_API_KEY,
     TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET,
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
-    SUPABASE_URL, SUPABASE_KEY
+    REDDIT_POST_USERNAME, REDDIT_POST_USER_AGENT,
+    SUPABASE_URL, SUPABASE_KEY,
+    REDDIT_REQUESTS_PER_MINUTE, REDDIT_SEARCH_WORKERS, REDDIT_COMMENT_WORKERS, REDDIT_CLIENT_POOL_SIZE,
+    REDDIT_MULTIREDDIT_SEARCH, REDDIT_MULTIREDDIT_MAX_SUBS, REDDIT_MULTIREDDIT_MAX_LIMIT,
+    REDDIT_RANKING, REDDIT_DEDUP_MAX_DISTANCE, REDDIT_FILTER_ENABLED,
+    RESEARCH_CORPUS_MAX_AGE_DAYS, RESEARCH_CORPUS_MAX_POSTS,
+    REDDIT_BACKEND, REDDIT_FIXTURE_PATH, REDDIT_REPLAY_LATENCY, REDDIT_REPLAY_JITTER,
+    REDDIT_REPLAY_REQUESTS_PER_MINUTE, REDDIT_REPLAY_ON_RATE_LIMIT
 )
-
-
-
-def post_to_reddit(title: str, body: str, image_path: Optional[str] = None) -> str:
-    reddit = praw.Reddit(
-        client_id=os.getenv('REDDIT_CLIENT_ID'),
-        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-        user_agent='FaiqQazi Reddit Bot',
-        username=os.getenv('REDDIT_USER_NAME'),
-        password=os.getenv('REDDIT_PASSWORD')
-    )
-
+from src.models import RedditPost, RedditComment
+from src.services import reddit_cache
+from src.services.llm_provider import get_chat_model
+from src.services.comment_fetcher import CommentBudget, fetch_comment_forests
+from src.services.reddit_pool import RedditClientPool, leased_reddit
+from src.services.reddit_replay import RecordingReddit, ReplayFixture, ReplayReddit
+from src.services.research_index import ResearchIndex, get_corpus_index
+from src.utils.batch_scorer import score_batch, top_k_indices
+from src.utils.content_filter import ContentFilter
+from src.utils.dedup import near_duplicate_clusters
+from src.utils.keyword_scorer import KeywordScorer
+from src.utils.rate_limiter import RateLimiter
+from src.utils.top_k import TopK
+
+# Shared by every worker thread so concurrent searches stay under Reddit's rate limit.
+reddit_rate_limiter = RateLimiter(REDDIT_REQUESTS_PER_MINUTE, period=60.0)
+
+# One client pool per credential set, shared by every Streamlit session in this process.
+_reddit_clients: Dict[tuple, Any] = {}
+_reddit_clients_lock = threading.Lock()
+# One HTTP session (connection pool) under every live PRAW client, research and posting alike.
+_reddit_http_session: Optional[requests.Session] = None
+
+
+def _shared_http_session() -> requests.Session:
+    global _reddit_http_session
+    with _reddit_clients_lock:
+        if _reddit_http_session is None:
+            _reddit_http_session = requests.Session()
+        return _reddit_http_session
+
+
+def get_reddit_client(
+    client_id: Optional[str] = REDDIT_CLIENT_ID,
+    client_secret: Optional[str] = REDDIT_CLIENT_SECRET,
+    user_agent: Optional[str] = REDDIT_USER_AGENT,
+    username: Optional[str] = REDDIT_USERNAME,
+    password: Optional[str] = REDDIT_PASSWORD
+):
+    """
+    Returns the cached RedditClientPool for this credential set, creating it on first use.
+    PRAW objects are not thread-safe, so callers use a client only inside `leased_reddit(pool)`,
+    which lends it to one thread at a time. Idle clients are reused, keeping their OAuth tokens, so a token
+    is acquired once per client instead of on every rerun or workflow call; the pool holds at most
+    REDDIT_CLIENT_POOL_SIZE clients, and all of them share one HTTP session.
+    With REDDIT_BACKEND=replay an offline ReplayReddit serving REDDIT_FIXTURE_PATH is returned instead
+    (it is thread-safe and used as is), and with REDDIT_BACKEND=record every pooled client is wrapped
+    to capture its responses into that file.
+    """
+    key = (REDDIT_BACKEND, client_id, client_secret, user_agent, username, password)
+    with _reddit_clients_lock:
+        client = _reddit_clients.get(key)
+        if client is None and REDDIT_BACKEND == "replay":
+            client = ReplayReddit(
+                REDDIT_FIXTURE_PATH,
+                latency=REDDIT_REPLAY_LATENCY,
+                jitter=REDDIT_REPLAY_JITTER,
+                requests_per_minute=REDDIT_REPLAY_REQUESTS_PER_MINUTE,
+                on_rate_limit=REDDIT_REPLAY_ON_RATE_LIMIT
+            )
+            _reddit_clients[key] = client
+        elif client is None:
+            print(f"🔐 Creating shared Reddit client pool for user '{username}'...")
+            fixture = ReplayFixture.load(REDDIT_FIXTURE_PATH) if REDDIT_BACKEND == "record" else None
+
+            def build() -> Any:
+                reddit = praw.Reddit(
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    user_agent=user_agent,
+                    username=username,
+                    password=password,
+                    requestor_kwargs={"session": _shared_http_session()}
+                )
+                # Recorders share one fixture, so every pooled client records into the same file.
+                return RecordingReddit(reddit, REDDIT_FIXTURE_PATH, fixture=fixture) if fixture is not None else reddit
+
+            client = RedditClientPool(build, max_size=REDDIT_CLIENT_POOL_SIZE, name=f"Reddit ({username})")
+            _reddit_clients[key] = client
+        return client
+
+
+def get_reddit_posting_client(
+    client_id: Optional[str] = REDDIT_CLIENT_ID,
+    client_secret: Optional[str] = REDDIT_CLIENT_SECRET,
+    user_agent: str = REDDIT_POST_USER_AGENT,
+    username: Optional[str] = REDDIT_POST_USERNAME,
+    password: Optional[str] = REDDIT_PASSWORD
+) -> praw.Reddit:
+    """
+    Returns the cached client posts are submitted with. It is separate from the research pool: it logs in
+    as the posting account and always talks to live Reddit, whatever REDDIT_BACKEND is, so a replayed
+    run cannot break posting and a recorded one never captures it. Only the HTTP session is shared.
+    """
+    key = ("post", client_id, client_secret, user_agent, username, password)
+    with _reddit_clients_lock:
+        client = _reddit_clients.get(key)
+    if client is None:
+        print(f"🔐 Creating Reddit posting client for user '{username}'...")
+        client = praw.Reddit(
+            client_id=client_id,
+            client_secret=client_secret,
+            user_agent=user_agent,
+            username=username,
+            password=password,
+            requestor_kwargs={"session": _shared_http_session()}
+        )
+        with _reddit_clients_lock:
+            client = _reddit_clients.setdefault(key, client)
+    return client
+
+
+def post_to_reddit(title: str, body: str, image_path: Optional[str] = None, reddit=None) -> str:
+    reddit = reddit or get_reddit_posting_client()
+    # A bare client is locked for the submission, so concurrent sessions post one at a time.
+    with leased_reddit(reddit) as client:
+        return _submit_post(client, title, body, image_path)
+
+
+def _submit_post(reddit: praw.Reddit, title: str, body: str, image_path: Optional[str]) -> str:
     subreddit_name = os.getenv("REDDIT_SUBREDDIT", "test")
     subreddit = reddit.subreddit(subreddit_name)
 
@@ -83,28 +202,171 @@ def post_to_reddit(title: str, body: str, image_path: Optional[str] = None) -> s
 
 
 
-def search_and_filter_posts(reddit, subreddits: list[str], topic: str, search_limit_per_sub: int = 50) -> tuple[list, list, list]:
+def _search_subreddit(reddit, sub_name: str, topic: str, search_limit_per_sub: int, use_cache: bool = True) -> list[RedditPost]:
+    """Runs a single subreddit search (one request per 100 results) and snapshots the listing into records."""
+    if use_cache:
+        cached = reddit_cache.load_search(sub_name, topic, 'relevance', 'year', search_limit_per_sub)
+        if cached is not None:
+            print(f"🗄️ r/{sub_name}: search served from the local cache.")
+            return cached
+    reddit_rate_limiter.acquire(max(1, math.ceil(search_limit_per_sub / 100)))
+    print(f"🔎 Searching in r/{sub_name} ...")
+    # The listing is consumed inside the lease, so no lazy PRAW object outlives this thread's client.
+    with leased_reddit(reddit) as client:
+        search_results = client.subreddit(sub_name).search(topic, sort='relevance', time_filter='year', limit=search_limit_per_sub)
+        posts = [RedditPost.from_praw(submission) for submission in search_results]
+    if use_cache:
+        reddit_cache.store_search(sub_name, topic, 'relevance', 'year', search_limit_per_sub, posts)
+        reddit_cache.store_search_yield(sub_name, len(posts), search_limit_per_sub)
+    return posts
+
+
+def plan_subreddit_searches(
+    subreddits: list[str],
+    search_limit_per_sub: int,
+    expected_yields: Optional[Dict[str, Optional[int]]] = None,
+    max_subs_per_search: int = REDDIT_MULTIREDDIT_MAX_SUBS,
+    max_combined_limit: int = REDDIT_MULTIREDDIT_MAX_LIMIT
+) -> list[tuple[list[str], int]]:
     """
-    Searches for posts and comments, scores them, and returns three distinct lists:
-    1. Top overall submissions (PRAW objects)
-    2. Top individual posts (title/body text, as dicts)
-    3. Top individual comments (PRAW comment objects)
+    Groups subreddits into combined multireddit searches (r/a+b+c). Returns [(subreddit names, limit)].
+    - A subreddit's expected share is its last observed search yield plus some headroom, or the full
+      per-subreddit limit when unknown. Subreddits that filled the limit last time are searched alone.
+    - Groups are packed in the given order while the summed shares fit in `max_combined_limit`,
+      and the combined search asks for exactly that sum.
     """
-    print(f"\n🚀 --- Advanced Reddit Search & Filter ---")
-    print(f"🔍 Topic: '{topic}' | Searching across {len(subreddits)} subreddits | Limit per subreddit: {search_limit_per_sub}")
-    if not subreddits:
-        print("❌ No subreddits provided for search. Exiting.")
-        return [], [], []
-    reddit = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_CLIENT_SECRET,
-        user_agent=REDDIT_USER_AGENT,
-        username=REDDIT_USERNAME,
-        password=REDDIT_PASSWORD
-    )
-    # --- Stage 1: Keyword Expansion ---
+    expected_yields = expected_yields or {}
+    plan = []
+    group, group_limit = [], 0
+
+    def close_group():
+        if group:
+            plan.append((list(group), group_limit if len(group) > 1 else search_limit_per_sub))
+
+    for sub_name in subreddits:
+        known = expected_yields.get(sub_name)
+        if known is not None and known >= search_limit_per_sub:
+            plan.append(([sub_name], search_limit_per_sub))
+            continue
+        share = search_limit_per_sub if known is None else min(search_limit_per_sub, known + max(5, known // 2))
+        if group and (len(group) >= max_subs_per_search or group_limit + share > max_combined_limit):
+            close_group()
+            group, group_limit = [], 0
+        group.append(sub_name)
+        group_limit += share
+    close_group()
+    return plan
+
+
+def _search_subreddit_group(reddit, group: list[str], topic: str, limit: int, search_limit_per_sub: int, use_cache: bool = True) -> tuple[Dict[str, list[RedditPost]], list[str]]:
+    """
+    Runs one combined search over several subreddits and attributes each result to its source subreddit.
+    Returns (results per subreddit, subreddits that may have been crowded out). When the combined listing
+    hit its limit, a subreddit that got fewer than its own limit may have lost results to busier neighbours,
+    so it is returned for an individual search instead of being trusted or cached.
+    """
+    path = "+".join(group)
+    reddit_rate_limiter.acquire(max(1, math.ceil(limit / 100)))
+    print(f"🔎 Searching in r/{path} (combined, limit {limit}) ...")
+    with leased_reddit(reddit) as client:
+        listing = [RedditPost.from_praw(submission) for submission in client.subreddit(path).search(topic, sort='relevance', time_filter='year', limit=limit)]
+
+    by_name = {sub_name.lower(): sub_name for sub_name in group}
+    results: Dict[str, list[RedditPost]] = {sub_name: [] for sub_name in group}
+    for post in listing:
+        sub_name = by_name.get(post.subreddit.lower())
+        if sub_name is not None and len(results[sub_name]) < search_limit_per_sub:
+            results[sub_name].append(post)
+
+    truncated = len(listing) >= limit
+    crowded = [sub_name for sub_name in group if truncated and len(results[sub_name]) < search_limit_per_sub]
+    for sub_name in crowded:
+        del results[sub_name]
+    if use_cache:
+        # Attributed lists are complete here, so they are cached just like individual searches.
+        for sub_name, posts in results.items():
+            reddit_cache.store_search(sub_name, topic, 'relevance', 'year', search_limit_per_sub, posts)
+            reddit_cache.store_search_yield(sub_name, len(posts), search_limit_per_sub)
+    return results, crowded
+
+
+def _map_in_pool(fn, items: list, max_workers: int) -> list:
+    """Applies `fn` to every item on a bounded worker pool, keeping input order."""
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        # executor.map preserves input order, independent of which call finishes first.
+        return list(executor.map(fn, items))
+
+
+def search_subreddits(
+    reddit,
+    subreddits: list[str],
+    topic: str,
+    search_limit_per_sub: int = 50,
+    max_workers: int = REDDIT_SEARCH_WORKERS,
+    use_cache: bool = True,
+    combine_searches: bool = REDDIT_MULTIREDDIT_SEARCH
+) -> list[list[RedditPost]]:
+    """
+    Searches every subreddit for the topic on a bounded worker pool.
+    Each search leases its own client from `reddit` (see `leased_reddit`), so no PRAW instance is
+    shared between workers; the module-wide rate limiter still throttles them all.
+    Returns one result list per subreddit, in the same order as `subreddits`.
+    A failed search yields an empty list instead of aborting the others.
+    With `combine_searches`, small subreddits share multireddit searches (see `plan_subreddit_searches`).
+    """
+    def run(sub_name: str) -> list:
+        try:
+            return _search_subreddit(reddit, sub_name, topic, search_limit_per_sub, use_cache=use_cache)
+        except Exception as e:
+            print(f"⚠️ Error searching r/{sub_name}: {e}")
+            return []
+
+    if not combine_searches:
+        return _map_in_pool(run, subreddits, max_workers)
+
+    results: Dict[str, list[RedditPost]] = {}
+    pending = []
+    for sub_name in dict.fromkeys(subreddits):
+        cached = reddit_cache.load_search(sub_name, topic, 'relevance', 'year', search_limit_per_sub) if use_cache else None
+        if cached is not None:
+            print(f"🗄️ r/{sub_name}: search served from the local cache.")
+            results[sub_name] = cached
+        else:
+            pending.append(sub_name)
+
+    expected_yields = {sub_name: reddit_cache.load_search_yield(sub_name) for sub_name in pending} if use_cache else {}
+    plan = plan_subreddit_searches(pending, search_limit_per_sub, expected_yields)
+    if plan:
+        print(f"🧭 Search plan: {len(pending)} subreddits in {len(plan)} searches "
+              f"({sum(math.ceil(limit / 100) for _, limit in plan)} requests).")
+
+    def run_group(planned: tuple[list[str], int]) -> tuple[Dict[str, list[RedditPost]], list[str]]:
+        group, limit = planned
+        if len(group) == 1:
+            return {group[0]: run(group[0])}, []
+        try:
+            return _search_subreddit_group(reddit, group, topic, limit, search_limit_per_sub, use_cache=use_cache)
+        except Exception as e:
+            print(f"⚠️ Error searching r/{'+'.join(group)}: {e}. Falling back to individual searches.")
+            return {}, list(group)
+
+    crowded = []
+    for group_results, group_crowded in _map_in_pool(run_group, plan, max_workers):
+        results.update(group_results)
+        crowded.extend(group_crowded)
+    if crowded:
+        print(f"↪️ Re-searching {len(crowded)} subreddits individually: {', '.join(crowded)}")
+        for sub_name, posts in zip(crowded, _map_in_pool(run, crowded, max_workers)):
+            results[sub_name] = posts
+    return [results.get(sub_name, []) for sub_name in subreddits]
+
+
+def expand_topic_keywords(topic: str) -> set[str]:
+    """Stage 1: asks the LLM for keywords related to the topic, always including the topic's own words."""
     print("\n📚 Stage 1: Expanding topic into relevant keywords using LLM...")
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.2, openai_api_key=OPENAI_API_KEY)
+    llm = get_chat_model("gpt-3.5-turbo", temperature=0.2)
     keyword_expansion_prompt = f"""You are a search query expert. For the given topic, generate a list of highly relevant keywords and phrases.
 You can give phrases but prefer keywords (~2/3) over phrases (~1/3).
 Topic: "{topic}"
@@ -118,97 +380,451 @@ Topic: "{topic}"
     except Exception as e:
         print(f"⚠️ LLM keyword expansion failed: {e}. Falling back to topic words only.")
         keywords = {word.lower() for word in topic.split()}
-
-    # --- Stage 2: Broad Search ---
-    print("\n🌐 Stage 2: Performing subreddit search...")
+    return keywords
+
+
+def collect_candidate_posts(
+    reddit,
+    subreddits: list[str],
+    topic: str,
+    search_limit_per_sub: int = 50,
+    concurrent_search: bool = True,
+    max_search_workers: int = REDDIT_SEARCH_WORKERS,
+    use_cache: bool = True
+) -> list[RedditPost]:
+    """Stage 2: searches every subreddit and returns the unique posts, deduplicated in subreddit order."""
+    mode = f"concurrent, {max_search_workers} workers" if concurrent_search else "serial"
+    print(f"\n🌐 Stage 2: Performing subreddit search ({mode})...")
     all_found_submissions = []
     unique_submission_ids = set()
-    for sub_name in subreddits:
-        try:
-            subreddit = reddit.subreddit(sub_name)
-            print(f"🔎 Searching in r/{sub_name} ...")
-            search_results = subreddit.search(topic, sort='relevance', time_filter='year', limit=search_limit_per_sub)
-            count = 0
-            for submission in search_results:
-                if submission.id not in unique_submission_ids:
-                    all_found_submissions.append(submission)
-                    unique_submission_ids.add(submission.id)
-                    count += 1
-            print(f"✅ Found {count} new posts in r/{sub_name}")
-        except Exception as e:
-            print(f"⚠️ Error searching r/{sub_name}: {e}")
+    workers = max_search_workers if concurrent_search else 1
+    results_per_subreddit = search_subreddits(reddit, subreddits, topic, search_limit_per_sub, max_workers=workers, use_cache=use_cache)
+    # Merge in the order the subreddits were given so dedup is deterministic regardless of completion order.
+    for sub_name, search_results in zip(subreddits, results_per_subreddit):
+        count = 0
+        for submission in search_results:
+            if submission.id not in unique_submission_ids:
+                all_found_submissions.append(submission)
+                unique_submission_ids.add(submission.id)
+                count += 1
+        print(f"✅ Found {count} new posts in r/{sub_name}")
+    print(f"📦 Total unique posts collected: {len(all_found_submissions)}")
+    return all_found_submissions
 
-    if not all_found_submissions:
-        print("❌ No posts found in any subreddit.")
-        return [], [], []
 
-    print(f"📦 Total unique posts collected: {len(all_found_submissions)}")
+def new_content_filter() -> Optional[ContentFilter]:
+    """A fresh low-value content filter for one run, or None when filtering is disabled."""
+    return ContentFilter.from_config() if REDDIT_FILTER_ENABLED else None
 
-    # --- Stage 3: Scoring Content ---
-    print("\n🧮 Stage 3: Scoring posts, post bodies, and comments...")
-    scored_submissions = []
-    scored_posts = []
-    scored_comments = []
 
-    for i, submission in enumerate(all_found_submissions, 1):
-        print(f"\n📄 [{i}/{len(all_found_submissions)}] Processing submission ID: {submission.id}")
-        try:
-            title_text = submission.title.lower()
-            body_text = (submission.selftext or "").lower()
+def drop_low_value_posts(posts: list[RedditPost], content_filter: Optional[ContentFilter]) -> list[RedditPost]:
+    if content_filter is None:
+        return posts
+    return [post for post in posts if not content_filter.post_reason(post.title, post.selftext, post.url, post.permalink, post.author, post.num_comments)]
 
-            post_only_score = sum(title_text.count(kw) * 5 + body_text.count(kw) * 2 for kw in keywords)
-            print(f"   📊 Title + Body Score: {post_only_score} | Post score: {submission.score}")
 
-            if post_only_score > 0:
-                scored_posts.append((post_only_score + submission.score, submission))
+def drop_low_value_comments(comments: list[RedditComment], content_filter: Optional[ContentFilter]) -> list[RedditComment]:
+    if content_filter is None:
+        return comments
+    return [comment for comment in comments if not content_filter.comment_reason(comment.body, comment.author)]
 
-            submission_total_relevance = post_only_score
-            try:
-                submission.comments.replace_more(limit=None)
-                comment_list = submission.comments.list()
-                print(f"   💬 Total comments: {len(comment_list)}")
-                for comment in comment_list:
-                    comment_text = comment.body.lower()
-                    individual_comment_score = sum(comment_text.count(kw) * 3 for kw in keywords)
-                    submission_total_relevance += sum(comment_text.count(kw) for kw in keywords)
-
-                    if individual_comment_score > 0:
-                        scored_comments.append((individual_comment_score + comment.score, comment))
-            except Exception as comment_error:
-                print(f"   ⚠️ Failed to process comments for {submission.id}: {comment_error}")
-
-            final_submission_score = (submission_total_relevance * 2) + submission.score
-            print(f"   🧮 Final Submission Score: {final_submission_score}")
-            scored_submissions.append((final_submission_score, submission))
-        except Exception as sub_error:
-            print(f"❌ Error processing submission ID {submission.id}: {sub_error}")
-            continue
+
+def score_and_select(
+    posts: list[RedditPost],
+    keywords: set[str],
+    top_submissions_k: int = 10,
+    top_posts_k: int = 40,
+    top_comments_k: int = 50,
+    comment_forests: Optional[Dict[str, Dict[str, Any]]] = None,
+    ranking: str = REDDIT_RANKING,
+    index: Optional[ResearchIndex] = None,
+    content_filter: Optional[ContentFilter] = None
+) -> tuple[list[RedditPost], list[RedditPost], list[RedditComment]]:
+    """
+    Stages 3 and 4: scores every post, post body and comment against the keywords and keeps the top k of each.
+    Comments come from `comment_forests` when given (and are attached to their post), otherwise from `post.comments`.
+    - ranking="bm25": BM25 over an inverted index with the Reddit score as a prior (`index` is reused if given)
+    - ranking="keyword": raw keyword substring counts with the fixed title/body/comment weights
+    With `content_filter`, low-value posts and comments are dropped before anything is scored.
+    """
+    print(f"\n🧮 Stage 3: Scoring posts, post bodies, and comments ({ranking})...")
+    if content_filter is not None:
+        posts = drop_low_value_posts(posts, content_filter)
+
+    def take_forest(submission: RedditPost) -> Dict[str, Any]:
+        if comment_forests is not None:
+            # Pop the forest so comments that don't make the top k can be freed right away.
+            forest = comment_forests.pop(submission.id, {"comments": [], "complete": False})
+        else:
+            forest = {"comments": submission.comments, "complete": True}
+        if content_filter is not None:
+            forest = {**forest, "comments": drop_low_value_comments(forest["comments"], content_filter)}
+        # Carry the scored forest forward so consolidation needs no further requests.
+        submission.comments = forest["comments"]
+        return forest
+
+    if ranking == "bm25":
+        for submission in posts:
+            take_forest(submission)
+        # A prebuilt index only matches when nothing was filtered out of its posts.
+        index = index if index is not None and len(index.posts) == len(posts) else ResearchIndex(posts)
+        print(f"   📇 Indexed {len(index.posts)} posts and {len(index.comments)} comments.")
+        print("\n🏁 Stage 4: Selecting top-ranked results...")
+        top_submissions, top_individual_posts, top_individual_comments = index.select(
+            keywords, top_submissions_k=top_submissions_k, top_posts_k=top_posts_k, top_comments_k=top_comments_k
+        )
+        print(f"✔️ Top Submissions Selected: {len(top_submissions)} of {len(posts)} scored")
+        print(f"✔️ Top Individual Posts Selected: {len(top_individual_posts)}")
+        print(f"✔️ Top Individual Comments Selected: {len(top_individual_comments)}")
+        return top_submissions, top_individual_posts, top_individual_comments
+
+    # Compile the keyword set once; every text below is scanned a single time.
+    scorer = KeywordScorer(keywords)
+    # Each submission is scored as one vectorized batch (title, body and its comments) and streamed into
+    # bounded heaps, so memory for the selection stays O(k) however many comments the corpus holds.
+    best_submissions, best_posts, best_comments = TopK(top_submissions_k), TopK(top_posts_k), TopK(top_comments_k)
+    scored_posts = scored_comments = total_comments = 0
+    for i, submission in enumerate(posts):
+        forest = take_forest(submission)
+        comments = forest["comments"]
+        scores = score_batch(scorer, [submission.title or ""], [submission.selftext or ""], [[comment.body or "" for comment in comments]])
+        post_score = int(scores.post_scores[0])
+        final_submission_score = int(scores.submission_relevance[0]) * 2 + (submission.score or 0)
+        print(f"\n📄 [{i + 1}/{len(posts)}] Processing submission ID: {submission.id}")
+        print(f"   📊 Title + Body Score: {post_score} | Post score: {submission.score}")
+        print(f"   💬 Total comments: {len(comments)}{'' if forest['complete'] else ' (partial, budget reached)'}")
+        print(f"   🧮 Final Submission Score: {final_submission_score}")
+
+        best_submissions.push(final_submission_score, submission)
+        if post_score > 0:
+            scored_posts += 1
+            best_posts.push(post_score + (submission.score or 0), submission)
+        for comment, relevance in zip(comments, scores.comment_scores.tolist()):
+            comment.relevance = relevance
+        comment_mask = scores.comment_scores > 0
+        if comment_mask.any():
+            scored_comments += int(comment_mask.sum())
+            rank_scores = scores.comment_scores + np.fromiter((comment.score or 0 for comment in comments), dtype=np.int64, count=len(comments))
+            # Only this batch's own top k can reach the overall top k; pushed in forest order to keep ties stable.
+            for j in sorted(top_k_indices(rank_scores, top_comments_k, comment_mask).tolist()):
+                best_comments.push(int(rank_scores[j]), comments[j])
+        total_comments += len(comments)
+    print(f"\n   🔢 Scored {len(posts)} submissions and {total_comments} comments against {len(scorer.keywords)} keywords.")
 
     # --- Stage 4: Selecting Top Results ---
     print("\n🏁 Stage 4: Selecting top-ranked results...")
+    top_submissions = best_submissions.items()
+    print(f"✔️ Top Submissions Selected: {len(top_submissions)} of {len(posts)} scored")
+    top_individual_posts = best_posts.items()
+    print(f"✔️ Top Individual Posts Selected: {len(top_individual_posts)} of {scored_posts} scored")
+    top_individual_comments = best_comments.items()
+    print(f"✔️ Top Individual Comments Selected: {len(top_individual_comments)} of {scored_comments} scored")
+    return top_submissions, top_individual_posts, top_individual_comments
 
-    scored_submissions.sort(key=lambda x: x[0], reverse=True)
-    top_submissions = [sub for score, sub in scored_submissions[:10]]
-    print(f"✔️ Top Submissions Selected: {len(top_submissions)}")
 
-    scored_posts.sort(key=lambda x: x[0], reverse=True)
-    top_individual_posts = [sub for score, sub in scored_posts[:40]]
-    print(f"✔️ Top Individual Posts Selected: {len(top_individual_posts)}")
+def search_and_filter_posts(
+    reddit,
+    subreddits: list[str],
+    topic: str,
+    search_limit_per_sub: int = 50,
+    concurrent_search: bool = True,
+    max_search_workers: int = REDDIT_SEARCH_WORKERS,
+    comment_budget: Optional[CommentBudget] = None,
+    global_comment_budget: Optional[CommentBudget] = None,
+    max_comment_workers: int = REDDIT_COMMENT_WORKERS,
+    top_submissions_k: int = 10,
+    top_posts_k: int = 40,
+    top_comments_k: int = 50,
+    use_cache: bool = True
+) -> tuple[list[RedditPost], list[RedditPost], list[RedditComment]]:
+    """
+    One-off research without a stored corpus: searches, fetches comments and scores in one go. The chat
+    workflow uses the corpus path instead (`build_topic_corpus` / `refresh_topic_corpus` + `select_from_corpus`),
+    which also stores the results for incremental refreshes; this path keeps nothing between runs.
+    Returns three distinct lists:
+    1. Top overall submissions (RedditPost records)
+    2. Top individual posts (RedditPost records, ranked on title/body text)
+    3. Top individual comments (RedditComment records)
+    All records are detached from PRAW, so later stages never trigger hidden network requests.
+    With `use_cache`, searches and comment forests still fresh in the local Reddit cache skip the network.
+    """
+    print(f"\n🚀 --- Advanced Reddit Search & Filter ---")
+    print(f"🔍 Topic: '{topic}' | Searching across {len(subreddits)} subreddits | Limit per subreddit: {search_limit_per_sub}")
+    if not subreddits:
+        print("❌ No subreddits provided for search. Exiting.")
+        return [], [], []
+    reddit = reddit or get_reddit_client()
 
-    scored_comments.sort(key=lambda x: x[0], reverse=True)
-    top_individual_comments = [comment for score, comment in scored_comments[:50]]
-    print(f"✔️ Top Individual Comments Selected: {len(top_individual_comments)}")
+    keywords = expand_topic_keywords(topic)
+
+    all_found_submissions = collect_candidate_posts(
+        reddit, subreddits, topic, search_limit_per_sub,
+        concurrent_search=concurrent_search, max_search_workers=max_search_workers, use_cache=use_cache
+    )
+    # Low-value posts are dropped before any of their comments are fetched.
+    content_filter = new_content_filter()
+    all_found_submissions = drop_low_value_posts(all_found_submissions, content_filter)
+    if not all_found_submissions:
+        print("❌ No posts found in any subreddit.")
+        return [], [], []
+
+    # Expand every candidate's comment tree up front, in parallel and within budget.
+    comment_forests = fetch_comment_forests(
+        reddit,
+        all_found_submissions,
+        per_submission_budget=comment_budget,
+        global_budget=global_comment_budget,
+        max_workers=max_comment_workers,
+        rate_limiter=reddit_rate_limiter,
+        use_cache=use_cache
+    )
+    top_submissions, top_individual_posts, top_individual_comments = score_and_select(
+        all_found_submissions, keywords,
+        top_submissions_k=top_submissions_k, top_posts_k=top_posts_k, top_comments_k=top_comments_k,
+        comment_forests=comment_forests, content_filter=content_filter
+    )
+    if content_filter is not None:
+        print(f"🧹 Low-value content dropped this run: {content_filter.summary()}")
 
     print("\n✅ Advanced Search & Filter completed successfully.")
     return top_submissions, top_individual_posts, top_individual_comments
 
 
+# ==============================================================================
+# --- TOPIC CORPUS (incremental refresh) ---
+# ==============================================================================
+
+def _newest_post_times(posts: list[RedditPost]) -> Dict[str, float]:
+    """Newest submission timestamp per subreddit (lower-cased), used as the refresh watermark."""
+    watermarks: Dict[str, float] = {}
+    for post in posts:
+        key = post.subreddit.lower()
+        watermarks[key] = max(watermarks.get(key, 0.0), post.created_utc or 0.0)
+    return watermarks
+
+
+def _merge_comments(existing: list[RedditComment], fresh: list[RedditComment]) -> tuple[list[RedditComment], int]:
+    """
+    Merges a freshly fetched forest into the stored one. Fresh comments win (their scores are current)
+    and keep forest order; stored comments the fresh fetch did not reach are kept after them.
+    Returns (merged comments, number of comments not seen before).
+    """
+    known_ids = {comment.id for comment in existing}
+    fresh_ids = {comment.id for comment in fresh}
+    merged = list(fresh) + [comment for comment in existing if comment.id not in fresh_ids]
+    return merged, len(fresh_ids - known_ids)
+
+
+def prune_corpus_posts(
+    posts: list[RedditPost],
+    max_age_days: float = RESEARCH_CORPUS_MAX_AGE_DAYS,
+    max_posts: int = RESEARCH_CORPUS_MAX_POSTS,
+    now: Optional[float] = None
+) -> list[RedditPost]:
+    """
+    Bounds a stored corpus: drops posts created more than `max_age_days` ago, then keeps the `max_posts`
+    most valuable (score + comment count, newer first on ties). A limit of 0 disables it.
+    Watermarks are left alone, so a pruned post is never fetched again.
+    """
+    kept = posts
+    if max_age_days > 0:
+        cutoff = (now or time.time()) - max_age_days * 86400
+        kept = [post for post in kept if (post.created_utc or 0.0) >= cutoff]
+    if max_posts > 0 and len(kept) > max_posts:
+        ranked = sorted(kept, key=lambda post: (post.score + post.num_comments, post.created_utc or 0.0), reverse=True)
+        keep_ids = {post.id for post in ranked[:max_posts]}
+        kept = [post for post in kept if post.id in keep_ids]
+    if len(kept) < len(posts):
+        print(f"✂️ Pruned {len(posts) - len(kept)} old or low-value posts from the corpus ({len(kept)} kept).")
+    return kept
+
+
+def build_topic_corpus(
+    reddit,
+    subreddits: list[str],
+    topic: str,
+    search_limit_per_sub: int = 50,
+    comment_budget: Optional[CommentBudget] = None,
+    global_comment_budget: Optional[CommentBudget] = None,
+    use_cache: bool = True
+) -> dict:
+    """
+    Cold run: expands keywords, searches the subreddits and fetches every candidate's comment forest.
+    Returns a corpus dict that can be stored with `save_research_corpus` and later refreshed incrementally.
+    """
+    print(f"\n🚀 --- Building research corpus for '{topic}' ---")
+    reddit = reddit or get_reddit_client()
+    keywords = expand_topic_keywords(topic)
+    content_filter = new_content_filter()
+    posts = drop_low_value_posts(collect_candidate_posts(reddit, subreddits, topic, search_limit_per_sub, use_cache=use_cache), content_filter)
+    forests = fetch_comment_forests(
+        reddit, posts,
+        per_submission_budget=comment_budget,
+        global_budget=global_comment_budget,
+        rate_limiter=reddit_rate_limiter,
+        use_cache=use_cache
+    )
+    for post in posts:
+        post.comments = drop_low_value_comments(forests.get(post.id, {"comments": []})["comments"], content_filter)
+    if content_filter is not None:
+        print(f"🧹 Low-value content dropped from the corpus: {content_filter.summary()}")
+
+    now = time.time()
+    posts = prune_corpus_posts(posts, now=now)
+    return {
+        "topic": topic,
+        "keywords": sorted(keywords),
+        "subreddits": list(subreddits),
+        "watermarks": _newest_post_times(posts),
+        "posts": posts,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _search_new_posts(reddit, sub_name: str, topic: str, since: float, limit: int) -> list[RedditPost]:
+    """Searches a subreddit newest-first and stops at the first post not newer than `since`."""
+    reddit_rate_limiter.acquire()
+    print(f"🔎 Checking r/{sub_name} for posts newer than {time.strftime('%Y-%m-%d %H:%M', time.gmtime(since))} UTC...")
+    new_posts = []
+    with leased_reddit(reddit) as client:
+        for submission in client.subreddit(sub_name).search(topic, sort='new', time_filter='year', limit=limit):
+            if submission.created_utc <= since:
+                # Results are newest-first, so everything after this was already seen.
+                break
+            new_posts.append(RedditPost.from_praw(submission))
+    return new_posts
+
+
+def _refresh_post_stats(reddit, posts: list[RedditPost]) -> list[RedditPost]:
+    """
+    Updates score and comment count of known posts in batches of 100 per request.
+    Returns the posts whose comment count grew since they were stored.
+    """
+    by_fullname = {f"t3_{post.id}": post for post in posts}
+    grown = []
+    fullnames = list(by_fullname)
+    for start in range(0, len(fullnames), 100):
+        batch = fullnames[start:start + 100]
+        reddit_rate_limiter.acquire()
+        with leased_reddit(reddit) as client:
+            for submission in client.info(fullnames=batch):
+                post = by_fullname.get(submission.fullname)
+                if post is None:
+                    continue
+                post.score = submission.score
+                if submission.num_comments > post.num_comments:
+                    grown.append(post)
+                post.num_comments = submission.num_comments
+    return grown
+
+
+def refresh_topic_corpus(
+    reddit,
+    corpus: dict,
+    search_limit_per_sub: int = 50,
+    comment_budget: Optional[CommentBudget] = None,
+    global_comment_budget: Optional[CommentBudget] = None,
+    max_search_workers: int = REDDIT_SEARCH_WORKERS
+) -> Dict[str, int]:
+    """
+    Incremental run: fetches only posts newer than each subreddit's watermark, plus fresh comments
+    on known posts whose comment count grew, and merges them into `corpus` in place.
+    Keywords are reused from the corpus, so no LLM call is made. Returns refresh statistics.
+    """
+    topic = corpus["topic"]
+    print(f"\n♻️ --- Incrementally refreshing research corpus for '{topic}' ---")
+    reddit = reddit or get_reddit_client()
+    # Pruned first, so expired posts cost no stats refresh.
+    known_posts: list[RedditPost] = prune_corpus_posts(corpus["posts"])
+    pruned_count = len(corpus["posts"]) - len(known_posts)
+    known_ids = {post.id for post in known_posts}
+    watermarks = corpus.get("watermarks", {})
+    subreddits = corpus["subreddits"]
+
+    # 1. New posts since each subreddit's watermark.
+    def run(sub_name: str) -> list[RedditPost]:
+        try:
+            return _search_new_posts(reddit, sub_name, topic, watermarks.get(sub_name.lower(), 0.0), search_limit_per_sub)
+        except Exception as e:
+            print(f"⚠️ Error checking r/{sub_name} for new posts: {e}")
+            return []
+
+    results_per_subreddit = _map_in_pool(run, subreddits, max_search_workers)
+    new_posts = []
+    for search_results in results_per_subreddit:
+        for post in search_results:
+            if post.id not in known_ids:
+                new_posts.append(post)
+                known_ids.add(post.id)
+    content_filter = new_content_filter()
+    new_posts = drop_low_value_posts(new_posts, content_filter)
+    print(f"🆕 New posts since last run: {len(new_posts)}")
+
+    # 2. Known posts whose discussions kept growing.
+    try:
+        grown_posts = _refresh_post_stats(reddit, known_posts)
+    except Exception as e:
+        print(f"⚠️ Could not refresh stats of known posts: {e}")
+        grown_posts = []
+    print(f"💬 Known posts with new comments: {len(grown_posts)}")
+
+    # 3. Comment forests: cached ones are fine for new posts, grown threads must bypass the cache.
+    new_forests = fetch_comment_forests(
+        reddit, new_posts, per_submission_budget=comment_budget, global_budget=global_comment_budget,
+        rate_limiter=reddit_rate_limiter, use_cache=True
+    ) if new_posts else {}
+    for post in new_posts:
+        post.comments = drop_low_value_comments(new_forests.get(post.id, {"comments": []})["comments"], content_filter)
+
+    grown_forests = fetch_comment_forests(
+        reddit, grown_posts, per_submission_budget=comment_budget, global_budget=global_comment_budget,
+        rate_limiter=reddit_rate_limiter, use_cache=False
+    ) if grown_posts else {}
+    new_comment_count = sum(len(post.comments) for post in new_posts)
+    for post in grown_posts:
+        fresh = drop_low_value_comments(grown_forests.get(post.id, {"comments": []})["comments"], content_filter)
+        post.comments, added = _merge_comments(post.comments, fresh)
+        new_comment_count += added
+
+    # 4. Merge and move the watermarks forward.
+    merged_posts = known_posts + new_posts
+    corpus["posts"] = prune_corpus_posts(merged_posts)
+    pruned_count += len(merged_posts) - len(corpus["posts"])
+    for sub_name, newest in _newest_post_times(new_posts).items():
+        watermarks[sub_name] = max(watermarks.get(sub_name, 0.0), newest)
+    corpus["watermarks"] = watermarks
+    corpus["updated_at"] = time.time()
+
+    if content_filter is not None:
+        print(f"🧹 Low-value content dropped during refresh: {content_filter.summary()}")
+    stats = {"new_posts": len(new_posts), "refreshed_threads": len(grown_posts), "new_comments": new_comment_count,
+             "pruned_posts": pruned_count}
+    print(f"✅ Refresh complete: {stats}")
+    return stats
+
+
+def select_from_corpus(
+    corpus: dict,
+    top_submissions_k: int = 10,
+    top_posts_k: int = 40,
+    top_comments_k: int = 50
+) -> tuple[list[RedditPost], list[RedditPost], list[RedditComment]]:
+    """Scores a stored corpus locally (no network, no LLM) and returns the same three lists as `search_and_filter_posts`."""
+    return score_and_select(
+        corpus["posts"], set(corpus["keywords"]),
+        top_submissions_k=top_submissions_k, top_posts_k=top_posts_k, top_comments_k=top_comments_k,
+        index=get_corpus_index(corpus) if REDDIT_RANKING == "bm25" else None
+    )
+
+
 
 
 def validate_subreddit(reddit, subreddit_name: str) -> bool:
     """Validates if a subreddit exists and is accessible."""
     try:
-        reddit.subreddit(subreddit_name).id  # Fetch subreddit ID to confirm existence
+        with leased_reddit(reddit) as client:
+            client.subreddit(subreddit_name).id  # Fetch subreddit ID to confirm existence
         print(f"✅ Subreddit r/{subreddit_name} is valid and accessible")
         return True
     except (praw.exceptions.Forbidden, praw.exceptions.NotFound) as e:
@@ -222,12 +838,15 @@ def validate_subreddit(reddit, subreddit_name: str) -> bool:
 
 
 def scrape_validated_posts(
-    top_submissions: list[praw.models.Submission],
-    top_posts: list[praw.models.Submission],
-    top_comments: list[praw.models.Comment]
+    top_submissions: list[RedditPost],
+    top_posts: list[RedditPost],
+    top_comments: list[RedditComment],
+    deduplicate: bool = True
 ) -> list[dict]:
     """
     Takes the three validated lists and prepares a unified list of dictionaries for the report generator.
+    Purely in-memory: comments come from the forests already fetched and scored by `search_and_filter_posts`.
+    With `deduplicate`, near-duplicate posts and comments are merged (see `deduplicate_consolidated_data`).
     Includes detailed logs and error tracking.
     """
     print("\n🔎 -> Starting to consolidate and scrape validated Reddit content...")
@@ -251,14 +870,11 @@ def scrape_validated_posts(
             "top_comments": []
         }
 
-        try:
-            submission.comments.replace_more(limit=0)
-            top_five_comments = submission.comments.list()[:5]
-            for comment in top_five_comments:
-                post_data["top_comments"].append({"body": comment.body, "score": comment.score})
-            print(f"    ✅ Added {len(top_five_comments)} comments to post.")
-        except Exception as e:
-            print(f"    ⚠️ Error fetching comments for submission ID {submission.id}: {e}")
+        # Forest order lists top-level comments first, matching what replace_more(limit=0) used to give us.
+        top_five_comments = submission.comments[:5]
+        for comment in top_five_comments:
+            post_data["top_comments"].append({"id": comment.id, "body": comment.body, "score": comment.score, "relevance": comment.relevance})
+        print(f"    ✅ Added {len(top_five_comments)} comments to post.")
 
         scraped_data.append(post_data)
         processed_ids.add(submission.id)
@@ -289,8 +905,10 @@ def scrape_validated_posts(
         for i, comment in enumerate(top_comments, 1):
             try:
                 comment_nuggets.append({
+                    "id": comment.id,
                     "body": comment.body,
-                    "score": comment.score
+                    "score": comment.score,
+                    "relevance": comment.relevance
                 })
                 print(f"    ✅ Added comment {i}/{len(top_comments)} | Score: {comment.score}")
             except Exception as e:
@@ -303,9 +921,67 @@ def scrape_validated_posts(
     else:
         print("    ⚠️ No top comments provided to add.")
 
+    if deduplicate:
+        scraped_data = deduplicate_consolidated_data(scraped_data)
+
     print(f"\n🎯 Consolidation complete! Total items added for reporting: {len(scraped_data)}")
     print("printing the scrapped data")
     for item in scraped_data:
         print(f"  - Type: {item['type']}, Title: {item.get('title', 'N/A')}, Comments: {len(item.get('top_comments', [])) if 'top_comments' in item else 0}")
 
     return scraped_data
+
+
+def _merge_duplicates(entries: list[dict], texts: list[str], max_distance: int) -> set[int]:
+    """
+    Clusters near-duplicate entries, keeps the best one of each cluster and gives it the cluster's
+    summed score plus a `duplicates` count. Returns the indices of the entries to drop.
+    """
+    dropped = set()
+    for cluster in near_duplicate_clusters(texts, max_distance=max_distance):
+        if len(cluster) == 1:
+            continue
+        # A full thread beats a text-only copy of it, so its comments are never lost; then highest score wins.
+        keep = max(cluster, key=lambda i: (entries[i].get("type") == "full_submission", entries[i].get("score") or 0, -i))
+        # The same comment can be listed both under its thread and among the nuggets; count it once.
+        scores = {entries[i].get("id", i): entries[i].get("score") or 0 for i in cluster}
+        entries[keep]["score"] = sum(scores.values())
+        entries[keep]["duplicates"] = entries[keep].get("duplicates", 0) + len(scores) - 1
+        dropped.update(i for i in cluster if i != keep)
+    return dropped
+
+
+def deduplicate_consolidated_data(consolidated_data: list[dict], max_distance: int = REDDIT_DEDUP_MAX_DISTANCE) -> list[dict]:
+    """
+    Removes cross-posts, quoted replies and copy-pasted comments from the consolidated data.
+    Posts (title + body) and comments (across all threads and the comment nuggets) are fingerprinted
+    with SimHash; each cluster of near-duplicates keeps its best representative, whose score becomes
+    the cluster's total so the signal of the dropped copies is preserved.
+    """
+    print("\n🧬 Removing near-duplicate posts and comments...")
+    posts = [item for item in consolidated_data if item["type"] in ("full_submission", "individual_post")]
+    dropped_posts = _merge_duplicates(
+        posts, [f"{item.get('title', '')}\n{item.get('selftext', '')}" for item in posts], max_distance
+    )
+    dropped_post_ids = {id(posts[i]) for i in dropped_posts}
+
+    comment_lists = [item["top_comments"] if item["type"] == "full_submission" else item.get("comments", [])
+                     for item in consolidated_data if id(item) not in dropped_post_ids and item["type"] != "individual_post"]
+    comments = [comment for comment_list in comment_lists for comment in comment_list]
+    dropped_comments = _merge_duplicates(comments, [comment.get("body", "") for comment in comments], max_distance)
+    dropped_comment_ids = {id(comments[i]) for i in dropped_comments}
+
+    before = len(json.dumps(consolidated_data, ensure_ascii=False))
+    deduplicated = []
+    for item in consolidated_data:
+        if id(item) in dropped_post_ids:
+            continue
+        if item["type"] == "full_submission":
+            item["top_comments"] = [c for c in item["top_comments"] if id(c) not in dropped_comment_ids]
+        elif item["type"] == "comment_nuggets":
+            item["comments"] = [c for c in item.get("comments", []) if id(c) not in dropped_comment_ids]
+        deduplicated.append(item)
+    after = len(json.dumps(deduplicated, ensure_ascii=False))
+    print(f"✅ Dropped {len(dropped_posts)} duplicate posts and {len(dropped_comments)} duplicate comments "
+          f"({before - after:,} characters saved).")
+    return deduplicated
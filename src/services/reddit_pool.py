@@ -0,0 +1,86 @@
+# FILE: src/services/reddit_pool.py
+
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# PRAW objects are not thread-safe: a `praw.Reddit` instance (and every lazy listing, submission or
+# comment forest it hands out) must only be used by one thread at a time.
+
+
+class RedditClientPool:
+    """
+    PRAW clients for one credential set, each lent to a single thread at a time through `lease()`.
+    Returned clients are reused by the next lease, so their HTTP sessions and OAuth tokens survive
+    across workers, workflow calls and Streamlit sessions. A new client is only built when every
+    existing one is busy, and never more than `max_size` of them: once all are lent, `lease()` waits
+    for one to come back.
+    """
+
+    def __init__(self, build: Callable[[], Any], max_size: int, name: str = "Reddit"):
+        self._build = build
+        self.max_size = max(1, max_size)
+        self.name = name
+        self._idle: list = []
+        self._available = threading.Condition()
+        self.created = 0
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        with self._available:
+            while not self._idle and self.created >= self.max_size:
+                self._available.wait()
+            client = self._idle.pop() if self._idle else None
+            if client is None:
+                # Reserve the slot before building, so concurrent leases cannot overshoot max_size.
+                self.created += 1
+        if client is None:
+            try:
+                client = self._build()
+            except BaseException:
+                with self._available:
+                    self.created -= 1
+                    self._available.notify()
+                raise
+            print(f"🔐 Created {self.name} client #{self.created} of at most {self.max_size}.")
+        try:
+            yield client
+        finally:
+            with self._available:
+                self._idle.append(client)
+                self._available.notify()
+
+
+# Clients handed in directly (not through a pool) are serialised with one lock per client,
+# held only as long as the client itself is alive.
+_client_locks: "weakref.WeakKeyDictionary[Any, threading.Lock]" = weakref.WeakKeyDictionary()
+_client_locks_lock = threading.Lock()
+
+
+def _lock_for(client: Any) -> threading.Lock:
+    with _client_locks_lock:
+        lock = _client_locks.get(client)
+        if lock is None:
+            lock = _client_locks[client] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def leased_reddit(reddit: Any) -> Iterator[Any]:
+    """
+    Yields a client the calling thread may use exclusively until the block ends:
+    - a RedditClientPool lends one of its clients (waiting if all of them are lent);
+    - a client marked `thread_safe` (e.g. ReplayReddit) is yielded as is;
+    - any other client (a bare `praw.Reddit`) is locked for the duration of the block.
+    Results must be fully consumed (listings iterated, forests expanded) inside the block, and blocks
+    must not nest: a thread holds at most one lease at a time.
+    """
+    if isinstance(reddit, RedditClientPool):
+        with reddit.lease() as client:
+            yield client
+    elif getattr(reddit, "thread_safe", False):
+        yield reddit
+    else:
+        with _lock_for(reddit):
+            yield reddit
@@ -0,0 +1,483 @@
+# FILE: src/services/reddit_replay.py
+"""
+Record/replay stand-ins for `praw.Reddit`, covering exactly what the research pipeline uses:
+`subreddit(name).search(...)`, `submission(id=...).comments` (with `replace_more` / `list`) and `info(fullnames=...)`.
+
+- RecordingReddit wraps a live client and captures every response into a JSON fixture file.
+- ReplayReddit serves a fixture offline, with configurable per-request latency and a Reddit-like
+  rate limit, so the same code paths run deterministically with realistic timings and no network.
+"""
+
+import atexit
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Optional, Dict, Any
+
+import praw
+
+from src.services.comment_fetcher import rebase_depths
+
+FIXTURE_VERSION = 1
+
+
+class ReplayRateLimitError(Exception):
+    """Raised by ReplayReddit in "error" mode when a request would exceed the rate limit."""
+
+
+def _search_key(sub_name: str, query: str, sort: str, time_filter: str, limit: Optional[int]) -> str:
+    return f"{sub_name.lower()}|{sort}|{time_filter}|{limit}|{query.strip().lower()}"
+
+
+def _author_name(author) -> Optional[str]:
+    return author.name if author else None
+
+
+def submission_to_dict(submission) -> Dict[str, Any]:
+    return {
+        "id": submission.id,
+        "subreddit": submission.subreddit.display_name,
+        "title": submission.title,
+        "selftext": submission.selftext,
+        "url": submission.url,
+        "permalink": submission.permalink,
+        "author": _author_name(submission.author),
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+        "created_utc": submission.created_utc,
+    }
+
+
+def comment_to_dict(comment) -> Dict[str, Any]:
+    return {
+        "id": comment.id,
+        "link_id": comment.link_id,
+        "parent_id": comment.parent_id,
+        "body": comment.body,
+        "author": _author_name(comment.author),
+        "score": comment.score,
+        "depth": getattr(comment, "depth", 0),
+        "created_utc": comment.created_utc,
+    }
+
+
+class ReplayFixture:
+    """
+    In-memory fixture contents, stored as one JSON file:
+    - searches: {key: [submission dicts]} for every (subreddit, sort, time filter, limit, query)
+    - submissions: {id: submission dict}, the latest state seen for each submission
+    - comments: {id: {"initial": [comment dicts], "batches": [[comment dicts], ...]}}, the comments
+      of the first page followed by what each "load more comments" request returned, in order
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.searches: Dict[str, list] = data.get("searches", {})
+        self.submissions: Dict[str, dict] = data.get("submissions", {})
+        self.comments: Dict[str, dict] = data.get("comments", {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayFixture":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported Reddit fixture version in {path}: {data.get('version')}")
+        return cls(data)
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            payload = {"version": FIXTURE_VERSION, "searches": self.searches, "submissions": self.submissions, "comments": self.comments}
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def add_search(self, sub_name: str, query: str, sort: str, time_filter: str, limit: Optional[int], submissions: list[dict]) -> None:
+        with self._lock:
+            self.searches[_search_key(sub_name, query, sort, time_filter, limit)] = submissions
+            for submission in submissions:
+                self.submissions[submission["id"]] = submission
+
+    def add_submission(self, submission: dict) -> None:
+        with self._lock:
+            self.submissions[submission["id"]] = submission
+
+    def add_comments(self, submission_id: str, initial: list[dict], batches: list[list[dict]]) -> None:
+        with self._lock:
+            self.comments[submission_id] = {"initial": initial, "batches": batches}
+
+    def find_search(self, sub_name: str, query: str, sort: str, time_filter: str, limit: Optional[int]) -> Optional[list[dict]]:
+        """Exact match first; otherwise the same search recorded with a larger limit, truncated."""
+        exact = self.searches.get(_search_key(sub_name, query, sort, time_filter, limit))
+        if exact is not None:
+            return exact
+        prefix = f"{sub_name.lower()}|{sort}|{time_filter}|"
+        suffix = f"|{query.strip().lower()}"
+        for key, submissions in self.searches.items():
+            if key.startswith(prefix) and key.endswith(suffix):
+                recorded_limit = key[len(prefix):-len(suffix)]
+                if recorded_limit == "None" or (limit is not None and int(recorded_limit) >= limit):
+                    return submissions[:limit]
+        return None
+
+
+# ==============================================================================
+# --- RECORDING ---
+# ==============================================================================
+
+class _RecordingForest:
+    def __init__(self, recorder: "RecordingReddit", submission_id: str, forest):
+        self._recorder = recorder
+        self._submission_id = submission_id
+        self._forest = forest
+        self._seen = set()
+        self._initial = self._take_new()
+        self._batches: list[list[dict]] = []
+        self._store()
+
+    def _take_new(self) -> list[dict]:
+        new = []
+        for comment in self._forest.list():
+            if not isinstance(comment, praw.models.MoreComments) and comment.id not in self._seen:
+                self._seen.add(comment.id)
+                new.append(comment_to_dict(comment))
+        return new
+
+    def _store(self) -> None:
+        self._recorder.fixture.add_comments(self._submission_id, self._initial, self._batches)
+
+    def replace_more(self, limit: Optional[int] = 32, threshold: int = 0):
+        remaining = self._forest.replace_more(limit=limit, threshold=threshold)
+        self._batches.append(self._take_new())
+        self._store()
+        return remaining
+
+    def record_batch(self, comments: list) -> None:
+        """Records the comments one expanded stub loaded as the next batch."""
+        batch = []
+        for comment in comments:
+            if not isinstance(comment, praw.models.MoreComments) and comment.id not in self._seen:
+                self._seen.add(comment.id)
+                batch.append(comment_to_dict(comment))
+        self._batches.append(batch)
+        self._store()
+
+    def list(self) -> list:
+        return [_RecordingMoreComments(self, item) if isinstance(item, praw.models.MoreComments) else item
+                for item in self._forest.list()]
+
+    def __getattr__(self, name):
+        return getattr(self._forest, name)
+
+
+class _RecordingMoreComments(praw.models.MoreComments):
+    """A live stub whose `comments()` is recorded as one batch of its forest."""
+
+    def __init__(self, forest: _RecordingForest, more):
+        # Deliberately skips MoreComments.__init__: every attribute is read from the live stub.
+        self._forest = forest
+        self._more = more
+        self.depth = getattr(more, "depth", 0)
+        self.count = more.count
+        self.children = more.children
+
+    @property
+    def submission(self):
+        return self._more.submission
+
+    @submission.setter
+    def submission(self, value):
+        self._more.submission = value
+
+    def comments(self, update: bool = True):
+        loaded = self._more.comments(update=update)
+        items = loaded.list() if hasattr(loaded, "list") else list(loaded)
+        # Recorded with depths counted from the submission, so replayed stubs sit at the right depth.
+        rebase_depths(items, self.depth)
+        self._forest.record_batch(items)
+        return [_RecordingMoreComments(self._forest, item) if isinstance(item, praw.models.MoreComments) else item
+                for item in items]
+
+    def __repr__(self) -> str:
+        return f"<RecordingMoreComments count={self.count}>"
+
+
+class _RecordingSubmission:
+    def __init__(self, recorder: "RecordingReddit", submission):
+        self._recorder = recorder
+        self._submission = submission
+        self._comments = None
+
+    @property
+    def comments(self):
+        if self._comments is None:
+            forest = self._submission.comments
+            self._recorder.fixture.add_submission(submission_to_dict(self._submission))
+            self._comments = _RecordingForest(self._recorder, self._submission.id, forest)
+        return self._comments
+
+    def __getattr__(self, name):
+        return getattr(self._submission, name)
+
+
+class _RecordingSubreddit:
+    def __init__(self, recorder: "RecordingReddit", name: str, subreddit):
+        self._recorder = recorder
+        self._name = name
+        self._subreddit = subreddit
+
+    def search(self, query: str, sort: str = "relevance", time_filter: str = "all", limit: Optional[int] = 100, **kwargs):
+        results = list(self._subreddit.search(query, sort=sort, time_filter=time_filter, limit=limit, **kwargs))
+        self._recorder.fixture.add_search(self._name, query, sort, time_filter, limit, [submission_to_dict(s) for s in results])
+        return results
+
+    def __getattr__(self, name):
+        return getattr(self._subreddit, name)
+
+
+class RecordingReddit:
+    """
+    Wraps a live `praw.Reddit` and records every search, comment forest and info() lookup into
+    `fixture_path`. Anything else is passed straight through to the live client. The fixture is
+    saved on `save()` and automatically at interpreter exit; existing fixtures are extended.
+    Several recorders (one per pooled client) may share one `fixture`; its writes are locked.
+    """
+
+    def __init__(self, reddit: praw.Reddit, fixture_path: str, fixture: Optional[ReplayFixture] = None):
+        self._reddit = reddit
+        self.fixture_path = fixture_path
+        self.fixture = fixture if fixture is not None else ReplayFixture.load(fixture_path)
+        atexit.register(self.save)
+        print(f"⏺️ Recording Reddit responses to {fixture_path}")
+
+    def save(self) -> None:
+        self.fixture.save(self.fixture_path)
+
+    def subreddit(self, display_name: str):
+        return _RecordingSubreddit(self, display_name, self._reddit.subreddit(display_name))
+
+    def submission(self, id: Optional[str] = None, **kwargs):
+        return _RecordingSubmission(self, self._reddit.submission(id=id, **kwargs))
+
+    def info(self, fullnames=None, **kwargs):
+        results = list(self._reddit.info(fullnames=fullnames, **kwargs))
+        for submission in results:
+            if getattr(submission, "fullname", "").startswith("t3_"):
+                self.fixture.add_submission(submission_to_dict(submission))
+        return results
+
+    def __getattr__(self, name):
+        return getattr(self._reddit, name)
+
+
+# ==============================================================================
+# --- REPLAY ---
+# ==============================================================================
+
+def _submission_from_dict(data: dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        **{**data, "subreddit": SimpleNamespace(display_name=data["subreddit"]),
+           "author": SimpleNamespace(name=data["author"]) if data.get("author") else None},
+        fullname=f"t3_{data['id']}"
+    )
+
+
+def _comment_from_dict(data: dict) -> SimpleNamespace:
+    return SimpleNamespace(**{**data, "author": SimpleNamespace(name=data["author"]) if data.get("author") else None})
+
+
+class _ReplayMoreComments(praw.models.MoreComments):
+    """A "load more comments" stub standing for one recorded batch; `comments()` serves that batch."""
+
+    def __init__(self, forest: "_ReplayForest", batch: list, depth: int, count: int):
+        # Deliberately skips MoreComments.__init__: there is no live client or listing data behind it.
+        self._forest = forest
+        self._batch = batch
+        self.depth = depth
+        self.count = count
+        self.children = []
+        self.submission = None
+
+    def comments(self, update: bool = True) -> list:
+        return self._forest.load_batch(self._batch)
+
+    def __repr__(self) -> str:
+        return f"<ReplayMoreComments count={self.count}>"
+
+
+class _ReplayForest:
+    def __init__(self, replay: "ReplayReddit", initial: list[dict], batches: list[list[dict]]):
+        self._replay = replay
+        self._comments = [_comment_from_dict(c) for c in initial]
+        self._batches = [list(batch) for batch in batches if batch]
+
+    def _stubs(self) -> list:
+        return [_ReplayMoreComments(self, batch, min((c.get("depth", 0) for c in batch), default=0), len(batch)) for batch in self._batches]
+
+    def list(self) -> list:
+        return self._comments + self._stubs()
+
+    def load_batch(self, batch: list) -> list:
+        """Serves one recorded batch (one request); a batch that was already loaded comes back empty."""
+        if not any(pending is batch for pending in self._batches):
+            return []
+        self._replay._request("more_comments")
+        self._batches = [pending for pending in self._batches if pending is not batch]
+        loaded = [_comment_from_dict(c) for c in batch]
+        self._comments.extend(loaded)
+        return loaded
+
+    def replace_more(self, limit: Optional[int] = 32, threshold: int = 0) -> list:
+        n = len(self._batches) if limit is None else min(limit, len(self._batches))
+        for _ in range(n):
+            self._replay._request("more_comments")
+            self._comments.extend(_comment_from_dict(c) for c in self._batches.pop(0))
+        return self._stubs()
+
+    def __iter__(self):
+        return iter([c for c in self._comments if c.depth == 0])
+
+    def __len__(self) -> int:
+        return len(self._comments)
+
+
+class _ReplaySubmission:
+    def __init__(self, replay: "ReplayReddit", submission_id: str):
+        self._replay = replay
+        self.id = submission_id
+        self._forest = None
+        data = replay.fixture.submissions.get(submission_id)
+        if data is not None:
+            self.__dict__.update(vars(_submission_from_dict(data)))
+
+    @property
+    def comments(self) -> _ReplayForest:
+        if self._forest is None:
+            self._replay._request("comments")
+            recorded = self._replay.fixture.comments.get(self.id)
+            if recorded is None:
+                self._replay.count_miss()
+                print(f"⚠️ [replay] No recorded comments for submission {self.id}; serving an empty forest.")
+                recorded = {"initial": [], "batches": []}
+            self._forest = _ReplayForest(self._replay, recorded["initial"], recorded["batches"])
+        return self._forest
+
+
+class _ReplaySubreddit:
+    def __init__(self, replay: "ReplayReddit", display_name: str):
+        self._replay = replay
+        self.display_name = display_name
+
+    def search(self, query: str, sort: str = "relevance", time_filter: str = "all", limit: Optional[int] = 100, **kwargs):
+        fixture = self._replay.fixture
+        results = fixture.find_search(self.display_name, query, sort, time_filter, limit)
+        if results is None and "+" in self.display_name:
+            # A multireddit search that was never recorded as such: interleave the recorded
+            # per-subreddit results, which approximates Reddit's merged relevance listing.
+            per_sub = [fixture.find_search(name, query, sort, time_filter, limit) for name in self.display_name.split("+")]
+            if all(r is not None for r in per_sub):
+                merged = [item for group in _round_robin(per_sub) for item in group]
+                results = merged[:limit]
+        pages = max(1, math.ceil(min(limit or 100, len(results or [])) / 100))
+        for _ in range(pages):
+            self._replay._request("search")
+        if results is None:
+            self._replay.count_miss()
+            print(f"⚠️ [replay] No recorded search for r/{self.display_name} '{query}' ({sort}, {time_filter}, limit {limit}).")
+            return iter([])
+        return iter([_submission_from_dict(data) for data in results])
+
+
+def _round_robin(lists: list[list]) -> list[list]:
+    """Round-robin rows over several lists of different lengths, skipping exhausted ones."""
+    rows = []
+    for i in range(max((len(items) for items in lists), default=0)):
+        rows.append([items[i] for items in lists if i < len(items)])
+    return rows
+
+
+class ReplayReddit:
+    """
+    Offline `praw.Reddit` stand-in serving a fixture recorded by RecordingReddit (or built synthetically).
+    - latency/jitter: seconds slept per request (jitter is uniform +/- and seeded, so runs are repeatable)
+    - requests_per_minute: sliding-window limit like Reddit's; None disables it
+    - on_rate_limit: "sleep" waits for a free slot, "error" raises ReplayRateLimitError
+    Request counts per kind (search, comments, more_comments, info) and misses are kept in `stats`.
+    All mutable state is guarded by one lock, so a single instance may serve every worker thread.
+    """
+
+    thread_safe = True
+
+    def __init__(
+        self,
+        fixture_path: Optional[str] = None,
+        fixture: Optional[ReplayFixture] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        on_rate_limit: str = "sleep",
+        seed: int = 0
+    ):
+        self.fixture = fixture if fixture is not None else ReplayFixture.load(fixture_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests_per_minute = requests_per_minute
+        self.on_rate_limit = on_rate_limit
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._window = deque()
+        self._lock = threading.Lock()
+        print(f"⏯️ Replaying Reddit from {fixture_path or 'an in-memory fixture'} "
+              f"({len(self.fixture.searches)} searches, {len(self.fixture.comments)} comment forests)")
+
+    def _request(self, kind: str) -> None:
+        """Accounts for one simulated HTTP request: rate limit first, then latency."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests_per_minute:
+                while self._window and self._window[0] <= now - 60.0:
+                    self._window.popleft()
+                if len(self._window) >= self.requests_per_minute:
+                    if self.on_rate_limit == "error":
+                        self.stats["rate_limited"] += 1
+                        raise ReplayRateLimitError(f"Replay rate limit of {self.requests_per_minute} requests/minute exceeded.")
+                    # The slot frees up 60s after the request that is `requests_per_minute` back.
+                    wait = self._window[-self.requests_per_minute] + 60.0 - now
+                    self.stats["rate_limit_waits"] += 1
+                self._window.append(now + wait)
+            delay = wait + max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            self.stats[kind] += 1
+            self.stats["requests"] += 1
+        if delay > 0:
+            time.sleep(delay)
+
+    def count_miss(self) -> None:
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def subreddit(self, display_name: str) -> _ReplaySubreddit:
+        return _ReplaySubreddit(self, display_name)
+
+    def submission(self, id: Optional[str] = None, **kwargs) -> _ReplaySubmission:
+        return _ReplaySubmission(self, id)
+
+    def info(self, fullnames=None, **kwargs):
+        fullnames = list(fullnames or [])
+        for _ in range(max(1, math.ceil(len(fullnames) / 100))):
+            self._request("info")
+        for fullname in fullnames:
+            data = self.fixture.submissions.get(fullname.split("_", 1)[-1])
+            if data is not None:
+                yield _submission_from_dict(data)
@@ -0,0 +1,142 @@
+# FILE: src/services/report_cache.py
+
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from src.config import (
+    REPORT_CACHE_SCOPE, REPORT_CACHE_MAX_REPORTS, REPORT_CACHE_REFRESH_SECONDS
+)
+from src.database import get_recent_reports
+from src.services.report_index import informative_terms, is_failed_report, report_synopsis
+
+# Request topics are compared with stored topics; questions with everything a report covers.
+TOPIC_WEIGHT = 0.5
+
+
+def _normalize(term: str) -> str:
+    """Folds simple plurals ("frameworks" -> "framework") so topics and questions match either form."""
+    if len(term) > 3 and term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        return term[:-1]
+    return term
+
+
+def _terms(text: str) -> set:
+    return {_normalize(term) for term in informative_terms(text)}
+
+
+class StoredReport:
+    """A stored research report and the terms (of its topic, and of its headings and summary) it is matched on."""
+    __slots__ = ("id", "user_id", "topic", "content", "created_at", "topic_terms", "terms")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row.get("id")
+        self.user_id = row.get("user_id")
+        self.topic = row.get("topic") or ""
+        self.content = row.get("content") or ""
+        self.created_at = row.get("created_at")
+        self.topic_terms = _terms(self.topic)
+        self.terms = self.topic_terms | _terms(report_synopsis(self.content))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The same shape as a `get_latest_report` row."""
+        return {"id": self.id, "topic": self.topic, "content": self.content, "created_at": self.created_at}
+
+
+class ReportCatalog:
+    """
+    Stored reports scored against a new research request locally, without an LLM call.
+    similarity = TOPIC_WEIGHT * (share of the request topic's terms in the stored topic)
+               + (1 - TOPIC_WEIGHT) * (share of the question's terms in the report's headings and summary),
+    where each share is weighted by idf over the catalog, so words every stored report uses count for little.
+    """
+
+    def __init__(self, rows: Optional[list] = None):
+        self.reports: list[StoredReport] = []
+        self.doc_freq: Counter = Counter()
+        self.loaded_at = time.monotonic()
+        for row in rows or []:
+            self.add(row)
+
+    def __len__(self) -> int:
+        return len(self.reports)
+
+    def add(self, row: Dict[str, Any]) -> Optional[StoredReport]:
+        """Indexes a stored report; failure notices saved by older versions are skipped."""
+        if is_failed_report(row.get("content") or ""):
+            return None
+        report = StoredReport(row)
+        self.reports.append(report)
+        self.doc_freq.update(report.terms)
+        return report
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self.reports)) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def _coverage(self, query: set, terms: set) -> float:
+        """Idf-weighted share of `query` found in `terms`."""
+        total = sum(self._idf(term) for term in query)
+        return sum(self._idf(term) for term in query & terms) / total if total else 0.0
+
+    def similarity(self, report: StoredReport, topic_terms: set, question_terms: set) -> float:
+        topic_score = self._coverage(topic_terms, report.topic_terms) if topic_terms else 0.0
+        question_score = self._coverage(question_terms, report.terms) if question_terms else topic_score
+        return TOPIC_WEIGHT * topic_score + (1 - TOPIC_WEIGHT) * question_score
+
+    def best_match(self, topic: str, question: str) -> tuple[Optional[StoredReport], float]:
+        """The stored report most similar to the request and its similarity (0-1); the newest wins ties."""
+        topic_terms, question_terms = _terms(topic), _terms(question)
+        if not (topic_terms or question_terms) or not self.reports:
+            return None, 0.0
+        best, best_score = None, 0.0
+        # Newest first, so an older report only wins with a strictly higher score.
+        for report in sorted(self.reports, key=lambda r: str(r.created_at or ""), reverse=True):
+            score = self.similarity(report, topic_terms, question_terms)
+            if score > best_score:
+                best, best_score = report, score
+        return best, best_score
+
+
+# One catalog per user (or a single global one), loaded from the database and refreshed periodically.
+_catalogs: Dict[str, ReportCatalog] = {}
+_catalogs_lock = threading.Lock()
+_GLOBAL_KEY = "*"
+
+
+def _catalog_key(user_id: str) -> str:
+    return _GLOBAL_KEY if REPORT_CACHE_SCOPE == "global" else user_id
+
+
+def get_report_catalog(user_id: str) -> ReportCatalog:
+    """
+    Returns the catalog of stored reports this user's requests are matched against: their own reports,
+    or every user's with REPORT_CACHE_SCOPE=global. Loaded from the database on first use and again after
+    REPORT_CACHE_REFRESH_SECONDS; reports saved in this process are added as they are saved.
+    """
+    key = _catalog_key(user_id)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is not None and time.monotonic() - catalog.loaded_at < REPORT_CACHE_REFRESH_SECONDS:
+            return catalog
+    rows = get_recent_reports(None if key == _GLOBAL_KEY else user_id, limit=REPORT_CACHE_MAX_REPORTS)
+    catalog = ReportCatalog(rows)
+    print(f"🗂️ Report catalog loaded: {len(catalog)} stored report(s) ({'global' if key == _GLOBAL_KEY else 'per user'}).")
+    with _catalogs_lock:
+        _catalogs[key] = catalog
+    return catalog
+
+
+def remember_report(user_id: str, report_id: Optional[str], topic: str, content: str) -> None:
+    """Adds a newly saved report to the loaded catalog, so the next request can reuse it without a reload."""
+    with _catalogs_lock:
+        catalog = _catalogs.get(_catalog_key(user_id))
+        if catalog is not None:
+            catalog.add({"id": report_id, "user_id": user_id, "topic": topic, "content": content,
+                         "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())})
+
+
+def reset_report_catalogs() -> None:
+    with _catalogs_lock:
+        _catalogs.clear()
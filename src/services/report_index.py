@@ -0,0 +1,188 @@
+# FILE: src/services/report_index.py
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from src.config import REPORT_QA_MAX_TOKENS, REPORT_QA_MIN_COVERAGE
+from src.utils.bm25_index import BM25Index, informative_terms, tokenize
+from src.utils.context_packer import count_tokens
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+# Report sub-sections are often written as a bold line on their own, e.g. "**2.1. Rust in Game Development:**".
+_BOLD_HEADING = re.compile(r"^\*\*([^*]{3,120})\*\*:?\s*$")
+
+# Questions asking for the report as a whole are answered from the full report.
+_BROAD_TERMS = {"summary", "summarize", "summarise", "overview", "overall", "everything", "main", "key", "general"}
+
+
+# Written by the report generator instead of (or, mid-stream, after part of) a report when generation fails.
+REPORT_FAILED_HEADING = "# Report Generation Failed"
+NO_CONTENT_NOTICE = "No relevant content could be processed."
+_FAILED_REPORT = re.compile(r"^" + re.escape(REPORT_FAILED_HEADING), re.MULTILINE)
+
+
+def is_failed_report(report: str) -> bool:
+    """True for failure notices and empty placeholders, which must never be stored or reused as reports."""
+    text = (report or "").strip()
+    return not text or bool(_FAILED_REPORT.search(text)) or text.endswith(NO_CONTENT_NOTICE)
+
+
+class ReportChunk:
+    """One paragraph (or bullet) of a report, with the headings of the sections it belongs to."""
+    __slots__ = ("order", "section_path", "text", "tokens")
+
+    def __init__(self, order: int, section_path: tuple, text: str):
+        self.order = order
+        self.section_path = section_path
+        self.text = text
+        self.tokens = count_tokens(text)
+
+
+def chunk_report(report: str) -> tuple[list[ReportChunk], list[tuple[int, str]]]:
+    """
+    Splits a markdown report into paragraph chunks, each tagged with its section path.
+    Returns (chunks, outline), where outline lists every (level, heading) in report order.
+    """
+    chunks: list[ReportChunk] = []
+    outline: list[tuple[int, str]] = []
+    path: list[tuple[int, str]] = []
+    paragraph: list[str] = []
+
+    def flush():
+        text = "\n".join(paragraph).strip()
+        paragraph.clear()
+        if text:
+            chunks.append(ReportChunk(len(chunks), tuple(heading for _, heading in path), text))
+
+    for line in report.splitlines():
+        heading = _HEADING.match(line)
+        bold = None if heading else _BOLD_HEADING.match(line.strip())
+        if heading or bold:
+            flush()
+            level = len(heading.group(1)) if heading else 7
+            title = (heading.group(2) if heading else bold.group(1)).strip().rstrip(":")
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, title))
+            outline.append((level, title))
+        elif not line.strip():
+            flush()
+        else:
+            paragraph.append(line)
+    flush()
+    return chunks, outline
+
+
+# Sections a report is matched on (besides its topic and headings) when deciding whether it can be reused.
+_SUMMARY_HEADING = re.compile(r"summary|overview|key\s+takeaways|tl;?dr", re.IGNORECASE)
+# Leading paragraphs used instead when a report has no summary section.
+_FALLBACK_SUMMARY_CHUNKS = 3
+
+
+def report_synopsis(report: str) -> str:
+    """
+    What a report is about, for matching new requests against it: every heading plus the executive
+    summary (or, without one, the opening paragraphs). Details further down are left out, since a long
+    report mentions most words of its domain somewhere.
+    """
+    chunks, outline = chunk_report(report or "")
+    summary = [chunk.text for chunk in chunks if any(_SUMMARY_HEADING.search(heading) for heading in chunk.section_path)]
+    if not summary:
+        summary = [chunk.text for chunk in chunks[:_FALLBACK_SUMMARY_CHUNKS]]
+    return "\n".join([heading for _, heading in outline] + summary)
+
+
+class ReportIndex:
+    """BM25 index over one report's paragraphs; section headings are indexed with each paragraph."""
+
+    MIN_RELATIVE_SCORE = 0.3
+
+    def __init__(self, report: str):
+        self.report = report
+        self.report_tokens = count_tokens(report)
+        self.chunks, self.outline = chunk_report(report)
+        self.index = BM25Index()
+        for chunk in self.chunks:
+            self.index.add(tokenize(" ".join(chunk.section_path)) + tokenize(chunk.text))
+
+    def question_terms(self, question: str) -> list[str]:
+        return informative_terms(question)
+
+    def retrieve(self, question: str, max_tokens: int = REPORT_QA_MAX_TOKENS) -> tuple[list[ReportChunk], float]:
+        """
+        The best-ranked paragraphs for the question that fit in `max_tokens`, in report order, and the
+        share of the question's informative terms they cover (0.0 when the question has none).
+        """
+        terms = self.question_terms(question)
+        if not terms:
+            return [], 0.0
+        ranked = self.index.top_k(terms, len(self.chunks))
+        if not ranked:
+            return [], 0.0
+        # Paragraphs far below the best match only share a common word or two with the question.
+        min_score = ranked[0][0] * self.MIN_RELATIVE_SCORE
+        selected, used = [], 0
+        for score, i in ranked:
+            chunk = self.chunks[i]
+            if score >= min_score and used + chunk.tokens <= max_tokens:
+                selected.append(chunk)
+                used += chunk.tokens
+        selected.sort(key=lambda chunk: chunk.order)
+        covered = set()
+        for chunk in selected:
+            covered.update(tokenize(" ".join(chunk.section_path) + " " + chunk.text))
+        return selected, len(covered.intersection(terms)) / len(terms)
+
+    def context_for(self, question: str, max_tokens: int = REPORT_QA_MAX_TOKENS,
+                    min_coverage: float = REPORT_QA_MIN_COVERAGE) -> tuple[str, bool]:
+        """
+        Returns (context, is_excerpt). The context is the report outline plus the relevant passages
+        under their section headings. It is the full report when that is about as small anyway, when the
+        question is about the report as a whole, or when the passages cover too little of the question.
+        """
+        if self.report_tokens <= max_tokens * 1.5:
+            return self.report, False
+        if _BROAD_TERMS.intersection(tokenize(question)):
+            print("-> Broad question: answering from the full report.")
+            return self.report, False
+        passages, coverage = self.retrieve(question, max_tokens)
+        if not passages or coverage < min_coverage:
+            print(f"-> Retrieval confidence too low (coverage {coverage:.0%}); answering from the full report.")
+            return self.report, False
+
+        parts = ["Report outline:\n"]
+        parts.extend(f"{'  ' * (min(level, 4) - 1)}- {title}\n" for level, title in self.outline)
+        last_path = None
+        for chunk in passages:
+            if chunk.section_path != last_path:
+                parts.append(f"\n### {' > '.join(chunk.section_path[-2:]) or 'Introduction'}\n")
+                last_path = chunk.section_path
+            parts.append(chunk.text + "\n\n")
+        context = "".join(parts)
+        print(f"-> Answering from {len(passages)} of {len(self.chunks)} report passages "
+              f"(~{count_tokens(context):,} of {self.report_tokens:,} tokens, coverage {coverage:.0%}).")
+        return context, True
+
+
+# Indexes of recently answered reports, so follow-up questions on the same report reuse them.
+_MAX_CACHED_INDEXES = 16
+_report_indexes: "OrderedDict[str, ReportIndex]" = OrderedDict()
+_report_indexes_lock = threading.Lock()
+
+
+def get_report_index(report: str) -> ReportIndex:
+    """Returns the index for a report's content, building it on first use."""
+    key = hashlib.sha1(report.encode("utf-8")).hexdigest()
+    with _report_indexes_lock:
+        index = _report_indexes.get(key)
+        if index is not None:
+            _report_indexes.move_to_end(key)
+            return index
+    index = ReportIndex(report)
+    with _report_indexes_lock:
+        _report_indexes[key] = index
+        while len(_report_indexes) > _MAX_CACHED_INDEXES:
+            _report_indexes.popitem(last=False)
+    return index
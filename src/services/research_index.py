@@ -0,0 +1,116 @@
+# FILE: src/services/research_index.py
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from src.config import REDDIT_BM25_SCORE_PRIOR
+from src.models import RedditPost, RedditComment
+from src.utils.bm25_index import BM25Index, tokenize
+from src.utils.top_k import TopK
+
+
+class ResearchIndex:
+    """
+    BM25 index over one run's posts (title + body) and comments, with the Reddit score as a prior:
+    rank = BM25 + prior_weight * log(1 + max(score, 0)).
+    Built once per corpus, it answers both the initial top-k selection and later follow-up
+    questions without rescanning any text.
+    """
+
+    # Title tokens are indexed twice, so title matches weigh more than body matches.
+    TITLE_REPEAT = 2
+
+    def __init__(self, posts: list[RedditPost], score_prior_weight: float = REDDIT_BM25_SCORE_PRIOR):
+        self.posts = posts
+        self.score_prior_weight = score_prior_weight
+        self.comments: list[RedditComment] = []
+        self.comment_owner: list[int] = []
+        self.post_index = BM25Index()
+        self.comment_index = BM25Index()
+        for i, post in enumerate(posts):
+            tokens = tokenize(post.title) * self.TITLE_REPEAT + tokenize(post.selftext)
+            self.post_index.add(tokens, prior=self._prior(post.score))
+            for comment in post.comments:
+                self.comment_index.add(tokenize(comment.body), prior=self._prior(comment.score))
+                self.comments.append(comment)
+                self.comment_owner.append(i)
+
+    def _prior(self, score: Optional[int]) -> float:
+        return self.score_prior_weight * math.log1p(max(score or 0, 0))
+
+    @staticmethod
+    def query_terms(phrases: Iterable[str]) -> list[str]:
+        """Tokenizes keywords/phrases (or a free-text question) into unique query terms."""
+        return sorted({term for phrase in phrases for term in tokenize(phrase)})
+
+    def select(
+        self,
+        keywords: Iterable[str],
+        top_submissions_k: int = 10,
+        top_posts_k: int = 40,
+        top_comments_k: int = 50
+    ) -> tuple[list[RedditPost], list[RedditPost], list[RedditComment]]:
+        """
+        Returns the same three lists as the keyword scorer: top submissions (post + all of its
+        comments), top posts (title/body only) and top comments. Sets `comment.relevance` to the
+        comment's BM25 score.
+        """
+        terms = self.query_terms(keywords)
+        post_scores = self.post_index.scores(terms)
+        comment_scores = self.comment_index.scores(terms)
+
+        for j, comment in enumerate(self.comments):
+            comment.relevance = round(comment_scores.get(j, 0.0), 3)
+        submission_relevance = [post_scores.get(i, 0.0) for i in range(len(self.posts))]
+        for j, score in comment_scores.items():
+            submission_relevance[self.comment_owner[j]] += score
+
+        top_submission_heap = TopK(top_submissions_k)
+        for i, relevance in enumerate(submission_relevance):
+            top_submission_heap.push(relevance + self.post_index.prior(i), self.posts[i])
+        top_posts = [self.posts[i] for _, i in self.post_index.top_k(terms, top_posts_k)]
+        top_comments = [self.comments[j] for _, j in self.comment_index.top_k(terms, top_comments_k)]
+        return top_submission_heap.items(), top_posts, top_comments
+
+    def search(self, question: str, top_posts_k: int = 5, top_comments_k: int = 10) -> tuple[list[RedditPost], list[RedditComment]]:
+        """Ranks posts and comments against a free-text follow-up question."""
+        terms = self.query_terms([question])
+        return (
+            [self.posts[i] for _, i in self.post_index.top_k(terms, top_posts_k)],
+            [self.comments[j] for _, j in self.comment_index.top_k(terms, top_comments_k)],
+        )
+
+
+# Indexes of recently used corpora, so follow-up questions in the same process reuse them.
+_MAX_CACHED_INDEXES = 8
+_corpus_indexes: "OrderedDict[tuple, ResearchIndex]" = OrderedDict()
+_corpus_indexes_lock = threading.Lock()
+
+
+def get_corpus_index(corpus: dict) -> ResearchIndex:
+    """Returns the index for a stored research corpus, building it only when the corpus changed."""
+    key = (corpus["topic"], corpus.get("updated_at"), len(corpus["posts"]))
+    with _corpus_indexes_lock:
+        index = _corpus_indexes.get(key)
+        if index is not None:
+            _corpus_indexes.move_to_end(key)
+            return index
+    index = ResearchIndex(corpus["posts"])
+    print(f"📇 Indexed {len(index.posts)} posts and {len(index.comments)} comments for '{corpus['topic']}'.")
+    with _corpus_indexes_lock:
+        _corpus_indexes[key] = index
+        while len(_corpus_indexes) > _MAX_CACHED_INDEXES:
+            _corpus_indexes.popitem(last=False)
+    return index
+
+
+def find_cached_corpus_index(topic: str) -> Optional[ResearchIndex]:
+    """The most recently used in-memory index for `topic`'s corpus, or None if none was built in this process."""
+    with _corpus_indexes_lock:
+        for key in reversed(_corpus_indexes):
+            if key[0] == topic:
+                _corpus_indexes.move_to_end(key)
+                return _corpus_indexes[key]
+    return None
@@ -0,0 +1,74 @@
+# FILE: src/utils/batch_scorer.py
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.utils.keyword_scorer import KeywordScorer
+
+
+class BatchScores:
+    """
+    Relevance scores for a whole batch of submissions, as NumPy arrays.
+    - tf: term-frequency matrix, one row per text (titles, then bodies, then comments), one column per keyword
+    - post_scores[i]: title hits x5 + body hits x2 of submission i
+    - comment_scores[j], comment_hits[j]: weighted score and raw hits of comment j (flattened in submission order)
+    - comment_owner[j]: index of the submission comment j belongs to
+    - submission_relevance[i]: post_scores[i] + raw hits of all of submission i's comments
+    """
+
+    def __init__(self, tf, post_scores, comment_scores, comment_hits, comment_owner, submission_relevance):
+        self.tf = tf
+        self.post_scores = post_scores
+        self.comment_scores = comment_scores
+        self.comment_hits = comment_hits
+        self.comment_owner = comment_owner
+        self.submission_relevance = submission_relevance
+
+
+def term_frequency_matrix(scorer: KeywordScorer, texts: Sequence[str]) -> np.ndarray:
+    """
+    Counts every keyword in every text in one pass per text and returns a (texts x keywords) matrix.
+    Counts follow `KeywordScorer` semantics (case-insensitive, substring, non-overlapping per keyword).
+    """
+    n_keywords = len(scorer.keywords)
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        hits = scorer.hits(text)
+        rows.extend([row] * len(hits))
+        cols.extend(hits)
+    if not n_keywords:
+        return np.zeros((len(texts), 0), dtype=np.int64)
+    flat = np.asarray(rows, dtype=np.int64) * n_keywords + np.asarray(cols, dtype=np.int64)
+    return np.bincount(flat, minlength=len(texts) * n_keywords).reshape(len(texts), n_keywords)
+
+
+def score_batch(scorer: KeywordScorer, titles: Sequence[str], bodies: Sequence[str], comments_per_post: Sequence[Sequence[str]]) -> BatchScores:
+    """
+    Scores all titles, bodies and comments of a batch at once. Weights are the same as
+    `KeywordScorer.score_post` / `score_comment`, so every score equals the per-item one.
+    """
+    n_posts = len(titles)
+    comment_texts = [body for comments in comments_per_post for body in comments]
+    comment_owner = np.repeat(np.arange(n_posts, dtype=np.int64), [len(comments) for comments in comments_per_post])
+
+    tf = term_frequency_matrix(scorer, [*titles, *bodies, *comment_texts])
+    hits = tf.sum(axis=1)
+    title_hits, body_hits, comment_hits = hits[:n_posts], hits[n_posts:2 * n_posts], hits[2 * n_posts:]
+
+    post_scores = title_hits * KeywordScorer.TITLE_WEIGHT + body_hits * KeywordScorer.BODY_WEIGHT
+    comment_scores = comment_hits * KeywordScorer.COMMENT_WEIGHT
+    submission_relevance = post_scores + np.bincount(comment_owner, weights=comment_hits, minlength=n_posts).astype(np.int64)
+    return BatchScores(tf, post_scores, comment_scores, comment_hits, comment_owner, submission_relevance)
+
+
+def top_k_indices(rank_scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first. Ties keep their original order, exactly like
+    a stable `sort(key=score, reverse=True)[:k]`. Entries where `mask` is False are skipped.
+    """
+    candidates = np.arange(len(rank_scores)) if mask is None else np.flatnonzero(mask)
+    if k <= 0 or not len(candidates):
+        return candidates[:0]
+    order = np.argsort(-rank_scores[candidates], kind="stable")
+    return candidates[order[:k]]
@@ -0,0 +1,95 @@
+# FILE: src/utils/bm25_index.py
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from src.utils.top_k import TopK
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+|(?:['.][a-z0-9]+)*)")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens. Keeps tokens like "c++", "c#", "node.js" and "don't" whole."""
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+# Words that say nothing about what a text (a report, a question, a chat message) is about.
+_STOPWORDS = set("""
+a an and are as at be been but by can could did do does doing for from had has have how i if in into is it its
+me my of on or our should so than that the their them then there these they this those to us was we were what
+when where which who whom why will with would you your about any some more most much many very just also
+people users user reddit redditors community think say said tell please know report
+""".split())
+
+
+def informative_terms(text: str) -> list[str]:
+    """Unique tokens of `text` that say something about its subject (stopwords and single characters removed)."""
+    return sorted({term for term in tokenize(text) if term not in _STOPWORDS and len(term) > 1})
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 ranking.
+    Each term maps to a postings list of (doc id, term frequency), so a query only touches the
+    documents that contain at least one of its terms, never the whole corpus. Documents are
+    added once; statistics (idf, average length) are computed lazily on the first query.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+        self._priors: list[float] = []
+        self._avg_length: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, tokens: list[str], prior: float = 0.0) -> int:
+        """Indexes a tokenized document and returns its doc id. `prior` is added to its ranking score."""
+        doc_id = len(self._lengths)
+        for term, tf in Counter(tokens).items():
+            self._postings.setdefault(term, []).append((doc_id, tf))
+        self._lengths.append(len(tokens))
+        self._priors.append(prior)
+        self._avg_length = None
+        return doc_id
+
+    def idf(self, term: str) -> float:
+        n_docs = len(self._lengths)
+        df = len(self._postings.get(term, ()))
+        # The "+1" variant never goes negative, so very common terms still count a little.
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def scores(self, query_terms: Iterable[str]) -> Dict[int, float]:
+        """BM25 score of every document matching at least one query term (without priors)."""
+        if self._avg_length is None:
+            self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        avg_length = self._avg_length or 1.0
+        scores: Dict[int, float] = {}
+        # Sorted so that accumulation (and therefore tie order) does not depend on set ordering.
+        for term in sorted(set(query_terms)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def prior(self, doc_id: int) -> float:
+        return self._priors[doc_id]
+
+    def top_k(self, query_terms: Iterable[str], k: int) -> list[tuple[float, int]]:
+        """
+        The k best (score, doc id) pairs for the query, best first, where score = BM25 + prior.
+        Only documents matching the query are ranked; ties go to the earlier document.
+        """
+        best = TopK(k)
+        for doc_id, score in sorted(self.scores(query_terms).items()):
+            best.push(score + self._priors[doc_id], doc_id)
+        return best.scored_items()
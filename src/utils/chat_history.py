@@ -0,0 +1,159 @@
+# FILE: src/utils/chat_history.py
+
+import re
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional
+
+from src.config import (
+    ROUTER_HISTORY_RECENT_MESSAGES, ROUTER_HISTORY_MAX_MESSAGE_CHARS, ROUTER_HISTORY_SUMMARY_LINES
+)
+from src.utils.bm25_index import informative_terms
+
+_TITLE = re.compile(r"\*\*Title:\*\*\s*(.*)")
+_WHITESPACE = re.compile(r"\s+")
+_URL = re.compile(r"https?://[^\s<>\"')\]]+", re.IGNORECASE)
+# Words of requests to the assistant itself, which say nothing about what the conversation is about.
+_COMMAND_TERMS = set("""
+post posts write create make generate draft research find search give show want need like get new
+title shorter longer text tweet share link url article
+""".split())
+# Length of the preview kept for a message folded into the summary.
+SUMMARY_PREVIEW_CHARS = 100
+# Caps on the digest of folded messages.
+DIGEST_MAX_TOPIC_TERMS = 10
+DIGEST_MAX_REPORTS = 5
+DIGEST_MAX_LINKS = 3
+# Distinct topic terms counted before the rarest are dropped (keeping the most frequent half).
+DIGEST_MAX_TRACKED_TERMS = 200
+
+
+def _preview(text: str, limit: int) -> str:
+    text = _WHITESPACE.sub(" ", text or "").strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def compact_message(message: Dict[str, str], max_chars: int = ROUTER_HISTORY_MAX_MESSAGE_CHARS) -> str:
+    """
+    The message's text, or a compact reference to it when it is longer than `max_chars`.
+    A generated post keeps its title (so it can still be revised); other long outputs keep their opening.
+    """
+    content = message.get("content") or ""
+    if len(content) <= max_chars:
+        return content
+    title = _TITLE.search(content)
+    if message.get("role") == "assistant" and "**Post Text:**" in content:
+        return f'[Generated post draft, title "{_preview(title.group(1) if title else "Untitled", 120)}", {len(content):,} chars]'
+    kind = "Long answer" if message.get("role") == "assistant" else "Long message"
+    return f'[{kind}, {len(content):,} chars: "{_preview(content, max_chars // 3)}"]'
+
+
+class ChatHistoryContext:
+    """
+    Bounded view of a chat for the router prompt: the last ROUTER_HISTORY_RECENT_MESSAGES messages
+    (long ones as compact references), under a rolling summary of everything older.
+    The summary is updated incrementally: each message is folded into it once, as it leaves the recent
+    window. It keeps a digest of every folded message (the topics the user raised, the research reports
+    and post drafts produced, the links shared) plus previews of the latest ROUTER_HISTORY_SUMMARY_LINES
+    of them; each part is capped, so the rendered context stays the same size however long the chat gets.
+    """
+
+    def __init__(self, recent_messages: int = ROUTER_HISTORY_RECENT_MESSAGES,
+                 max_message_chars: int = ROUTER_HISTORY_MAX_MESSAGE_CHARS,
+                 summary_lines: int = ROUTER_HISTORY_SUMMARY_LINES):
+        self.recent_messages = recent_messages
+        self.max_message_chars = max_message_chars
+        self.summary_lines = summary_lines
+        self.reset()
+
+    def reset(self) -> None:
+        self.lines: deque = deque(maxlen=self.summary_lines)
+        self.folded = 0
+        self.omitted = 0
+        self._last_folded: Optional[int] = None
+        # Digest of every folded message.
+        self.topic_terms: Counter = Counter()
+        self.reports: "OrderedDict[str, str]" = OrderedDict()
+        self.drafts = 0
+        self.last_draft_title: Optional[str] = None
+        self.links: deque = deque(maxlen=DIGEST_MAX_LINKS)
+
+    @staticmethod
+    def _fingerprint(message: Dict[str, str]) -> int:
+        return hash((message.get("role"), message.get("content")))
+
+    def _digest(self, message: Dict[str, str]) -> None:
+        content = message.get("content") or ""
+        for url in _URL.findall(content):
+            url = url.rstrip(".,;:!")
+            if url not in self.links:
+                self.links.append(url)
+        if message.get("role") == "user":
+            self.topic_terms.update(term for term in informative_terms(_URL.sub(" ", content))
+                                    if term not in _COMMAND_TERMS and not term.isdigit())
+            if len(self.topic_terms) > DIGEST_MAX_TRACKED_TERMS:
+                self.topic_terms = Counter(dict(self.topic_terms.most_common(DIGEST_MAX_TRACKED_TERMS // 2)))
+        elif message.get("role") == "assistant":
+            if "**Post Text:**" in content:
+                title = _TITLE.search(content)
+                self.drafts += 1
+                self.last_draft_title = _preview(title.group(1), 80) if title else "Untitled"
+            report_id = message.get("report_id")
+            if report_id:
+                self.reports.pop(str(report_id), None)
+                self.reports[str(report_id)] = message.get("report_topic") or ""
+                while len(self.reports) > DIGEST_MAX_REPORTS:
+                    self.reports.popitem(last=False)
+
+    def _fold(self, message: Dict[str, str]) -> None:
+        self._digest(message)
+        content = message.get("content") or ""
+        if message.get("role") == "assistant" and len(content) > SUMMARY_PREVIEW_CHARS:
+            line = compact_message(message, SUMMARY_PREVIEW_CHARS)
+        else:
+            line = _preview(content, SUMMARY_PREVIEW_CHARS)
+        if len(self.lines) == self.lines.maxlen:
+            self.omitted += 1
+        self.lines.append(f"- {message.get('role', 'unknown')}: {line}")
+
+    def digest_lines(self) -> List[str]:
+        """The digest of all folded messages, one line per kind of thing remembered."""
+        lines = [f"- {self.folded} earlier message(s), {self.omitted} of them only in this digest"]
+        if self.topic_terms:
+            top = self.topic_terms.most_common(DIGEST_MAX_TOPIC_TERMS)
+            lines.append("- topics the user raised: " + ", ".join(
+                term if count == 1 else f"{term} ({count}x)" for term, count in top))
+        if self.reports:
+            lines.append("- research reports used: " + "; ".join(
+                f"{report_id[:8]} on \"{_preview(topic, 60)}\"" if topic else report_id[:8]
+                for report_id, topic in reversed(self.reports.items())))
+        if self.drafts:
+            lines.append(f'- post drafts generated: {self.drafts} (latest titled "{self.last_draft_title}")')
+        if self.links:
+            lines.append("- links shared: " + ", ".join(_preview(url, 80) for url in reversed(self.links)))
+        return lines
+
+    def update(self, messages: List[Dict[str, str]]) -> None:
+        """Folds messages that have left the recent window into the summary (starting over if the chat was replaced)."""
+        if self.folded > len(messages) or (self.folded and self._fingerprint(messages[self.folded - 1]) != self._last_folded):
+            self.reset()
+        cutoff = max(0, len(messages) - self.recent_messages)
+        for message in messages[self.folded:cutoff]:
+            self._fold(message)
+        if cutoff > self.folded:
+            self.folded = cutoff
+            self._last_folded = self._fingerprint(messages[cutoff - 1])
+
+    def render(self, messages: List[Dict[str, str]]) -> str:
+        """The history block for the router prompt."""
+        self.update(messages)
+        parts = []
+        if self.folded:
+            parts.append("Summary of earlier conversation:")
+            parts.extend(self.digest_lines())
+            parts.append("Latest earlier messages:")
+            parts.extend(self.lines)
+            parts.append("")
+            parts.append("Recent messages:")
+        parts.extend(f"{msg.get('role', 'unknown')}: {compact_message(msg, self.max_message_chars)}"
+                     for msg in messages[self.folded:])
+        return "\n".join(parts)
@@ -0,0 +1,97 @@
+# FILE: src/utils/content_filter.py
+
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+from src.config import (
+    REDDIT_FILTER_BOT_AUTHORS, REDDIT_FILTER_MIN_COMMENT_WORDS, REDDIT_FILTER_LINK_ONLY
+)
+
+_URL_PATTERN = re.compile(r"\[([^\]]*)\]\((?:https?://|www\.)[^)]*\)|(?:https?://|www\.)\S+", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"\w+")
+_REMOVED_BODIES = {"[deleted]", "[removed]", "[ removed by reddit ]", "[removed by reddit]"}
+_BOT_SIGNATURE = re.compile(r"\bi(?:'m| am) a bot\b", re.IGNORECASE)
+
+
+class ContentFilter:
+    """
+    Cheap rule-based filter for Reddit content that is not worth scoring, fetching or prompting:
+    - "deleted": [deleted]/[removed] bodies
+    - "bot": known bot accounts (e.g. AutoModerator) or texts signed "I am a bot"
+    - "too_short": comments with fewer than `min_comment_words` words (one-word replies)
+    - "link_only": comments that are nothing but links, and link posts without body text or discussion
+    Each check returns the rule that matched, or None to keep the item. Dropped items are tallied
+    per rule in `self.counts`.
+    """
+
+    def __init__(self, bot_authors: Iterable[str] = (), min_comment_words: int = 2, drop_link_only: bool = True):
+        self.bot_authors = {author.strip().lower() for author in bot_authors if author.strip()}
+        self.min_comment_words = min_comment_words
+        self.drop_link_only = drop_link_only
+        self.counts = Counter()
+
+    @classmethod
+    def from_config(cls) -> "ContentFilter":
+        return cls(REDDIT_FILTER_BOT_AUTHORS, REDDIT_FILTER_MIN_COMMENT_WORDS, REDDIT_FILTER_LINK_ONLY)
+
+    @staticmethod
+    def _words_without_links(text: str) -> list[str]:
+        # Markdown links keep their label, bare URLs disappear.
+        return _WORD_PATTERN.findall(_URL_PATTERN.sub(lambda m: m.group(1) or " ", text))
+
+    def _common_reason(self, text: str, author: Optional[str]) -> Optional[str]:
+        if text.strip().lower() in _REMOVED_BODIES:
+            return "deleted"
+        if (author and author.lower() in self.bot_authors) or _BOT_SIGNATURE.search(text):
+            return "bot"
+        return None
+
+    def comment_reason(self, body: Optional[str], author: Optional[str] = None) -> Optional[str]:
+        body = body or ""
+        reason = self._common_reason(body, author)
+        if reason is None:
+            words = self._words_without_links(body)
+            if self.drop_link_only and not words and _URL_PATTERN.search(body):
+                reason = "link_only"
+            elif len(words) < self.min_comment_words:
+                reason = "too_short"
+        if reason:
+            self.counts[reason] += 1
+        return reason
+
+    def post_reason(self, title: Optional[str], selftext: Optional[str], url: Optional[str] = None,
+                    permalink: Optional[str] = None, author: Optional[str] = None, num_comments: int = 0) -> Optional[str]:
+        """A link post is only dropped when it has no discussion either; its comments may still be worth reading."""
+        selftext = selftext or ""
+        reason = self._common_reason(selftext, author)
+        url = url or ""
+        # Self posts link to their own thread; anything else is an external link (article, image, video).
+        is_self_post = not url or (permalink and permalink in url) or "/comments/" in url
+        if reason is None and self.drop_link_only and not is_self_post and not num_comments:
+            if not self._words_without_links(selftext):
+                reason = "link_only"
+        if reason:
+            self.counts[reason] += 1
+        return reason
+
+    def summary(self) -> str:
+        if not self.counts:
+            return "nothing dropped"
+        return ", ".join(f"{reason}: {count}" for reason, count in self.counts.most_common())
+
+
+def filter_consolidated_data(consolidated_data: list[dict], content_filter: ContentFilter) -> list[dict]:
+    """Drops low-value posts and comments from consolidated report data (the `scrape_validated_posts` format)."""
+    filtered = []
+    for item in consolidated_data:
+        item_type = item.get("type")
+        if item_type in ("full_submission", "individual_post"):
+            if content_filter.post_reason(item.get("title"), item.get("selftext"), item.get("url"), num_comments=len(item.get("top_comments", []))):
+                continue
+        if item_type == "full_submission":
+            item["top_comments"] = [c for c in item.get("top_comments", []) if not content_filter.comment_reason(c.get("body"))]
+        elif item_type == "comment_nuggets":
+            item["comments"] = [c for c in item.get("comments", []) if not content_filter.comment_reason(c.get("body"))]
+        filtered.append(item)
+    return filtered
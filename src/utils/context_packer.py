@@ -0,0 +1,187 @@
+# FILE: src/utils/context_packer.py
+
+import math
+import threading
+from collections import Counter
+from typing import Optional
+
+# Packing priority by item type (lower first); ties go to the higher score.
+TYPE_PRIORITY = {"full_submission": 0, "comment_nuggets": 1, "individual_post": 2}
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_unavailable = False
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count of `text` with tiktoken's cl100k_base encoding, which tracks Gemini's tokenizer closely
+    for English prose. Falls back to the usual ~4 characters per token when tiktoken (or its encoding
+    file) is unavailable.
+    """
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_unavailable:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"⚠️ tiktoken unavailable ({type(e).__name__}); estimating tokens from characters.")
+                    _encoding_unavailable = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _comment_line(comment: dict, quoted: bool = False) -> str:
+    body = comment.get("body", "")
+    return f"- (Score: {comment.get('score', 0)}) " + (f'"{body}"' if quoted else body) + "\n"
+
+
+def _thread_block(item: dict, comments: list[dict]) -> str:
+    parts = [f"\n\n--- Discussion Thread Start ---\nTitle: {item.get('title', 'N/A')}\nPost Body: {item.get('selftext', 'No body text.')}\n"]
+    if comments:
+        parts.append("Key Comments:\n")
+        parts.extend(_comment_line(c) for c in comments)
+    parts.append("--- Discussion Thread End ---\n")
+    return "".join(parts)
+
+
+def _post_block(item: dict) -> str:
+    return f"\n\n--- Relevant Post ---\nTitle: {item.get('title', 'N/A')}\nPost Body: {item.get('selftext', '')}\n--- End Relevant Post ---\n"
+
+
+_NUGGETS_HEADER = "\n\n--- Highly Relevant Individual Comments ---\n"
+_NUGGETS_FOOTER = "--- End Individual Comments ---\n"
+
+
+class _Unit:
+    """One packable piece: a whole thread, a whole post, or a single nugget comment."""
+    __slots__ = ("order", "kind", "score", "tokens", "item", "comments")
+
+    def __init__(self, order: int, kind: str, score: int, tokens: int, item: dict, comments: Optional[list] = None):
+        self.order = order
+        self.kind = kind
+        self.score = score
+        self.tokens = tokens
+        self.item = item
+        self.comments = comments or []
+
+    def render(self) -> str:
+        if self.kind == "full_submission":
+            return _thread_block(self.item, self.comments)
+        if self.kind == "individual_post":
+            return _post_block(self.item)
+        return _comment_line(self.item, quoted=True)
+
+
+class PackedContext:
+    """Result of `pack_context`: one text block per turn plus what was included, trimmed or dropped."""
+
+    def __init__(self, turns: list[str], turn_tokens: list[int], included: Counter, dropped: Counter, trimmed_comments: int = 0):
+        self.turns = turns
+        self.turn_tokens = turn_tokens
+        self.included = included
+        self.dropped = dropped
+        self.trimmed_comments = trimmed_comments
+
+    def summary(self) -> str:
+        turns = ", ".join(f"{tokens:,}" for tokens in self.turn_tokens) or "0"
+        included = ", ".join(f"{kind}: {n}" for kind, n in self.included.items()) or "nothing"
+        text = f"{len(self.turns)} turn(s) of {turns} tokens; included {included}"
+        if self.dropped:
+            text += "; dropped " + ", ".join(f"{kind}: {n}" for kind, n in self.dropped.items())
+        if self.trimmed_comments:
+            text += f"; {self.trimmed_comments} low-score comments trimmed from oversized threads"
+        return text
+
+
+def _units(consolidated_data: list[dict]) -> list[_Unit]:
+    units = []
+    for item in consolidated_data:
+        kind = item.get("type", "unknown")
+        if kind == "full_submission":
+            comments = list(item.get("top_comments") or [])
+            units.append(_Unit(len(units), kind, item.get("score") or 0, count_tokens(_thread_block(item, comments)), item, comments))
+        elif kind == "individual_post":
+            units.append(_Unit(len(units), kind, item.get("score") or 0, count_tokens(_post_block(item)), item))
+        elif kind == "comment_nuggets":
+            for comment in item.get("comments") or []:
+                units.append(_Unit(len(units), kind, comment.get("score") or 0, count_tokens(_comment_line(comment, quoted=True)), comment))
+    return units
+
+
+def _fit_thread(unit: _Unit, budget: int) -> Optional[_Unit]:
+    """Drops a thread's lowest-scored comments (whole comments only) until it fits in `budget`; None if even the bare post does not."""
+    by_score = sorted(range(len(unit.comments)), key=lambda i: unit.comments[i].get("score") or 0, reverse=True)
+    tokens = count_tokens(_thread_block(unit.item, []))
+    if tokens > budget:
+        return None
+    keep = set()
+    for i in by_score:
+        cost = count_tokens(_comment_line(unit.comments[i]))
+        if tokens + cost <= budget:
+            keep.add(i)
+            tokens += cost
+    comments = [c for i, c in enumerate(unit.comments) if i in keep]
+    return _Unit(unit.order, unit.kind, unit.score, tokens, unit.item, comments)
+
+
+def pack_context(consolidated_data: list[dict], turn_token_budget: int, max_turns: Optional[int] = 2) -> PackedContext:
+    """
+    Packs consolidated report data (the `scrape_validated_posts` format) into at most `max_turns` text
+    blocks of at most `turn_token_budget` tokens each (`max_turns=None` opens as many blocks as needed).
+    - Items are measured in tokens and placed whole, by priority: type (threads, then nugget comments,
+      then posts) and score. Lower-priority items that fit still fill the space left over (first fit).
+    - A thread larger than a whole turn keeps its highest-scored comments that fit; nothing is ever cut mid-text.
+    - Within a turn, items keep their original order; nugget comments are grouped under one header.
+    """
+    units = _units(consolidated_data)
+    wrapper_tokens = count_tokens(_NUGGETS_HEADER + _NUGGETS_FOOTER)
+    turns: list[list[_Unit]] = [[] for _ in range(max_turns or 1)]
+    used = [0] * len(turns)
+    has_nuggets = [False] * len(turns)
+    included, dropped = Counter(), Counter()
+    trimmed = 0
+
+    for unit in sorted(units, key=lambda u: (TYPE_PRIORITY.get(u.kind, 3), -u.score, u.order)):
+        placed = False
+        t = 0
+        while t < len(turns):
+            cost = unit.tokens + (wrapper_tokens if unit.kind == "comment_nuggets" and not has_nuggets[t] else 0)
+            if used[t] + cost > turn_token_budget and max_turns is None and t == len(turns) - 1 and used[t] and cost <= turn_token_budget:
+                # Unlimited turns: open a new block rather than trimming or dropping.
+                turns.append([])
+                used.append(0)
+                has_nuggets.append(False)
+            elif used[t] + cost <= turn_token_budget:
+                turns[t].append(unit)
+                used[t] += cost
+                has_nuggets[t] |= unit.kind == "comment_nuggets"
+                placed = True
+                break
+            t += 1
+        if not placed and unit.kind == "full_submission":
+            # Oversized thread: give it the emptiest turn, keeping as many of its best comments as fit.
+            t = min(range(len(turns)), key=lambda i: used[i])
+            fitted = _fit_thread(unit, turn_token_budget - used[t])
+            if fitted is not None:
+                trimmed += len(unit.comments) - len(fitted.comments)
+                turns[t].append(fitted)
+                used[t] += fitted.tokens
+                placed = True
+        (included if placed else dropped)[unit.kind] += 1
+
+    texts, tokens = [], []
+    for t, turn_units in enumerate(turns):
+        if not turn_units:
+            continue
+        turn_units.sort(key=lambda u: u.order)
+        parts = [u.render() for u in turn_units if u.kind != "comment_nuggets"]
+        nuggets = [u.render() for u in turn_units if u.kind == "comment_nuggets"]
+        if nuggets:
+            parts += [_NUGGETS_HEADER, *nuggets, _NUGGETS_FOOTER]
+        texts.append("".join(parts))
+        tokens.append(used[t])
+    return PackedContext(texts, tokens, included, dropped, trimmed)
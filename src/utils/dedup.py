@@ -0,0 +1,93 @@
+# FILE: src/utils/dedup.py
+
+import hashlib
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+
+from src.utils.bm25_index import tokenize
+
+SIMHASH_BITS = 64
+
+
+def _feature_hash(feature: str) -> int:
+    # Stable across processes (unlike hash()), so fingerprints can be compared between runs.
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash of a text over word shingles. Texts that share most of their shingles
+    get fingerprints a few bits apart; unrelated texts differ in about half the bits.
+    """
+    tokens = tokenize(text)
+    if len(tokens) >= shingle_size:
+        features = Counter(" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+    else:
+        features = Counter(tokens)
+    if not features:
+        return 0
+    hashes = np.array([_feature_hash(feature) for feature in features], dtype=np.uint64)
+    counts = np.fromiter(features.values(), dtype=np.int64, count=len(features))
+    # bits[i, b] is bit b of feature i; each feature votes +count for its set bits, -count otherwise.
+    bits = ((hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)).astype(np.int64)
+    weights = counts @ (2 * bits - 1)
+    return sum(1 << bit for bit in np.flatnonzero(weights > 0).tolist())
+
+
+def _normalized(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+def near_duplicate_clusters(texts: Sequence[str], max_distance: int = 3, min_tokens: int = 5) -> list[list[int]]:
+    """
+    Groups near-duplicate texts and returns clusters of indices (every index appears in exactly one
+    cluster, singletons included, clusters ordered by their first member).
+    - Texts with at least `min_tokens` tokens are near-duplicates when their SimHashes differ in at most
+      `max_distance` bits. Candidates come from splitting the fingerprint into `max_distance + 1` bands:
+      any two fingerprints within the distance share at least one band exactly, so no pair is missed
+      and unrelated texts are never compared.
+    - Shorter texts are only grouped when they are identical after normalisation.
+    """
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    n_bands = max_distance + 1
+    band_width = SIMHASH_BITS // n_bands
+    band_mask = (1 << band_width) - 1
+    buckets: dict[tuple, list[int]] = {}
+    fingerprints: dict[int, int] = {}
+    exact: dict[str, int] = {}
+
+    for i, text in enumerate(texts):
+        normalized = _normalized(text)
+        if normalized in exact:
+            union(exact[normalized], i)
+            continue
+        exact[normalized] = i
+        if len(normalized.split()) < min_tokens:
+            continue
+        fingerprint = simhash(normalized)
+        fingerprints[i] = fingerprint
+        for band in range(n_bands):
+            key = (band, (fingerprint >> (band * band_width)) & band_mask)
+            for j in buckets.get(key, ()):
+                if bin(fingerprint ^ fingerprints[j]).count("1") <= max_distance:
+                    union(j, i)
+            buckets.setdefault(key, []).append(i)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
@@ -0,0 +1,91 @@
+# FILE: src/utils/disk_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+class DiskCache:
+    """
+    Small persistent key/value cache backed by SQLite.
+    - Values are stored as JSON with a per-entry TTL; expired entries are treated as misses.
+    - When the store grows past `max_bytes`, expired entries go first, then least recently used ones.
+    Safe to share between threads; the file can also be shared between processes.
+    """
+
+    # Recount the store size every N writes instead of on each one.
+    _EVICTION_CHECK_INTERVAL = 50
+
+    def __init__(self, path: str, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes_since_check = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Stores a JSON-serialisable value for `ttl` seconds."""
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now + ttl, now)
+            )
+            self._writes_since_check += 1
+            if self._writes_since_check >= self._EVICTION_CHECK_INTERVAL:
+                self._writes_since_check = 0
+                self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def _evict(self, now: float) -> None:
+        """Drops expired entries, then the least recently used ones until the store is under 90% of max_bytes."""
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        freed_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC").fetchall():
+            if total <= target:
+                break
+            freed_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", freed_keys)
+        print(f"🧹 Cache {os.path.basename(self.path)}: evicted {len(freed_keys)} least recently used entries.")
@@ -4,6 +4,7 @@ import re
 import json
 import time
 import random
+import tempfile
 import uuid
 from io import BytesIO
 from typing import TypedDict, Optional, List, Dict, Any, Tuple
@@ -25,8 +26,10 @@ from src.config import (
     OPENAI_API_KEY, FIRE_CRAWL_API_KEY, GEMINI_API_KEY,
     TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET,
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, REDDIT_USERNAME, REDDIT_PASSWORD, REDDIT_SUBREDDIT,
-    SUPABASE_URL, SUPABASE_KEY
+    SUPABASE_URL, SUPABASE_KEY,
+    RESEARCH_CORPUS_DIR
 )
+from src.models import RedditPost
 
 
 
@@ -75,4 +78,57 @@ def save_report_to_file(report: str, topic: str) -> str:
         return filename
     except Exception as e:
         print(f"❌ Failed to save report: {e}")
-        return ""
\ No newline at end of file
+        return ""
+
+
+
+def _corpus_path(topic: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '_', topic.lower()).strip('_') or "untitled"
+    return os.path.join(RESEARCH_CORPUS_DIR, f"corpus_{slug}.json")
+
+
+def save_research_corpus(corpus: dict) -> str:
+    """
+    Saves a topic's full research corpus (posts with their comment forests, keywords and
+    per-subreddit watermarks) so later runs on the same topic can refresh it incrementally.
+    Returns the path to the saved file.
+    """
+    filename = _corpus_path(corpus["topic"])
+    print(f"\n💾 Saving research corpus to file: {filename}")
+    serialisable = dict(corpus)
+    serialisable["posts"] = [post.to_dict(include_comments=True) for post in corpus["posts"]]
+
+    temp_filename = None
+    try:
+        os.makedirs(RESEARCH_CORPUS_DIR, exist_ok=True)
+        # Write to a temp file first so a crash never leaves a half-written corpus behind. Its name is
+        # unique per write, so concurrent sessions saving the same topic never write into one file.
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=RESEARCH_CORPUS_DIR,
+                                         prefix=os.path.basename(filename) + ".", suffix=".tmp", delete=False) as f:
+            temp_filename = f.name
+            json.dump(serialisable, f, ensure_ascii=False)
+        os.replace(temp_filename, filename)
+        print(f"✅ Corpus saved: {len(corpus['posts'])} posts, {os.path.getsize(filename):,} bytes")
+        return filename
+    except Exception as e:
+        print(f"❌ Failed to save research corpus: {e}")
+        if temp_filename and os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        return ""
+
+
+def load_research_corpus(topic: str) -> Optional[dict]:
+    """Loads the stored research corpus for a topic, or returns None if there is none."""
+    filename = _corpus_path(topic)
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            corpus = json.load(f)
+        corpus["posts"] = [RedditPost.from_dict(post) for post in corpus["posts"]]
+        print(f"📂 Loaded research corpus for '{topic}': {len(corpus['posts'])} posts")
+        return corpus
+    except Exception as e:
+        print(f"⚠️ Failed to load research corpus {filename}: {e}")
+        return None
@@ -0,0 +1,60 @@
+# FILE: src/utils/keyword_scorer.py
+
+from typing import Iterable, Dict
+
+import ahocorasick
+
+
+class KeywordScorer:
+    """
+    Counts keyword hits with a single Aho-Corasick pass over each text instead of one
+    `text.count(kw)` scan per keyword. Counts are identical to `sum(text.count(kw) for kw in keywords)`:
+    matching is case-insensitive, substring based, and non-overlapping per keyword.
+    """
+
+    TITLE_WEIGHT = 5
+    BODY_WEIGHT = 2
+    COMMENT_WEIGHT = 3
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({kw.lower() for kw in keywords if kw})
+        self._automaton = ahocorasick.Automaton()
+        for index, kw in enumerate(self.keywords):
+            self._automaton.add_word(kw, (index, len(kw)))
+        if self.keywords:
+            self._automaton.make_automaton()
+
+    def _iter_hits(self, text: str):
+        """Yields the keyword index of every counted hit in `text`."""
+        if not self.keywords or not text:
+            return
+        # str.count semantics: a keyword's next hit must start after its previous hit ended.
+        last_end = {}
+        for end, (index, length) in self._automaton.iter(text.lower()):
+            if end - length >= last_end.get(index, -1):
+                last_end[index] = end
+                yield index
+
+    def count(self, text: str) -> int:
+        """Total number of keyword hits in `text`."""
+        return sum(1 for _ in self._iter_hits(text))
+
+    def hits(self, text: str) -> list[int]:
+        """Keyword index of every counted hit in `text`, in order of appearance."""
+        return list(self._iter_hits(text))
+
+    def keyword_counts(self, text: str) -> Dict[int, int]:
+        """Hits per keyword, keyed by the keyword's index in `self.keywords`."""
+        counts: Dict[int, int] = {}
+        for index in self._iter_hits(text):
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def score_post(self, title: str, body: str) -> int:
+        """Relevance of a post's own text: title hits x5 plus body hits x2."""
+        return self.count(title) * self.TITLE_WEIGHT + self.count(body) * self.BODY_WEIGHT
+
+    def score_comment(self, body: str) -> tuple[int, int]:
+        """Returns (weighted comment score, raw hit count) for a comment body."""
+        hits = self.count(body)
+        return hits * self.COMMENT_WEIGHT, hits
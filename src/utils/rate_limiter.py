@@ -0,0 +1,34 @@
+# FILE: src/utils/rate_limiter.py
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket used to keep concurrent workers under an API rate limit.
+    Allows short bursts of up to `burst` calls, refilling at `max_calls` per `period` seconds.
+    """
+
+    def __init__(self, max_calls: int, period: float = 60.0, burst: int = 10):
+        if max_calls <= 0:
+            raise ValueError("max_calls must be a positive integer.")
+        self.rate = max_calls / period
+        self.capacity = max(1, min(burst, max_calls))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> None:
+        """Blocks until `tokens` calls may be made without exceeding the limit."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,46 @@
+# FILE: src/utils/top_k.py
+
+import heapq
+import itertools
+from typing import Any, List, Tuple
+
+
+class TopK:
+    """
+    Streaming top-k selector backed by a bounded min-heap.
+    Items are pushed as soon as they are scored; anything that cannot make the top k is
+    dropped immediately, so memory stays O(k). Ties keep insertion order, exactly like a
+    stable `sort(key=score, reverse=True)[:k]` over the full list.
+    """
+
+    def __init__(self, k: int):
+        self.k = max(0, k)
+        self._heap: List[Tuple[Any, int, Any]] = []
+        self._counter = itertools.count()
+        self.seen = 0
+
+    def push(self, score, item) -> bool:
+        """Offers an item; returns True if it is currently among the top k."""
+        self.seen += 1
+        if self.k == 0:
+            return False
+        # The negated sequence number makes later arrivals lose ties, and keeps items out of comparisons.
+        entry = (score, -next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def items(self) -> list:
+        """Returns the kept items, best first."""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def scored_items(self) -> list[tuple]:
+        """Returns the kept (score, item) pairs, best first."""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
@@ -19,8 +19,8 @@ from src.services.firecrawl_client import scrape_and_format_content, extract_ima
 from src.services.gemini_client import get_best_image_from_candidates
 from src.services.openai_client import generate_post_function, find_relevant_subreddits
 from src.services.reddit_client import (
+    get_reddit_client,
     post_to_reddit,
-    search_and_filter_posts,
     validate_subreddit,
     scrape_validated_posts
 )
@@ -45,6 +45,7 @@ from src.database import (
     save_research_report
 )
 
+from src.utils.chat_history import ChatHistoryContext
 from src.utils.file_handler import( save_report_to_file, save_raw_data_to_file)
 
 from src.config import (
@@ -57,13 +58,8 @@ from src.config import (
 
 
 def main():
-    reddit = praw.Reddit(
-    client_id=os.getenv('REDDIT_CLIENT_ID'),
-    client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-    user_agent=os.getenv('REDDIT_USER_AGENT', 'Social Media Agent by Faiq'),
-    username=os.getenv('REDDIT_USERNAME'),
-    password=os.getenv('REDDIT_PASSWORD')
-)
+    # Cached per credential set, so Streamlit reruns reuse the same authenticated client.
+    reddit = get_reddit_client()
     print("--- [MAIN] Starting Social Media Agent application ---")
     st.set_page_config(page_title="Social Media Agent", layout="wide")
     print("--- [MAIN] Streamlit page config set: title='Social Media Agent', layout='wide' ---")
@@ -269,9 +265,15 @@ def main():
 
             # Process the request with the assistant
             with st.chat_message("assistant"):
+                # Set by workflows that stream their answer into this container themselves.
+                st.session_state["response_streamed"] = False
+                # Set by the research workflow to the report its answer came from (kept for the history summary).
+                st.session_state["response_report"] = None
                 with st.spinner("🧠 Analyzing your request..."):
                     print("--- [APP] Calling route_user_request() ---")
-                    decision = route_user_request(user_prompt, st.session_state.messages)
+                    # Kept per session so the router's history summary is updated incrementally.
+                    history_context = st.session_state.setdefault("router_history_context", ChatHistoryContext())
+                    decision = route_user_request(user_prompt, st.session_state.messages, history_context=history_context)
                     print(f"--- [APP] route_user_request() returned: {decision} ---")
                     tool_to_call = decision.get("tool")
                     args = decision.get("args", {})
@@ -284,7 +286,7 @@ def main():
                     print(f"--- [APP] Reddit research workflow selected: topic='{topic}', question='{question}' ---")
                     if topic and question:
                         print(f"--- [APP] Calling execute_reddit_research_workflow(user_id={st.session_state.user_id}, topic={topic}, question={question}) ---")
-                        response_content = execute_reddit_research_workflow(st.session_state.user_id, topic, question)
+                        response_content = execute_reddit_research_workflow(st.session_state.user_id, topic, question, reddit=reddit)
                         print(f"--- [APP] Reddit research workflow returned: {response_content[:50]}... ---")
                     else:
                         response_content = "I need both a topic and a question for Reddit research."
@@ -324,10 +326,12 @@ def main():
                     response_content = args.get("reason", "I'm sorry, I couldn't understand that request.")
                     print(f"--- [APP] Router error: {response_content} ---")
 
-                # Display the final response and save to history
-                st.markdown(response_content)
+                # Display the final response (unless it was already streamed) and save to history
+                if not st.session_state.get("response_streamed"):
+                    st.markdown(response_content)
                 print(f"--- [APP] Displaying assistant response: {response_content[:50]}... ---")
-                st.session_state.messages.append({"role": "assistant", "content": response_content})
+                st.session_state.messages.append({"role": "assistant", "content": response_content,
+                                                  **(st.session_state.get("response_report") or {})})
                 print(f"--- [APP] Appended assistant response to session state: {len(st.session_state.messages)} messages total ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# src.config refuses to load without these; the unit tests never call the APIs.
+for key in ("OPENAI_API_KEY", "FIRE_CRAWL_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(key, "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
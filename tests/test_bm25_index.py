@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+from src.utils.bm25_index import BM25Index, informative_terms, tokenize
+
+DOCS = [
+    "rust borrow checker explained",
+    "python asyncio tutorial",
+    "rust rust rust game engine bevy",
+    "bevy vs godot for indie games",
+    "c++ or rust for a game engine",
+]
+
+
+def build_index(**kwargs):
+    index = BM25Index(**kwargs)
+    for doc in DOCS:
+        index.add(tokenize(doc))
+    return index
+
+
+def test_tokenize_keeps_language_names_whole():
+    assert tokenize("C++, C# and Node.js don't") == ["c++", "c#", "and", "node.js", "don't"]
+    assert informative_terms("What do people think about the Rust game engine?") == ["engine", "game", "rust"]
+
+
+def test_only_matching_documents_are_scored():
+    assert set(build_index().scores(["bevy"])) == {2, 3}
+    assert build_index().scores(["haskell"]) == {}
+
+
+def test_score_matches_the_bm25_formula():
+    index = build_index(k1=1.2, b=0.75)
+    lengths = [len(tokenize(doc)) for doc in DOCS]
+    avg_length = sum(lengths) / len(lengths)
+    idf = math.log(1 + (5 - 3 + 0.5) / (3 + 0.5))  # "rust" is in 3 of 5 documents
+    tf, length = 3, lengths[2]
+    expected = idf * tf * 2.2 / (tf + 1.2 * (1 - 0.75 + 0.75 * length / avg_length))
+    assert index.scores(["rust"])[2] == pytest.approx(expected)
+
+
+def test_rarer_terms_and_more_hits_rank_higher():
+    index = build_index()
+    assert index.idf("godot") > index.idf("rust")
+    ranked = [doc_id for _, doc_id in index.top_k(["rust", "engine"], 3)]
+    assert ranked[0] == 2
+    assert set(ranked) == {0, 2, 4}
+
+
+def test_priors_and_ties():
+    index = BM25Index()
+    for _ in range(3):
+        index.add(["same", "text"])
+    # Identical documents tie; the earlier one wins.
+    assert [doc_id for _, doc_id in index.top_k(["same"], 3)] == [0, 1, 2]
+    boosted = BM25Index()
+    boosted.add(["same", "text"])
+    boosted.add(["same", "text"], prior=1.0)
+    assert [doc_id for _, doc_id in boosted.top_k(["same"], 2)] == [1, 0]
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import praw
+
+from src.models import RedditPost
+from src.services.comment_fetcher import CommentBudget, _BudgetTracker, _expand_submission_comments, rebase_depths
+
+
+def comment(id, depth):
+    return SimpleNamespace(id=id, link_id="t3_p1", parent_id="t1_x", body=f"comment {id}", author=None,
+                           score=1, depth=depth, created_utc=0.0)
+
+
+class Forest:
+    def __init__(self, items):
+        self.items = items
+
+    def list(self):
+        return list(self.items)
+
+
+class ContinueThread(praw.models.MoreComments):
+    """A "continue this thread" stub: it loads a sub-forest whose depths count from the stub's parent."""
+
+    def __init__(self, depth, loaded):
+        self.depth = depth
+        self.count = 0
+        self.children = []
+        self.submission = None
+        self.loaded = loaded
+        self.requests = 0
+
+    def comments(self, update=True):
+        self.requests += 1
+        return Forest(self.loaded)
+
+
+class FakeReddit:
+    thread_safe = True
+
+    def __init__(self, items):
+        self.items = items
+
+    def submission(self, id):
+        return SimpleNamespace(comments=Forest(self.items))
+
+
+def expand(items, max_depth):
+    post = RedditPost("p1", "rust", "t", "", "", "", None, 1, 10, 0.0)
+    return _expand_submission_comments(FakeReddit(items), post, CommentBudget(10, max_depth, None),
+                                       _BudgetTracker(CommentBudget()), None)
+
+
+def test_rebase_depths():
+    items = [comment("a", 1), comment("b", 2)]
+    rebase_depths(items, 4)
+    assert [c.depth for c in items] == [4, 5]
+    # "Load more" batches already start at the stub's depth.
+    assert [c.depth for c in rebase_depths([comment("c", 3)], 3)] == [3]
+    assert rebase_depths([], 2) == []
+
+
+def test_continued_threads_respect_max_depth_from_the_submission():
+    # Replies under a depth-1 comment continue at absolute depth 2, but PRAW numbers them 1, 2, 3.
+    stub = ContinueThread(2, [comment("d2", 1), comment("d3", 2), comment("d4", 3)])
+    result = expand([comment("t0", 0), comment("t1", 1), stub], max_depth=3)
+    assert stub.requests == 1
+    assert {c.id: c.depth for c in result["comments"]} == {"t0": 0, "t1": 1, "d2": 2, "d3": 3}
+    assert result["complete"]
+
+
+def test_stubs_loaded_inside_a_continued_thread_keep_absolute_depths():
+    # Relative depth 2 inside the sub-forest is absolute depth 3: within the cap, so it is expanded.
+    deeper = ContinueThread(2, [comment("e3", 1)])
+    stub = ContinueThread(2, [comment("d2", 1), deeper])
+    result = expand([comment("t0", 0), comment("t1", 1), stub], max_depth=3)
+    assert deeper.depth == 3
+    assert deeper.requests == 1
+    assert {c.id: c.depth for c in result["comments"]} == {"t0": 0, "t1": 1, "d2": 2, "e3": 3}
+
+
+def test_continued_stub_past_max_depth_is_never_requested():
+    deeper = ContinueThread(2, [comment("e3", 1)])
+    stub = ContinueThread(2, [comment("d2", 1), deeper])
+    result = expand([comment("t0", 0), comment("t1", 1), stub], max_depth=2)
+    assert deeper.requests == 0
+    assert {c.id for c in result["comments"]} == {"t0", "t1", "d2"}
@@ -0,0 +1,51 @@
+import pytest
+
+from src.utils.content_filter import ContentFilter
+
+
+@pytest.fixture
+def content_filter():
+    return ContentFilter(bot_authors=["AutoModerator", " "], min_comment_words=2)
+
+
+@pytest.mark.parametrize("body, author, reason", [
+    ("[deleted]", None, "deleted"),
+    ("  [Removed]  ", None, "deleted"),
+    ("Please read the rules before posting.", "automoderator", "bot"),
+    ("Here is the summary. I'm a bot, beep boop.", "someone", "bot"),
+    ("Thanks!", None, "too_short"),
+    ("", None, "too_short"),
+    ("https://example.com/article", None, "link_only"),
+    ("[](https://example.com) www.example.org", None, "link_only"),
+    ("[great read](https://example.com)", None, None),
+    ("This matches what I saw in production.", None, None),
+])
+def test_comment_reasons(content_filter, body, author, reason):
+    assert content_filter.comment_reason(body, author) == reason
+
+
+def test_link_only_rule_can_be_disabled():
+    keep_links = ContentFilter(drop_link_only=False, min_comment_words=1)
+    assert keep_links.comment_reason("https://example.com/article") == "too_short"
+    assert keep_links.post_reason("Article", "", url="https://example.com/article") is None
+
+
+@pytest.mark.parametrize("kwargs, reason", [
+    ({"selftext": "", "url": "https://example.com/article"}, "link_only"),
+    ({"selftext": "", "url": "https://example.com/article", "num_comments": 4}, None),
+    ({"selftext": "My thoughts on it: worth reading.", "url": "https://example.com/article"}, None),
+    ({"selftext": "", "url": "https://www.reddit.com/r/rust/comments/abc/title/"}, None),
+    ({"selftext": "", "url": "https://reddit.com/r/rust/x/", "permalink": "/r/rust/x/"}, None),
+    ({"selftext": "[removed]", "url": ""}, "deleted"),
+    ({"selftext": "Weekly thread", "url": "", "author": "AutoModerator"}, "bot"),
+])
+def test_post_reasons(content_filter, kwargs, reason):
+    assert content_filter.post_reason("A title", **kwargs) == reason
+
+
+def test_dropped_items_are_tallied(content_filter):
+    for body in ["[deleted]", "ok", "[removed]", "A real comment here."]:
+        content_filter.comment_reason(body)
+    assert content_filter.counts == {"deleted": 2, "too_short": 1}
+    assert content_filter.summary() == "deleted: 2, too_short: 1"
+    assert ContentFilter().summary() == "nothing dropped"
@@ -0,0 +1,66 @@
+from src.utils.context_packer import count_tokens, pack_context
+
+
+def thread(title, score, comment_scores, words=20):
+    return {"type": "full_submission", "title": title, "selftext": "body " * words, "score": score,
+            "top_comments": [{"body": f"comment {s} " + "detail " * words, "score": s} for s in comment_scores]}
+
+
+def post(title, score, words=20):
+    return {"type": "individual_post", "title": title, "selftext": "text " * words, "score": score}
+
+
+def nuggets(scores, words=10):
+    return {"type": "comment_nuggets", "comments": [{"body": f"nugget {s} " + "insight " * words, "score": s} for s in scores]}
+
+
+def test_count_tokens_is_positive_and_monotonic():
+    assert count_tokens("") == 0
+    assert 0 < count_tokens("rust") < count_tokens("rust " * 50)
+
+
+def test_everything_fits_in_one_turn_in_original_order():
+    data = [post("Post A", 1), thread("Thread B", 5, [3, 2]), nuggets([4])]
+    packed = pack_context(data, turn_token_budget=10_000)
+    assert len(packed.turns) == 1
+    text = packed.turns[0]
+    assert text.index("Post A") < text.index("Thread B") < text.index("nugget 4")
+    assert packed.included == {"individual_post": 1, "full_submission": 1, "comment_nuggets": 1}
+    assert not packed.dropped
+
+
+def test_turn_budget_is_respected_and_low_priority_items_are_dropped():
+    data = [post(f"Post {i}", i) for i in range(10)] + [thread("Thread", 0, [1], words=40)]
+    budget = 250
+    packed = pack_context(data, turn_token_budget=budget, max_turns=1)
+    assert all(tokens <= budget for tokens in packed.turn_tokens)
+    # Threads go first whatever their score; the best-scored posts fill the rest.
+    assert "Thread" in packed.turns[0]
+    assert packed.dropped["individual_post"] > 0
+    assert "Post 9" in packed.turns[0] and "Post 0" not in packed.turns[0]
+
+
+def test_oversized_thread_keeps_its_best_comments():
+    item = thread("Big thread", 10, [1, 50, 7, 30, 2], words=30)
+    budget = count_tokens(item["selftext"]) + 150
+    packed = pack_context([item], turn_token_budget=budget, max_turns=1)
+    text = packed.turns[0]
+    assert packed.turn_tokens[0] <= budget
+    assert packed.trimmed_comments > 0
+    assert "comment 50 " in text
+    assert "comment 1 " not in text
+    assert packed.included == {"full_submission": 1}
+
+
+def test_thread_whose_post_alone_is_too_big_is_dropped():
+    packed = pack_context([thread("Huge", 1, [], words=400)], turn_token_budget=50, max_turns=1)
+    assert packed.turns == []
+    assert packed.dropped == {"full_submission": 1}
+
+
+def test_unlimited_turns_open_new_blocks_instead_of_dropping():
+    data = [post(f"Post {i}", i, words=40) for i in range(6)]
+    packed = pack_context(data, turn_token_budget=120, max_turns=None)
+    assert len(packed.turns) > 1
+    assert not packed.dropped
+    assert sum(text.count("--- Relevant Post ---") for text in packed.turns) == 6
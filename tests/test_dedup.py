@@ -0,0 +1,40 @@
+from src.utils.dedup import near_duplicate_clusters, simhash
+
+BASE = ("I switched our backend from python to rust last year and the latency dropped a lot, "
+        "but compile times and the borrow checker slowed the team down for the first months")
+
+
+def distance(a, b):
+    return bin(simhash(a) ^ simhash(b)).count("1")
+
+
+def test_simhash_is_stable_and_normalisation_insensitive():
+    assert simhash(BASE) == simhash(BASE)
+    assert simhash(BASE) == simhash(BASE.upper().replace(",", " ,"))
+    assert simhash("") == 0
+
+
+def test_near_and_unrelated_texts_are_far_apart():
+    near = BASE.replace("last year", "this year")
+    other = "Godot 4 finally has a usable tilemap editor, and the new physics engine is much better than before"
+    assert distance(BASE, near) < distance(BASE, other)
+    assert distance(BASE, other) > 10
+
+
+def test_clusters_respect_max_distance():
+    near = BASE.replace("last year", "this year")
+    d = distance(BASE, near)
+    assert 0 < d < 10
+    assert near_duplicate_clusters([BASE, near], max_distance=d) == [[0, 1]]
+    assert near_duplicate_clusters([BASE, near], max_distance=d - 1) == [[0], [1]]
+
+
+def test_short_texts_only_group_when_identical():
+    texts = ["great post!", "Great   post", "great posts", "great post!!"]
+    assert near_duplicate_clusters(texts, max_distance=3, min_tokens=5) == [[0, 1, 3], [2]]
+
+
+def test_every_index_is_in_one_cluster_ordered_by_first_member():
+    other = "Godot 4 finally has a usable tilemap editor, and the new physics engine is much better than before"
+    texts = [other, BASE, "short", BASE, other + "!"]
+    assert near_duplicate_clusters(texts) == [[0, 4], [1, 3], [2]]
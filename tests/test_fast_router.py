@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from src.core import fast_router
+from src.core.fast_router import fast_route
+
+DRAFT = [
+    {"role": "user", "content": "write a post about rust"},
+    {"role": "assistant", "content": "**Title:** Why Rust\n\n**Post Text:** Rust is fast and safe."},
+]
+URL = "https://example.com/blog/rust-2024"
+
+
+@pytest.mark.parametrize("prompt", [
+    URL,
+    f"{URL}.",
+    f"write a post about this link: {URL}",
+    f"please create a linkedin post about this article {URL}",
+    f"share this {URL}",
+    f"summarize and post {URL}",
+    f"post this: {URL}",
+])
+def test_url_rule(prompt):
+    assert fast_route(prompt, []) == ("url", {"tool": "url_poster", "args": {"url": URL}})
+
+
+@pytest.mark.parametrize("prompt", [
+    f"what does {URL} say about async?",
+    f"compare {URL} with https://example.org/other",
+    f"research what reddit thinks of {URL}",
+])
+def test_url_rule_leaves_other_requests_to_the_llm(prompt):
+    result = fast_route(prompt, [])
+    assert result is None or result[0] != "url"
+
+
+def test_direct_post_rule():
+    text = "We just shipped version 2.0 with a faster parser!"
+    for prompt in [f"post this: {text}", f"Publish the following - {text}", f"tweet this\n{text}"]:
+        assert fast_route(prompt, []) == ("direct_post", {"tool": "direct_post", "args": {"text_to_post": text}})
+
+
+@pytest.mark.parametrize("prompt", [
+    "post this: now",
+    "post something about rust",
+    "can you post about the new release?",
+])
+def test_direct_post_rule_needs_explicit_text(prompt):
+    assert fast_route(prompt, []) is None
+
+
+@pytest.mark.parametrize("prompt, rule", [
+    ("make the title shorter", "title_edit"),
+    ("Could you rewrite the headline", "title_edit"),
+    ("the title is too long", "title_edit"),
+    ("make it shorter", "style_edit"),
+    ("please make the post more casual!", "style_edit"),
+    ("make it a bit less formal", "style_edit"),
+])
+def test_edit_rules_with_a_draft(prompt, rule):
+    assert fast_route(prompt, DRAFT) == (rule, {"tool": "revise_post", "args": {"revision_request": prompt}})
+
+
+@pytest.mark.parametrize("prompt", [
+    "make the title shorter",
+    "make it shorter",
+])
+def test_edit_rules_need_a_draft(prompt):
+    assert fast_route(prompt, []) is None
+    assert fast_route(prompt, [{"role": "assistant", "content": "Rust is fast."}]) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "",
+    "   ",
+    "what do people on reddit think about rust for game development?",
+    "make it shorter and then research bevy on reddit",
+    "make a new post about godot",
+    "title ideas for a post about python?",
+    "make the title shorter " + "please " * 40,
+])
+def test_ambiguous_prompts_go_to_the_llm(prompt):
+    assert fast_route(prompt, DRAFT) is None
+
+
+def test_decision_log_stores_no_prompt_text_by_default(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "decisions.jsonl")
+    monkeypatch.setattr(fast_router, "ROUTER_DECISION_LOG", log_path)
+    prompt = "post this: my private announcement text"
+    fast_router.log_decision("rule", {"tool": "direct_post"}, 0.1, prompt, rule="direct_post")
+    fast_router.log_decision("shadow", {"tool": "direct_post"}, 5.0, prompt, rule="direct_post", llm_tool="general_chat")
+    with open(log_path, encoding="utf-8") as f:
+        logged = f.read()
+    assert "private" not in logged
+    summary = fast_router.summarize_decision_log(log_path)
+    assert summary["rule_llm_agreement"] == 0.0
+    assert summary["disagreements"][0]["prompt"] == json.loads(logged.splitlines()[0])["prompt_sha256"]
+
+    monkeypatch.setattr(fast_router, "ROUTER_LOG_PROMPT_TEXT", True)
+    fast_router.log_decision("llm", {"tool": "general_chat"}, 1.0, prompt)
+    with open(log_path, encoding="utf-8") as f:
+        assert json.loads(f.read().splitlines()[-1])["prompt_preview"] == prompt
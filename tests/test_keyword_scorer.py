@@ -0,0 +1,40 @@
+import pytest
+
+from src.utils.keyword_scorer import KeywordScorer
+
+
+def reference_count(text, keywords):
+    text = text.lower()
+    return sum(text.count(kw.lower()) for kw in set(keywords))
+
+
+@pytest.mark.parametrize("text, keywords", [
+    ("Rust is fast. rust is safe. RUST!", ["rust"]),
+    ("aaaa", ["aa"]),
+    ("aaa", ["aa", "a"]),
+    ("trusted rustaceans trust rust", ["rust", "trust"]),
+    ("game engine: bevy, godot, bevy engine", ["bevy", "engine", "game engine"]),
+    ("", ["rust"]),
+    ("no keyword here", []),
+])
+def test_count_matches_str_count(text, keywords):
+    assert KeywordScorer(keywords).count(text) == reference_count(text, keywords)
+
+
+def test_keywords_are_deduplicated_case_insensitively():
+    scorer = KeywordScorer(["Rust", "rust", "", "RUST"])
+    assert scorer.keywords == ["rust"]
+    assert scorer.count("rust Rust") == 2
+
+
+def test_keyword_counts_and_hits():
+    scorer = KeywordScorer(["bevy", "godot"])
+    text = "godot or bevy? bevy."
+    assert scorer.hits(text) == [1, 0, 0]
+    assert scorer.keyword_counts(text) == {0: 2, 1: 1}
+
+
+def test_weights():
+    scorer = KeywordScorer(["rust"])
+    assert scorer.score_post("Rust tips", "rust and more rust") == 1 * 5 + 2 * 2
+    assert scorer.score_comment("I like rust") == (3, 1)
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from src.core import agent
+from src.services import gemini_client, llm_cache, llm_provider
+from src.utils.disk_cache import DiskCache
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel and counts the calls that reach the API."""
+    calls = 0
+
+    def __init__(self, model, generation_config=None):
+        self.generation_config = generation_config
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        type(self).calls += 1
+        if stream:
+            return iter([SimpleNamespace(text="The answer"), SimpleNamespace(text=" is 2.")])
+        return SimpleNamespace(text="2")
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", DiskCache(str(tmp_path / "llm.sqlite3"), 1024 * 1024))
+    monkeypatch.setattr(llm_provider.genai, "GenerativeModel", FakeGenerativeModel)
+    monkeypatch.setattr(llm_provider.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(agent, "REPORT_QA_RETRIEVAL", False)
+    FakeGenerativeModel.calls = 0
+    llm_provider.reset_llm_clients()
+    yield
+    llm_provider.reset_llm_clients()
+
+
+def test_report_answers_are_served_from_the_cache_the_second_time():
+    first = "".join(agent.stream_answer_from_report("# Report\nRust is fast.", "Is rust fast?"))
+    second = "".join(agent.stream_answer_from_report("# Report\nRust is fast.", "Is rust fast?"))
+    assert first == second == "The answer is 2."
+    assert FakeGenerativeModel.calls == 1
+    agent.answer_question_from_report("# Report\nRust is fast.", "Is rust slow?")
+    assert FakeGenerativeModel.calls == 2
+
+
+def test_image_selection_is_served_from_the_cache_the_second_time(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    downloads = {"https://img/1.png": b"one", "https://img/2.png": b"two"}
+    monkeypatch.setattr(gemini_client.requests, "get", lambda url, timeout: SimpleNamespace(
+        content=downloads[url], headers={"Content-Type": "image/png"}, raise_for_status=lambda: None))
+    urls = list(downloads)
+    assert gemini_client.get_best_image_from_candidates(urls, "post") == "https://img/2.png"
+    assert gemini_client.get_best_image_from_candidates(urls, "post") == "https://img/2.png"
+    assert FakeGenerativeModel.calls == 1
+    # Different image bytes behind the same URLs are a different prompt.
+    downloads["https://img/2.png"] = b"changed"
+    gemini_client.get_best_image_from_candidates(urls, "post")
+    assert FakeGenerativeModel.calls == 2
+
+
+def test_default_temperature_is_not_cached():
+    model = llm_provider.get_gemini_model()
+    model.generate_content("hello")
+    model.generate_content("hello")
+    assert FakeGenerativeModel.calls == 2
+
+
+def test_media_parts_are_hashed_by_content():
+    def key(prompt):
+        return llm_cache.response_key("gemini", "m", {"temperature": 0}, prompt)
+
+    red, blue = Image.new("RGB", (2, 2), "red"), Image.new("RGB", (2, 2), "blue")
+    assert key(["q", red]) == key(["q", Image.new("RGB", (2, 2), "red")])
+    assert key(["q", red]) != key(["q", blue])
+    assert key([{"mime_type": "image/png", "data": b"a"}]) != key([{"mime_type": "image/png", "data": b"b"}])
+    assert key([memoryview(b"a")]) == key([b"a"])
+
+
+def test_unhashable_parts_disable_caching_instead_of_using_repr():
+    class Opaque:
+        pass
+
+    assert llm_cache.response_key("gemini", "m", {}, ["q", Opaque()]) is None
+    model = llm_provider.get_gemini_model(temperature=0)
+    model.generate_content(["q", Opaque()])
+    model.generate_content(["q", Opaque()])
+    assert FakeGenerativeModel.calls == 2
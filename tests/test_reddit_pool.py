@@ -0,0 +1,63 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services import reddit_pool
+from src.services.reddit_pool import RedditClientPool, leased_reddit
+
+
+class FakeClient:
+    pass
+
+
+def test_pool_never_builds_more_than_max_size():
+    pool = RedditClientPool(FakeClient, max_size=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(_):
+        with leased_reddit(pool) as client:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return id(client)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = set(executor.map(work, range(24)))
+    assert pool.created == 2
+    assert peak[0] == 2
+    assert len(clients) == 2
+
+
+def test_failed_build_frees_its_slot():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("token exchange failed")
+        return FakeClient()
+
+    pool = RedditClientPool(build, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+    with pool.lease() as client:
+        assert isinstance(client, FakeClient)
+    assert pool.created == 1
+
+
+def test_bare_client_locks_do_not_outlive_the_client():
+    client = FakeClient()
+    with leased_reddit(client) as leased:
+        assert leased is client
+        assert reddit_pool._lock_for(client).locked()
+    del client, leased
+    gc.collect()
+    assert not any(isinstance(key, FakeClient) for key in list(reddit_pool._client_locks.keys()))
@@ -0,0 +1,51 @@
+from src.config import REPORT_CACHE_MATCH_THRESHOLD
+from src.services.report_cache import ReportCatalog
+from src.services.report_index import report_synopsis
+
+REPORT = """# Reddit Research Report: Rust game development
+
+## 1. Executive Summary
+Redditors see Rust as a promising language for game development. Bevy is the most discussed engine,
+praised for its ECS design, while long compile times are the main complaint.
+
+## 2. Key Themes
+**Engines and tooling**
+Bevy and Fyrox dominate; Godot bindings are used for editor workflows.
+
+## 5. Notable Details
+A few threads discuss multiplayer networking: dedicated servers, rollback netcode, latency
+compensation and matchmaking were handled with crates like renet and ggrs.
+"""
+
+
+def catalog():
+    return ReportCatalog([{"id": "r1", "topic": "Rust game development", "content": REPORT, "created_at": "2026-01-01"}])
+
+
+def test_synopsis_keeps_headings_and_summary_only():
+    synopsis = report_synopsis(REPORT)
+    assert "Executive Summary" in synopsis and "Notable Details" in synopsis
+    assert "Bevy is the most discussed engine" in synopsis
+    assert "rollback netcode" not in synopsis
+
+
+def test_synopsis_falls_back_to_the_opening_paragraphs():
+    synopsis = report_synopsis("First paragraph.\n\nSecond.\n\nThird.\n\nFourth, deep detail.")
+    assert "Third." in synopsis and "Fourth" not in synopsis
+
+
+def test_question_on_the_summarised_subject_is_reused():
+    report, score = catalog().best_match("Rust game development", "What do people think of the Bevy engine?")
+    assert report.id == "r1"
+    assert score >= REPORT_CACHE_MATCH_THRESHOLD
+
+
+def test_question_on_another_sub_topic_is_not_auto_reused():
+    # Every term of this question appears in the report body, but none in its headings or summary.
+    report, score = catalog().best_match("Rust game development", "How do they handle multiplayer networking servers and matchmaking?")
+    assert score < REPORT_CACHE_MATCH_THRESHOLD
+
+
+def test_failed_reports_are_never_indexed():
+    failed = ReportCatalog([{"id": "x", "topic": "Rust", "content": "# Report Generation Failed\n\nTimeout."}])
+    assert len(failed) == 0
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import report_generator
+
+
+class FakeChat:
+    def __init__(self, log):
+        self.log = log
+
+    def send_message(self, prompt, stream=False):
+        self.log.append("turn")
+        return iter([SimpleNamespace(text="chat report")]) if stream else SimpleNamespace(text="noted")
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    log = []
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(report_generator, "REDDIT_FILTER_ENABLED", False)
+    monkeypatch.setattr(report_generator, "REPORT_MODE", "auto")
+    monkeypatch.setattr(report_generator, "get_gemini_model", lambda **kwargs: SimpleNamespace(start_chat=lambda: FakeChat(log)))
+
+    def fake_map_reduce(topic, data, model=None):
+        log.append("map_reduce")
+        yield "map-reduce report"
+
+    monkeypatch.setattr(report_generator, "stream_report_map_reduce", fake_map_reduce)
+    return log
+
+
+def posts(n, words=200):
+    return [{"type": "individual_post", "title": f"Post {i}", "selftext": "detail " * words, "score": i} for i in range(n)]
+
+
+def test_auto_uses_the_chat_report_for_data_that_fits_in_two_turns(calls, monkeypatch):
+    data = posts(4)
+    one_post = report_generator.pack_context(data[:1], 10**6).turn_tokens[0]
+    # Two posts per turn: the data needs both chat turns but nothing is dropped.
+    monkeypatch.setattr(report_generator, "REPORT_TURN_TOKEN_BUDGET", one_post * 2 + 5)
+    assert "".join(report_generator.stream_report_from_posts("rust", data)) == "chat report"
+    assert calls == ["turn", "turn"]
+
+
+def test_auto_uses_map_reduce_only_when_packing_would_drop_data(calls, monkeypatch):
+    data = posts(6)
+    one_post = report_generator.pack_context(data[:1], 10**6).turn_tokens[0]
+    monkeypatch.setattr(report_generator, "REPORT_TURN_TOKEN_BUDGET", one_post * 2 + 5)
+    assert "".join(report_generator.stream_report_from_posts("rust", data)) == "map-reduce report"
+    assert calls == ["map_reduce"]
@@ -0,0 +1,18 @@
+from src.models import RedditComment, RedditPost
+from src.services.research_index import find_cached_corpus_index, get_corpus_index
+
+
+def make_corpus(topic, updated_at):
+    comment = RedditComment("c1", "p1", "t3_p1", "bevy has a great ecs", "a", 5, 0, 0.0)
+    post = RedditPost("p1", "rust", "Rust game engines", "bevy or fyrox?", "", "", "a", 10, 1, 0.0, [comment])
+    return {"topic": topic, "updated_at": updated_at, "posts": [post]}
+
+
+def test_follow_up_search_reuses_the_index_in_memory():
+    assert find_cached_corpus_index("never indexed") is None
+    old = get_corpus_index(make_corpus("rust gamedev", 1.0))
+    new = get_corpus_index(make_corpus("rust gamedev", 2.0))
+    assert old is not new
+    assert find_cached_corpus_index("rust gamedev") is new
+    posts, comments = new.search("which ecs engine?", top_posts_k=1, top_comments_k=1)
+    assert [c.id for c in comments] == ["c1"]
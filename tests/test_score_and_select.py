@@ -0,0 +1,52 @@
+import random
+
+from src.models import RedditComment, RedditPost
+from src.services.reddit_client import score_and_select
+from src.utils.keyword_scorer import KeywordScorer
+
+WORDS = ["rust", "bevy", "engine", "python", "game", "fast", "slow", "editor", "the", "and"]
+KEYWORDS = {"rust", "bevy", "game engine"}
+
+
+def random_text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_posts(seed, n_posts=25):
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n_posts):
+        comments = [RedditComment(f"c{i}_{j}", f"p{i}", f"t3_p{i}", random_text(rng, 8), "a", rng.randint(0, 5), 0, 0.0)
+                    for j in range(rng.randint(0, 30))]
+        posts.append(RedditPost(f"p{i}", "rust", random_text(rng, 4), random_text(rng, 12), "", "", "a",
+                                rng.randint(0, 20), len(comments), 0.0, comments))
+    return posts
+
+
+def reference_selection(posts, k_submissions, k_posts, k_comments):
+    """Scores everything up front and stable-sorts, the order the streaming heaps must reproduce."""
+    scorer = KeywordScorer(KEYWORDS)
+    post_scores = [scorer.score_post(p.title, p.selftext) for p in posts]
+    relevance = [post_scores[i] + sum(scorer.count(c.body) for c in p.comments) for i, p in enumerate(posts)]
+    submissions = sorted(range(len(posts)), key=lambda i: relevance[i] * 2 + posts[i].score, reverse=True)[:k_submissions]
+    scored = [i for i in range(len(posts)) if post_scores[i] > 0]
+    top_posts = sorted(scored, key=lambda i: post_scores[i] + posts[i].score, reverse=True)[:k_posts]
+    comments = [c for p in posts for c in p.comments if scorer.score_comment(c.body)[0] > 0]
+    top_comments = sorted(comments, key=lambda c: scorer.score_comment(c.body)[0] + c.score, reverse=True)[:k_comments]
+    return [posts[i].id for i in submissions], [posts[i].id for i in top_posts], [c.id for c in top_comments]
+
+
+def test_keyword_selection_matches_a_full_stable_sort():
+    for seed in range(5):
+        posts = make_posts(seed)
+        expected = reference_selection(posts, 5, 8, 12)
+        top_submissions, top_posts, top_comments = score_and_select(
+            posts, KEYWORDS, top_submissions_k=5, top_posts_k=8, top_comments_k=12, ranking="keyword")
+        assert ([p.id for p in top_submissions], [p.id for p in top_posts], [c.id for c in top_comments]) == expected
+
+
+def test_relevance_is_recorded_on_every_comment():
+    posts = make_posts(11, n_posts=3)
+    score_and_select(posts, KEYWORDS, ranking="keyword")
+    scorer = KeywordScorer(KEYWORDS)
+    assert all(c.relevance == scorer.score_comment(c.body)[0] for p in posts for c in p.comments)
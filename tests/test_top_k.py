@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+
+from src.utils.batch_scorer import top_k_indices
+from src.utils.top_k import TopK
+
+
+def stable_top_k(scores, k):
+    return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+
+
+def test_top_k_indices_keeps_tie_order():
+    scores = np.array([3, 5, 3, 5, 1, 3])
+    assert top_k_indices(scores, 4).tolist() == [1, 3, 0, 2]
+
+
+def test_top_k_indices_mask_and_edge_cases():
+    scores = np.array([3, 5, 3, 5, 1, 3])
+    mask = np.array([True, False, True, True, True, True])
+    assert top_k_indices(scores, 3, mask).tolist() == [3, 0, 2]
+    assert top_k_indices(scores, 0).tolist() == []
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 0, 2, 5, 4]
+    assert top_k_indices(scores, 2, np.zeros(6, dtype=bool)).tolist() == []
+
+
+def test_top_k_keeps_insertion_order_on_ties():
+    top = TopK(3)
+    for i, score in enumerate([2, 7, 2, 7, 2]):
+        top.push(score, i)
+    assert top.items() == [1, 3, 0]
+    assert top.scored_items() == [(7, 1), (7, 3), (2, 0)]
+    assert top.seen == 5
+
+
+def test_both_match_a_stable_sort():
+    rng = random.Random(7)
+    for _ in range(200):
+        scores = [rng.randint(0, 5) for _ in range(rng.randint(0, 30))]
+        k = rng.randint(0, 12)
+        expected = stable_top_k(scores, k)
+        top = TopK(k)
+        for i, score in enumerate(scores):
+            top.push(score, i)
+        assert top.items() == expected
+        assert top_k_indices(np.array(scores, dtype=np.int64), k).tolist() == expected